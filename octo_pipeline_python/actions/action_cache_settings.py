@@ -0,0 +1,12 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class ActionCacheSettings(BaseModel):
+    inputs: List[str] = Field(default_factory=list,
+                              description="Glob patterns of the action inputs, relative to the source directory, "
+                                          "or to the working directory if prefixed with $working_dir/")
+    outputs: List[str] = Field(default_factory=list,
+                               description="Glob patterns of the action outputs, relative to the source directory, "
+                                           "or to the working directory if prefixed with $working_dir/")
@@ -1,10 +1,13 @@
 import argparse
+import functools
 import os
 import tempfile
 from abc import abstractmethod
 from datetime import datetime, timedelta
 from string import Template
-from typing import Any, Dict, Final, Optional
+from typing import TYPE_CHECKING, Any, Dict, Final, Optional, Tuple, Type
+
+from pydantic import BaseModel
 
 from octo_pipeline_python.actions.action_result import (ActionResult,
                                                         ActionResultCode)
@@ -18,10 +21,19 @@ from octo_pipeline_python.utils.logger import logger
 from octo_pipeline_python.utils.pydantic_argparse import PydanticArgparse
 from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
 
+if TYPE_CHECKING:
+    from octo_pipeline_python.backends.backend_description import \
+        BackendDescription
+
 DEFAULT_KEYRING_EXP_MINUTES: Final[int] = 60
+DEFAULT_RESOURCE_WEIGHT: Final[int] = 1
+UNRESOLVED_SUBSTITUTION: Final[object] = object()
 
 
 class Backend:
+    __description: Optional[Tuple[Optional[str], "BackendDescription"]] = None
+    __args_cache: Optional[Dict[Tuple, Tuple[Dict[str, Any], BaseModel]]] = None
+
     @abstractmethod
     def initialize_backend(self,
                            backends_context: BackendsContext,
@@ -52,6 +64,39 @@ class Backend:
     def backend_name() -> str:
         pass
 
+    @staticmethod
+    def resource_weight(action_type: ActionType) -> int:
+        """
+        Tokens a pipeline running the action takes from the workspace budget
+        :param action_type:
+        :return:
+        """
+        return DEFAULT_RESOURCE_WEIGHT
+
+    def description(self,
+                    backends_context: Optional[BackendsContext],
+                    workspace_context: Optional[WorkspaceContext]) -> "BackendDescription":
+        """
+        Memoized description of the backend, per workspace working directory
+        :param backends_context:
+        :param workspace_context:
+        :return:
+        """
+        working_dir = workspace_context.working_dir if workspace_context else None
+        if self.__description is not None and self.__description[0] == working_dir:
+            return self.__description[1]
+        description = self.describe_backend(backends_context, workspace_context)
+        self.__description = (working_dir, description)
+        return description
+
+    def invalidate_description(self) -> None:
+        """
+        Drops the memoized description, the next call to description will describe the backend again
+        :return:
+        """
+        self.__description = None
+        self.invalidate_backend_args()
+
     def initialize_backend_pipeline_action(self,
                                            action_type: ActionType,
                                            backends_context: BackendsContext,
@@ -67,11 +112,8 @@ class Backend:
         :param action_name:
         :return:
         """
-        from octo_pipeline_python.backends.backend_description import \
-            BackendDescription
-        description: BackendDescription = self.describe_backend(backends_context, workspace_context)
-        if action_type in description.actions:
-            action = description.actions[action_type]
+        action = self.description(backends_context, workspace_context).action(action_type)
+        if action is not None:
             logger.info(f"[{pipeline_context.name}][{self.backend_name()}] "
                         f"Initializing action [{action.action_type}] for backend"
                         + (f" for action name [{action_name}]" if action_name else ""))
@@ -92,11 +134,8 @@ class Backend:
         :param action_name:
         :return:
         """
-        from octo_pipeline_python.backends.backend_description import \
-            BackendDescription
-        description: BackendDescription = self.describe_backend(backends_context, workspace_context)
-        if action_type in description.actions:
-            action = description.actions[action_type]
+        action = self.description(backends_context, workspace_context).action(action_type)
+        if action is not None:
             logger.info(f"[{pipeline_context.name}][{self.backend_name()}] "
                         f"Execution action [{action.action_type}] for backend"
                         + (f" for action name [{action_name}]" if action_name else ""))
@@ -119,16 +158,57 @@ class Backend:
         :param action_name
         :return:
         """
-        from octo_pipeline_python.backends.backend_description import \
-            BackendDescription
-        description: BackendDescription = self.describe_backend(backends_context, workspace_context)
-        if action_type in description.actions:
-            action = description.actions[action_type]
+        action = self.description(backends_context, workspace_context).action(action_type)
+        if action is not None:
             logger.info(f"[{pipeline_context.name}][{self.backend_name()}] "
                         f"Cleaning action [{action.action_type}] for backend"
                         + (f" for action name [{action_name}]" if action_name else ""))
             action.cleanup(self, backends_context, pipeline_context, workspace_context, action_name)
 
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def __compile_template(value: str) -> Tuple[Template, Tuple[str, ...]]:
+        template = Template(value)
+        return template, tuple(template.get_identifiers())
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def __model_parser(model: Type[BaseModel]) -> Tuple[Dict[str, Any], argparse.ArgumentParser]:
+        schema = model.model_json_schema()
+        if '$defs' in schema:
+            schema['definitions'] = schema['$defs']
+        parser = argparse.ArgumentParser(add_help=False)
+        PydanticArgparse.schema_to_argparse(schema, parser)
+        return schema, parser
+
+    @staticmethod
+    def __substitution_value(identifier: str, pipeline_context: Optional[PipelineContext]) -> Any:
+        if pipeline_context:
+            if identifier == 'full_version':
+                return pipeline_context.full_version
+            if identifier in PipelineContext.model_fields:
+                return pipeline_context.model_dump(include={identifier})[identifier]
+        return os.environ.get(identifier, UNRESOLVED_SUBSTITUTION)
+
+    def __substitute(self, value: str, pipeline_context: Optional[PipelineContext],
+                     references: Dict[str, Any]) -> str:
+        template, identifiers = self.__compile_template(value)
+        if not identifiers:
+            return value
+        sub = {}
+        for identifier in identifiers:
+            references[identifier] = self.__substitution_value(identifier, pipeline_context)
+            if references[identifier] is not UNRESOLVED_SUBSTITUTION:
+                sub[identifier] = references[identifier]
+        return template.safe_substitute(sub)
+
+    def invalidate_backend_args(self) -> None:
+        """
+        Drops the resolved backend args, used once the backend settings change
+        :return:
+        """
+        self.__args_cache = None
+
     def backend_args(self, backends_context: Optional[BackendsContext],
                      pipeline_context: Optional[PipelineContext],
                      workspace_context: Optional[WorkspaceContext],
@@ -136,6 +216,7 @@ class Backend:
                      action_name: Optional[str] = None) -> Any:
         """
         Tries to retrieve the backend args, either from the pipeline or from the workspace
+        Resolved args are cached per pipeline and action, as long as the substituted values did not change
         :param backends_context:
         :param pipeline_context:
         :param workspace_context:
@@ -143,45 +224,50 @@ class Backend:
         :param action_name:
         :return:
         """
+        if self.__args_cache is None:
+            self.__args_cache = {}
+        args_cache = self.__args_cache
+        cache_key = (pipeline_context.name if pipeline_context else None,
+                     workspace_context.working_dir if workspace_context else None,
+                     action_type, action_name,
+                     tuple(workspace_context.extra_args) if workspace_context and workspace_context.extra_args else None)
+        cached = args_cache.get(cache_key)
+        if cached and all(self.__substitution_value(identifier, pipeline_context) == value
+                          for identifier, value in cached[0].items()):
+            return cached[1].model_copy(deep=True)
+
         args = None
         action_args = None
-        model = self.describe_backend(backends_context, workspace_context).backend_model
+        model = self.description(backends_context, workspace_context).backend_model
         if pipeline_context:
             args = pipeline_context.backend_args_for_backend(self, workspace_context)
-        if action_type:
+        if action_type and pipeline_context:
             action_args = pipeline_context.backend_action_settings_for_backend(self, action_type, action_name)
         if not args:
             if workspace_context:
                 args = workspace_context.backend_args_for_backend(self, workspace_context)
             if not args and workspace_context and backends_context:
-                args = self.describe_backend(backends_context, workspace_context).backend_model()
+                args = model()
         if action_type and not action_args:
             action_args = workspace_context.backend_action_settings_for_backend(self, action_type, action_name)
         args = args.model_dump()
         if action_args:
             args.update(action_args)
         if workspace_context and workspace_context.extra_args:
-            schema = args.schema()
-            parser = argparse.ArgumentParser()
-            PydanticArgparse.schema_to_argparse(schema, parser)
+            schema, parser = self.__model_parser(model)
             known, unknown = parser.parse_known_args(workspace_context.extra_args)
-            args = args.model_dump()
             args.update(PydanticArgparse.argparse_to_schema(schema, known))
-        sub = {
-            **os.environ,
-            **(pipeline_context.model_dump() if pipeline_context else {})
-        }
-        if pipeline_context:
-            sub['full_version'] = pipeline_context.full_version
+        references: Dict[str, Any] = {}
         for key in args.keys():
             if isinstance(args[key], str):
-                args[key] = Template(args[key]).safe_substitute(sub)
+                args[key] = self.__substitute(args[key], pipeline_context, references)
             elif isinstance(args[key], list):
                 for idx in range(len(args[key])):
                     if isinstance(args[key][idx], str):
-                        args[key][idx] = Template(args[key][idx]).safe_substitute(sub)
+                        args[key][idx] = self.__substitute(args[key][idx], pipeline_context, references)
         args = model.model_validate(args)
-        return args
+        args_cache[cache_key] = (references, args)
+        return args.model_copy(deep=True)
 
     def store_backend_secret(self, secret: Dict,
                              pipeline_context: Optional[PipelineContext],
@@ -1,8 +1,12 @@
 import json
-from typing import Dict, Type
+from typing import TYPE_CHECKING, Dict, Optional, Type
 
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    from octo_pipeline_python.actions.action import Action
+    from octo_pipeline_python.actions.action_type import ActionType
+
 
 class BackendDescription:
     def __init__(self, name: str, working_dir: str, actions: Dict[str, "Action"], backend_model: Type[BaseModel]):
@@ -10,6 +14,8 @@ class BackendDescription:
         self.__working_dir = working_dir
         self.__actions = actions
         self.__backend_model = backend_model
+        self.__actions_index: Dict[str, "Action"] = {str(getattr(action_type, "value", action_type)): action
+                                                     for action_type, action in actions.items()}
 
     @property
     def name(self) -> str:
@@ -23,6 +29,14 @@ class BackendDescription:
     def actions(self) -> Dict[str, "Action"]:
         return self.__actions
 
+    def action(self, action_type: "ActionType") -> Optional["Action"]:
+        """
+        Finds the action of the backend by its type or type value
+        :param action_type:
+        :return:
+        """
+        return self.__actions_index.get(str(getattr(action_type, "value", action_type)))
+
     @property
     def backend_model(self) -> Type[BaseModel]:
         return self.__backend_model
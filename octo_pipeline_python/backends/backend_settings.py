@@ -4,6 +4,8 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import yaml
 from pydantic import BaseModel, Field, TypeAdapter
 
+from octo_pipeline_python.actions.action_cache_settings import \
+    ActionCacheSettings
 from octo_pipeline_python.actions.action_settings import ActionSettings
 from octo_pipeline_python.actions.action_type import ActionType
 from octo_pipeline_python.utils.search import PIPELINE_FOLDER, Search
@@ -15,6 +17,37 @@ class BackendSettings(BaseModel):
     backend_args: Optional[Any] = Field(default=None, description="Arguments of the context")
     backend_action_settings: Optional[Dict[Union[ActionType, str], List[ActionSettings]]] = \
         Field(default=None, description="Map of action configurations for the backend")
+    backend_cache_settings: Optional[Dict[Union[ActionType, str], ActionCacheSettings]] = \
+        Field(default=None, description="Map of action result cache configurations for the backend")
+    max_concurrent: Optional[int] = \
+        Field(default=None, description="Maximum actions of the backend running at once across the pipelines")
+    max_concurrent_actions: Optional[Dict[Union[ActionType, str], int]] = \
+        Field(default=None, description="Map of maximum runs at once across the pipelines per action of the backend")
+
+    def concurrency_limits(self, action_type: ActionType,
+                           action_name: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Getter for the concurrency limits of the backend and of the given action
+        :param action_type:
+        :param action_name:
+        :return:
+        """
+        action_limit = None
+        if self.max_concurrent_actions:
+            if action_name and action_name in self.max_concurrent_actions:
+                action_limit = self.max_concurrent_actions[action_name]
+            elif action_type in self.max_concurrent_actions:
+                action_limit = self.max_concurrent_actions[action_type]
+        return self.max_concurrent, action_limit
+
+    @staticmethod
+    def __settings_key(action: str) -> Union[ActionType, str]:
+        """
+        Settings of an action are keyed by its type if the name is an action type, otherwise by the action name
+        :param action:
+        :return:
+        """
+        return ActionType(action) if action in ActionType._value2member_map_ else action
 
     @staticmethod
     def create(source_dir: str,
@@ -42,17 +75,33 @@ class BackendSettings(BaseModel):
         if settings_yaml:
             settings: Dict[str, "BackendSettings"] = {}
             for backend in settings_yaml:
-                if 'actions' in settings_yaml[backend]:
-                    actions = {ActionType._value2member_map_[action] if action in ActionType._value2member_map_.keys() else action:
-                                   TypeAdapter(List[ActionSettings]).validate_python(action_settings)
-                               for action, action_settings in settings_yaml[backend]['actions'].items()}
-                    backend_settings = settings_yaml[backend]
+                backend_settings = settings_yaml[backend]
+                actions = None
+                cache = None
+                max_concurrent = None
+                max_concurrent_actions = None
+                if 'actions' in backend_settings:
+                    actions = {BackendSettings.__settings_key(action):
+                               TypeAdapter(List[ActionSettings]).validate_python(action_settings)
+                               for action, action_settings in backend_settings['actions'].items()}
                     del backend_settings['actions']
-                    settings[backend] = BackendSettings(backend_args=backend_settings,
-                                                        backend_action_settings=actions)
-                else:
-                    settings[backend] = BackendSettings(backend_args=settings_yaml[backend],
-                                                        backend_action_settings=None)
+                if 'cache' in backend_settings:
+                    cache = {BackendSettings.__settings_key(action):
+                             ActionCacheSettings.model_validate(cache_settings)
+                             for action, cache_settings in backend_settings['cache'].items()}
+                    del backend_settings['cache']
+                if 'max_concurrent' in backend_settings:
+                    max_concurrent = int(backend_settings['max_concurrent'])
+                    del backend_settings['max_concurrent']
+                if 'max_concurrent_actions' in backend_settings:
+                    max_concurrent_actions = {BackendSettings.__settings_key(action): int(limit)
+                                              for action, limit in backend_settings['max_concurrent_actions'].items()}
+                    del backend_settings['max_concurrent_actions']
+                settings[backend] = BackendSettings(backend_args=backend_settings,
+                                                    backend_action_settings=actions,
+                                                    backend_cache_settings=cache,
+                                                    max_concurrent=max_concurrent,
+                                                    max_concurrent_actions=max_concurrent_actions)
             return settings, settings_file_path
         return {}, settings_file_path
 
@@ -89,6 +138,7 @@ class BackendSettings(BaseModel):
         else:
             backend_model[key] = value
         settings[backend].backend_args = backend_model
+        backends_context.invalidate_backend_args(backend)
         if os.path.exists(settings_path):
             with open(settings_path, 'r+') as settings_file:
                 settings_yaml = yaml.load(settings_file, Loader=yaml.FullLoader)
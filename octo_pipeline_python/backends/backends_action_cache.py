@@ -0,0 +1,253 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+
+from octo_pipeline_python.actions.action_cache_settings import \
+    ActionCacheSettings
+from octo_pipeline_python.actions.action_result import (ActionResult,
+                                                        ActionResultCode)
+from octo_pipeline_python.pipeline.pipeline_action import PipelineAction
+from octo_pipeline_python.pipeline.pipeline_context import PipelineContext
+from octo_pipeline_python.utils.logger import logger
+from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
+
+if TYPE_CHECKING:
+    from octo_pipeline_python.backends.backend import Backend
+    from octo_pipeline_python.backends.backends_context import BackendsContext
+
+ACTION_CACHE_FOLDER = "actions"
+ACTION_CACHE_RESULT_FILE = "result.json"
+ACTION_CACHE_MANIFEST_FILE = "manifest.json"
+ACTION_CACHE_OUTPUTS_FOLDER = "outputs"
+ACTION_CACHE_ATTRIBUTES_FILE = "attributes.pickle"
+CACHEABLE_RESULT_CODES = (ActionResultCode.SUCCESS, ActionResultCode.PARTIAL_SUCCESS)
+# Directories of the pipeline the globs can be rooted at, as $source_dir/ or $working_dir/, the source one by default
+ACTION_CACHE_ROOTS = ("source_dir", "working_dir")
+# Backend the keys of the last runs of the actions are kept under, as pipeline tagged attributes
+ACTION_CACHE_KEYS_BACKEND = "action-cache"
+
+
+class CachedAttribute(NamedTuple):
+    tag: Optional[str]
+    backend: str
+    key: str
+    val: Any
+    exclude_from_db: bool
+
+
+class ActionCacheEntry(NamedTuple):
+    result: ActionResult
+    attributes: List[CachedAttribute]
+
+
+class BackendsActionCache:
+    """
+    Content addressed cache of action results
+    An action is cached only if its backend declares cache settings for it, the key is built from
+    the resolved backend args, the pipeline full version, the content of the declared inputs
+    and the keys of the actions it needs
+    """
+    def __init__(self, workspace_context: WorkspaceContext):
+        self.__cache_dir = os.path.join(workspace_context.working_dir, ".cache", ACTION_CACHE_FOLDER)
+        self.__enabled = True
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether the cache is used at all
+        :return:
+        """
+        return self.__enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool) -> None:
+        self.__enabled = enabled
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        Getter for the cache directory
+        :return:
+        """
+        return self.__cache_dir
+
+    @staticmethod
+    def __hash_file(path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    @staticmethod
+    def __split_pattern(pattern: str) -> Tuple[str, str]:
+        for root in ACTION_CACHE_ROOTS:
+            for prefix in (f"${root}/", f"${{{root}}}/"):
+                if pattern.startswith(prefix):
+                    return root, pattern[len(prefix):]
+        return ACTION_CACHE_ROOTS[0], pattern
+
+    @staticmethod
+    def __path(path: str, pipeline_context: PipelineContext) -> str:
+        root, relative_path = path.split("/", 1)
+        return os.path.join(getattr(pipeline_context, root), relative_path)
+
+    @staticmethod
+    def __glob_files(pipeline_context: PipelineContext, patterns: List[str]) -> List[str]:
+        """
+        Files matching the patterns, as paths relative to the directory of the pipeline they are rooted at
+        :param pipeline_context:
+        :param patterns:
+        :return:
+        """
+        files = set()
+        for pattern in patterns:
+            root, relative_pattern = BackendsActionCache.__split_pattern(pattern)
+            base_dir = getattr(pipeline_context, root)
+            for path in glob.glob(os.path.join(base_dir, relative_pattern), recursive=True):
+                if os.path.isfile(path):
+                    files.add(f"{root}/{os.path.relpath(path, base_dir)}")
+        return sorted(files)
+
+    @staticmethod
+    def cache_settings(backend: "Backend",
+                       action: PipelineAction,
+                       pipeline_context: PipelineContext,
+                       workspace_context: WorkspaceContext) -> Optional[ActionCacheSettings]:
+        """
+        Finds the cache settings of an action, pipeline settings take precedence over the workspace ones
+        :param backend:
+        :param action:
+        :param pipeline_context:
+        :param workspace_context:
+        :return:
+        """
+        settings = pipeline_context.backend_cache_settings_for_backend(backend,
+                                                                       action.action_type,
+                                                                       action.action_name)
+        if not settings:
+            settings = workspace_context.backend_cache_settings_for_backend(backend,
+                                                                            action.action_type,
+                                                                            action.action_name)
+        return settings
+
+    def key(self, backend: "Backend",
+            backends_context: "BackendsContext",
+            action: PipelineAction,
+            cache_settings: ActionCacheSettings,
+            pipeline_context: PipelineContext,
+            workspace_context: WorkspaceContext,
+            needs_keys: Optional[Dict[str, Dict[str, str]]] = None) -> str:
+        """
+        Computes the content address of an action
+        :param backend:
+        :param backends_context:
+        :param action:
+        :param cache_settings:
+        :param pipeline_context:
+        :param workspace_context:
+        :param needs_keys: Keys of the last runs of the needed actions per backend, so rebuilding them misses
+        :return:
+        """
+        args = backend.backend_args(backends_context, pipeline_context, workspace_context,
+                                    action.action_type, action.action_name)
+        inputs = {path: self.__hash_file(self.__path(path, pipeline_context))
+                  for path in self.__glob_files(pipeline_context, cache_settings.inputs)}
+        material = {
+            "backend": backend.backend_name(),
+            "action_type": action.action_type.value,
+            "action_name": action.action_name,
+            "pipeline": pipeline_context.name,
+            "full_version": pipeline_context.full_version,
+            "args": args.model_dump(mode="json") if args else None,
+            "inputs": inputs,
+            "outputs": cache_settings.outputs,
+            "needs": needs_keys or {}
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode()).hexdigest()
+
+    def load(self, key: str, pipeline_context: PipelineContext) -> Optional[ActionCacheEntry]:
+        """
+        Restores the outputs of a cached action and returns its result along with the attributes it set,
+        None on a miss
+        :param key:
+        :param pipeline_context:
+        :return:
+        """
+        entry_dir = os.path.join(self.__cache_dir, key)
+        result_path = os.path.join(entry_dir, ACTION_CACHE_RESULT_FILE)
+        manifest_path = os.path.join(entry_dir, ACTION_CACHE_MANIFEST_FILE)
+        if not os.path.exists(result_path) or not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, "r") as f:
+            manifest: Dict[str, Any] = json.load(f)
+        with open(result_path, "r") as f:
+            result = ActionResult.model_validate_json(f.read())
+        attributes: List[CachedAttribute] = []
+        attributes_path = os.path.join(entry_dir, ACTION_CACHE_ATTRIBUTES_FILE)
+        if os.path.exists(attributes_path):
+            with open(attributes_path, "rb") as f:
+                attributes = [CachedAttribute(*attribute) for attribute in pickle.load(f)]
+        for path, digest in manifest["outputs"].items():
+            target = self.__path(path, pipeline_context)
+            if os.path.exists(target) and self.__hash_file(target) == digest:
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(os.path.join(entry_dir, ACTION_CACHE_OUTPUTS_FOLDER, path), target)
+        return ActionCacheEntry(result, attributes)
+
+    def store(self, key: str,
+              result: ActionResult,
+              cache_settings: ActionCacheSettings,
+              pipeline_context: PipelineContext,
+              attributes: Optional[List[CachedAttribute]] = None) -> bool:
+        """
+        Stores the result of an action along with the manifest and content of its outputs,
+        and the attributes it set so they are set again when it is restored
+        :param key:
+        :param result:
+        :param cache_settings:
+        :param pipeline_context:
+        :param attributes:
+        :return:
+        """
+        if result.result_code not in CACHEABLE_RESULT_CODES:
+            return False
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        entry_dir = os.path.join(self.__cache_dir, key)
+        staging_dir = tempfile.mkdtemp(prefix=f".{key}.", dir=self.__cache_dir)
+        try:
+            outputs = {}
+            for path in self.__glob_files(pipeline_context, cache_settings.outputs):
+                source = self.__path(path, pipeline_context)
+                target = os.path.join(staging_dir, ACTION_CACHE_OUTPUTS_FOLDER, path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(source, target)
+                outputs[path] = self.__hash_file(target)
+            with open(os.path.join(staging_dir, ACTION_CACHE_RESULT_FILE), "w") as f:
+                f.write(result.model_dump_json())
+            with open(os.path.join(staging_dir, ACTION_CACHE_MANIFEST_FILE), "w") as f:
+                json.dump({"outputs": outputs}, f, indent=2, sort_keys=True)
+            with open(os.path.join(staging_dir, ACTION_CACHE_ATTRIBUTES_FILE), "wb") as f:
+                pickle.dump([tuple(attribute) for attribute in attributes or []], f, protocol=pickle.HIGHEST_PROTOCOL)
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(staging_dir, entry_dir)
+            return True
+        finally:
+            if os.path.exists(staging_dir):
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def clear(self) -> None:
+        """
+        Removes all the cached results
+        :return:
+        """
+        if os.path.exists(self.__cache_dir):
+            logger.info(f"Clearing action cache [{self.__cache_dir}]")
+            shutil.rmtree(self.__cache_dir, ignore_errors=True)
@@ -0,0 +1,118 @@
+from threading import RLock
+from typing import Any, Dict, Optional, Set, Tuple
+
+from octo_pipeline_python.backends.backends_database import BackendsDatabase
+from octo_pipeline_python.backends.backends_registry import BackendsRegistry
+from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
+
+ATTRIBUTES_DB_KEY = "backends_attributes"
+AttributeKey = Tuple[str, str]
+
+
+class BackendsAttributesShard:
+    """
+    Attributes of a single tag (usually a pipeline), stored on its own DB file
+    Reads go straight to the dict, only writes and persistence take the shard lock
+    """
+    def __init__(self, workspace_context: WorkspaceContext, tag: Optional[str]):
+        self.__tag = tag
+        self.__lock = RLock()
+        self.__attributes: Dict[Any, Any] = {}
+        self.__excluded: Set[AttributeKey] = set()
+        self.__changed: Set[AttributeKey] = set()
+        self.__dirty = False
+        self.__db = BackendsDatabase(workspace_context, tag)
+        if self.__db.contains(ATTRIBUTES_DB_KEY):
+            self.__attributes = dict(self.__db.get(ATTRIBUTES_DB_KEY))
+
+    @property
+    def tag(self) -> Optional[str]:
+        """
+        Getter for the tag of the shard
+        :return:
+        """
+        return self.__tag
+
+    @property
+    def attributes(self) -> Dict[AttributeKey, Any]:
+        """
+        Getter for the attributes of the shard
+        :return:
+        """
+        return self.__attributes
+
+    def set(self, key: AttributeKey, val: Any, exclude_from_db: bool = False, persist: bool = True) -> None:
+        """
+        Sets an attribute, persisting the shard right away unless asked not to
+        :param key:
+        :param val:
+        :param exclude_from_db:
+        :param persist:
+        :return:
+        """
+        with self.__lock:
+            self.__attributes[key] = val
+            if exclude_from_db:
+                self.__excluded.add(key)
+                return
+            self.__excluded.discard(key)
+            self.__changed.add(key)
+            self.__dirty = True
+            if persist:
+                self.commit()
+
+    def changes(self) -> Dict[AttributeKey, Any]:
+        """
+        Attributes set on the shard since it was loaded, excluding the ones that are not stored
+        :return:
+        """
+        with self.__lock:
+            return {key: self.__attributes[key] for key in self.__changed if key in self.__attributes}
+
+    def commit(self, flush: bool = False) -> None:
+        """
+        Commits the shard attributes to its DB
+        :param flush:
+        :return:
+        """
+        with self.__lock:
+            if not self.__dirty:
+                return
+            self.__dirty = False
+            self.__db.commit(ATTRIBUTES_DB_KEY, {
+                x: y for x, y in self.__attributes.items() if x not in self.__excluded
+            }, flush=flush)
+
+    def pop_legacy_attributes(self) -> Dict[str, Any]:
+        """
+        Removes and returns the attributes that are still stored with the old flat string keys
+        :return:
+        """
+        with self.__lock:
+            legacy = {x: y for x, y in self.__attributes.items() if isinstance(x, str)}
+            for key in legacy:
+                del self.__attributes[key]
+            if legacy:
+                self.__dirty = True
+            return legacy
+
+    @staticmethod
+    def legacy_backend_names() -> Set[str]:
+        """
+        Names the backends may have been stored with, the registered backend names they were keyed by
+        :return:
+        """
+        return BackendsRegistry.names()
+
+    @staticmethod
+    def split_legacy_key(path: str, backends: Set[str]) -> Tuple[Optional[str], AttributeKey]:
+        """
+        Splits an old "{tag}.{backend}.{key}" or "{backend}.{key}" key into the tag and the attribute key
+        :param path:
+        :param backends:
+        :return:
+        """
+        parts = path.split('.')
+        if len(parts) >= 3 and parts[1] in backends:
+            return parts[0], (parts[1], '.'.join(parts[2:]))
+        return None, (parts[0], '.'.join(parts[1:]))
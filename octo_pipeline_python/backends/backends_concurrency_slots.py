@@ -0,0 +1,81 @@
+import os
+import re
+import time
+from threading import BoundedSemaphore, local
+from typing import Final, List, Optional, Tuple
+
+from octo_pipeline_python.utils.logger import logger
+
+DEFAULT_SLOT_POLL_INTERVAL: Final[float] = 0.5
+
+
+class BackendsConcurrencySlots:
+    """
+    Limits the concurrent runs of a backend or an action, across the threads and the processes of the workspace
+    The threads of a process wait on a semaphore, and each thread holding it takes one of the slot lock files,
+    so worker processes and other octo processes running on the same workspace share the same limit
+    Slots are held with flock, so the slots of a crashed process are freed by the system
+    """
+    def __init__(self, working_dir: str, key: Tuple[str, ...], limit: int):
+        self.__name = '.'.join(key)
+        self.__semaphore = BoundedSemaphore(limit)
+        # Slot files held by each thread
+        self.__held = local()
+        slots_dir = os.path.join(working_dir, ".cache", ".slots")
+        file_name = re.sub(r"[^\w.-]", "_", self.__name)
+        self.__slots_paths: List[str] = [os.path.join(slots_dir, f"{file_name}.{idx}.lock") for idx in range(limit)]
+        try:
+            import fcntl  # noqa: F401
+            os.makedirs(slots_dir, exist_ok=True)
+            self.__shared = True
+        except (ImportError, OSError) as e:
+            logger.warning(f"Concurrency limit of [{self.__name}] is kept per process only - [{str(e)}]")
+            self.__shared = False
+
+    @property
+    def name(self) -> str:
+        """
+        Getter for the name of the limited backend or action
+        :return:
+        """
+        return self.__name
+
+    def __try_acquire_slot(self) -> Optional[int]:
+        import fcntl
+        for path in self.__slots_paths:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except OSError:
+                os.close(fd)
+        return None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Takes a slot, waiting for one to be freed if blocking
+        :param blocking:
+        :return: Whether a slot was taken
+        """
+        if not self.__semaphore.acquire(blocking=blocking):
+            return False
+        if self.__shared:
+            while (fd := self.__try_acquire_slot()) is None:
+                if not blocking:
+                    self.__semaphore.release()
+                    return False
+                time.sleep(DEFAULT_SLOT_POLL_INTERVAL)
+            self.__held.fds = getattr(self.__held, "fds", []) + [fd]
+        return True
+
+    def release(self) -> None:
+        """
+        Frees the last slot taken by the current thread
+        :return:
+        """
+        if self.__shared:
+            import fcntl
+            fd = self.__held.fds.pop()
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        self.__semaphore.release()
@@ -1,32 +1,53 @@
 import os
 import traceback
-from collections import defaultdict
-from threading import RLock
-from typing import Any, Dict, List, Optional
+from contextlib import ExitStack, contextmanager
+from threading import Event, RLock, Thread, local
+from typing import Any, Dict, Final, Iterator, List, Optional, Tuple
 
+from octo_pipeline_python.actions.action_cache_settings import \
+    ActionCacheSettings
 from octo_pipeline_python.actions.action_result import (ActionResult,
                                                         ActionResultCode)
 from octo_pipeline_python.backends.backend_auth_details import \
     BackendAuthDetails
 from octo_pipeline_python.backends.backend_description import \
     BackendDescription
-from octo_pipeline_python.backends.backends_database import BackendsDatabase
+from octo_pipeline_python.backends.backends_action_cache import (
+    ACTION_CACHE_KEYS_BACKEND, CACHEABLE_RESULT_CODES, BackendsActionCache,
+    CachedAttribute)
+from octo_pipeline_python.backends.backends_attributes import \
+    BackendsAttributesShard
+from octo_pipeline_python.backends.backends_concurrency_slots import \
+    BackendsConcurrencySlots
 from octo_pipeline_python.pipeline.pipeline_action import PipelineAction
 from octo_pipeline_python.pipeline.pipeline_context import PipelineContext
 from octo_pipeline_python.utils.logger import logger
+from octo_pipeline_python.utils.metrics import Metrics
+from octo_pipeline_python.utils.tracer import Tracer
 from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
 
+DEFAULT_ATTRIBUTES_FLUSH_INTERVAL: Final[float] = 5.0
+
 
 class BackendsContext:
-    def __init__(self, workspace_context: WorkspaceContext):
+    def __init__(self, workspace_context: WorkspaceContext, persist_attributes: bool = True):
         from octo_pipeline_python.backends.backend import Backend
         self.__backends: Dict[str, Backend] = {}
-        self.__backends_attributes: Dict[str, Any] = {}
-        self.__backends_attributes_exclude: Dict[str, bool] = defaultdict(bool)
+        self.__workspace_context = workspace_context
+        self.__persist_attributes = persist_attributes
         self.__backends_attrs_lock = RLock()
-        self.__db = BackendsDatabase(workspace_context)
-        if self.__db.contains("backends_attributes"):
-            self.__backends_attributes = self.__db.get("backends_attributes")
+        self.__batch_depth = 0
+        self.__batch_flusher: Optional[Thread] = None
+        self.__batch_flusher_stop = Event()
+        self.__action_cache = BackendsActionCache(workspace_context)
+        # Attributes set by the action running on each thread, cached along with its result
+        self.__recorded_attributes = local()
+        self.__concurrency_slots: Dict[Tuple[str, ...], BackendsConcurrencySlots] = {}
+        self.__shards: Dict[Optional[str], BackendsAttributesShard] = {
+            None: BackendsAttributesShard(workspace_context, None)
+        }
+        if persist_attributes:
+            self.__migrate_legacy_attributes()
 
     @staticmethod
     def print_result(result: ActionResult, pipeline_context: PipelineContext) -> None:
@@ -42,11 +63,83 @@ class BackendsContext:
         for error in result.result:
             logger.warning(f"[{pipeline_context.name}] {error}")
 
-    def __commit_to_database(self):
-        self.__db.commit("backends_attributes", {
-            x: y for x, y in self.__backends_attributes.items()
-            if not self.__backends_attributes_exclude[x]
-        })
+    def __shard(self, tag: Optional[str]) -> BackendsAttributesShard:
+        shard = self.__shards.get(tag)
+        if shard:
+            return shard
+        self.__backends_attrs_lock.acquire()
+        try:
+            if tag not in self.__shards:
+                self.__shards[tag] = BackendsAttributesShard(self.__workspace_context, tag)
+            return self.__shards[tag]
+        finally:
+            self.__backends_attrs_lock.release()
+
+    def __migrate_legacy_attributes(self) -> None:
+        legacy = self.__shards[None].pop_legacy_attributes()
+        if not legacy:
+            return
+        logger.info(f"Migrating [{len(legacy)}] backends attributes to tagged shards")
+        backends = BackendsAttributesShard.legacy_backend_names()
+        for path, val in legacy.items():
+            tag, key = BackendsAttributesShard.split_legacy_key(path, backends)
+            self.__shard(tag).set(key, val, persist=False)
+        for shard in self.__shards.values():
+            shard.commit(flush=True)
+
+    def __batch_flusher_thread(self, flush_interval: float, stop: Event) -> None:
+        while not stop.wait(flush_interval):
+            self.flush_attributes()
+
+    def flush_attributes(self) -> None:
+        """
+        Persists the attributes written during a batch, if any
+        :return:
+        """
+        if not self.__persist_attributes:
+            return
+        for shard in list(self.__shards.values()):
+            shard.commit(flush=True)
+
+    @contextmanager
+    def batch(self, flush_interval: Optional[float] = DEFAULT_ATTRIBUTES_FLUSH_INTERVAL) -> Iterator["BackendsContext"]:
+        """
+        Batches the attributes persistence, attributes writes only update the memory
+        and are persisted once when the batch ends, and periodically in the background if an interval is given
+        Batches can be nested, only the outermost batch persists the attributes
+        :param flush_interval:
+        :return:
+        """
+        self.__backends_attrs_lock.acquire()
+        try:
+            self.__batch_depth += 1
+            if self.__batch_depth == 1 and flush_interval:
+                self.__batch_flusher_stop = Event()
+                self.__batch_flusher = Thread(target=self.__batch_flusher_thread,
+                                              args=(flush_interval, self.__batch_flusher_stop),
+                                              name="backends-attributes-flusher",
+                                              daemon=True)
+                self.__batch_flusher.start()
+        finally:
+            self.__backends_attrs_lock.release()
+        try:
+            yield self
+        finally:
+            flusher: Optional[Thread] = None
+            self.__backends_attrs_lock.acquire()
+            try:
+                self.__batch_depth -= 1
+                outermost = self.__batch_depth == 0
+                if outermost:
+                    flusher = self.__batch_flusher
+                    self.__batch_flusher = None
+                    self.__batch_flusher_stop.set()
+            finally:
+                self.__backends_attrs_lock.release()
+            if outermost:
+                if flusher:
+                    flusher.join()
+                self.flush_attributes()
 
     def initialize_backend(self, backend: str, workspace_context: WorkspaceContext) -> bool:
         """
@@ -55,18 +148,19 @@ class BackendsContext:
         :param workspace_context:
         :return: bool
         """
-        import octo_pipeline_python.backends.backends
-        from octo_pipeline_python.backends.backend import Backend
+        from octo_pipeline_python.backends.backends_registry import \
+            BackendsRegistry
         self.__backends_attrs_lock.acquire()
         try:
             if backend in self.__backends:
                 return True
             # Initialize the backend only if it exists as part of one of the actions
             logger.info(f"Initializing backend [{backend}]")
-            backend_class = [b for b in Backend.__subclasses__() if b.backend_name() == backend]
-            if len(backend_class) != 1:
+            backend_class = BackendsRegistry.backend_class(backend)
+            if not backend_class:
                 return False
-            self.__backends[backend] = backend_class[0]()
+            self.__backends[backend] = backend_class()
+            self.__backends[backend].invalidate_description()
             self.__backends[backend].initialize_backend(self, workspace_context)
             return True
         finally:
@@ -119,25 +213,167 @@ class BackendsContext:
             os.makedirs(workspace_context.working_dir)
         if not os.path.exists(pipeline_context.working_dir):
             os.makedirs(pipeline_context.working_dir)
-        result: Optional[ActionResult] = None
-        try:
-            # Execute the action for the backend
-            result = self.__backends[backend]. \
-                execute_backend_pipeline_action(action.action_type,
-                                                self,
-                                                pipeline_context,
-                                                workspace_context,
-                                                action.action_name)
-            if result.result_code == ActionResultCode.FAILURE:
-                logger.error(f"[{pipeline_context.name}] Failed running action "
-                             f"[{action.action_type}] on backend [{backend}]")
-                BackendsContext.print_result(result, pipeline_context)
+        with Tracer.span(f"{action.action_name or action.action_type.value} [{backend}]", "action",
+                         pipeline=pipeline_context.name, action_type=action.action_type.value,
+                         action_name=action.action_name, backend=backend) as span:
+            result: Optional[ActionResult] = None
+            cache_key, cache_settings = self.__action_cache_key(backend, action, pipeline_context, workspace_context)
+            if cache_key:
+                Metrics.inc("octo_action_cache_lookups_total", backend=backend)
+                try:
+                    entry = self.__action_cache.load(cache_key, pipeline_context)
+                    if entry:
+                        result = entry.result
+                        for attribute in entry.attributes:
+                            self.add_attribute(attribute.backend, attribute.key, attribute.val,
+                                               attribute.tag, attribute.exclude_from_db)
+                        self.__record_action_key(backend, action, pipeline_context, cache_key)
+                        Metrics.inc("octo_action_cache_hits_total", backend=backend)
+                        logger.info(f"[{pipeline_context.name}] Restored cached result of action "
+                                    f"[{action.action_type}] on backend [{backend}]")
+                        span["cached"] = True
+                        span["result"] = result.result_code.name
+                        return result
+                except Exception as e:
+                    logger.warning(f"[{pipeline_context.name}] Could not restore cached result of action "
+                                   f"[{action.action_type}] on backend [{backend}] - [{str(e)}]")
+            try:
+                with ExitStack() as concurrency_slots:
+                    for slots in self.__concurrency_slots_for_action(backend, action, pipeline_context,
+                                                                     workspace_context):
+                        if not slots.acquire(blocking=False):
+                            logger.info(f"[{pipeline_context.name}] Waiting for a free [{slots.name}] slot")
+                            with Tracer.span(f"Waiting for [{slots.name}]", "wait",
+                                             pipeline=pipeline_context.name):
+                                slots.acquire()
+                        concurrency_slots.callback(slots.release)
+                    recorded_attributes: List[CachedAttribute] = []
+                    self.__recorded_attributes.attributes = recorded_attributes
+                    try:
+                        # Execute the action for the backend
+                        result = self.__backends[backend]. \
+                            execute_backend_pipeline_action(action.action_type,
+                                                            self,
+                                                            pipeline_context,
+                                                            workspace_context,
+                                                            action.action_name)
+                    finally:
+                        self.__recorded_attributes.attributes = None
+                self.__record_action_key(backend, action, pipeline_context,
+                                         cache_key if result.result_code in CACHEABLE_RESULT_CODES else None)
+                span["result"] = result.result_code.name
+                if result.result_code == ActionResultCode.FAILURE:
+                    logger.error(f"[{pipeline_context.name}] Failed running action "
+                                 f"[{action.action_type}] on backend [{backend}]")
+                    BackendsContext.print_result(result, pipeline_context)
+                elif cache_key and cache_settings:
+                    try:
+                        self.__action_cache.store(cache_key, result, cache_settings, pipeline_context,
+                                                  recorded_attributes)
+                    except Exception as e:
+                        logger.warning(f"[{pipeline_context.name}] Could not cache result of action "
+                                       f"[{action.action_type}] on backend [{backend}] - [{str(e)}]")
+                return result
+            except Exception as e:
+                logger.error(f"[{pipeline_context.name}] Error occurred while running action "
+                             f"[{action.action_type}] from backend [{backend}] - [{str(e)}]")
+                logger.error(traceback.format_exc())
+                self.__record_action_key(backend, action, pipeline_context, None)
             return result
+
+    def __record_action_key(self, backend: str,
+                            action: PipelineAction,
+                            pipeline_context: PipelineContext,
+                            cache_key: Optional[str]) -> None:
+        """
+        Keeps the cache key of the last run of an action, none if it failed or is not cached,
+        so the keys of the actions needing it change once it runs on other inputs
+        :param backend:
+        :param action:
+        :param pipeline_context:
+        :param cache_key:
+        :return:
+        """
+        key = f"{action.action_id}/{backend}"
+        if self.attribute(ACTION_CACHE_KEYS_BACKEND, key, tag=pipeline_context.name) != cache_key:
+            self.add_attribute(ACTION_CACHE_KEYS_BACKEND, key, cache_key, tag=pipeline_context.name)
+
+    def __needs_keys(self, action: PipelineAction, pipeline_context: PipelineContext) -> Dict[str, Dict[str, str]]:
+        """
+        Cache keys of the last runs of the actions needed by an action, per backend
+        :param action:
+        :param pipeline_context:
+        :return:
+        """
+        needs_keys: Dict[str, Dict[str, str]] = {need: {} for need in action.needs or []}
+        if not needs_keys:
+            return needs_keys
+        for (backend, key), val in list(self.__shard(pipeline_context.name).attributes.items()):
+            if backend == ACTION_CACHE_KEYS_BACKEND and val:
+                action_id, _, action_backend = key.rpartition("/")
+                if action_id in needs_keys:
+                    needs_keys[action_id][action_backend] = val
+        return needs_keys
+
+    def __concurrency_slots_for_action(self, backend: str,
+                                       action: PipelineAction,
+                                       pipeline_context: PipelineContext,
+                                       workspace_context: WorkspaceContext) -> List[BackendsConcurrencySlots]:
+        """
+        Slots limiting the concurrent runs of the action across the pipelines, workspace settings take precedence
+        Always ordered with the action first and the backend second, so slots are never taken in opposite orders
+        :param backend:
+        :param action:
+        :param pipeline_context:
+        :param workspace_context:
+        :return:
+        """
+        backend_limit, action_limit = workspace_context.backend_concurrency_limits_for_backend(
+            self.__backends[backend], action.action_type, action.action_name)
+        pipeline_backend_limit, pipeline_action_limit = pipeline_context.backend_concurrency_limits_for_backend(
+            self.__backends[backend], action.action_type, action.action_name)
+        limits = [((backend, action.action_name or action.action_type.value), action_limit or pipeline_action_limit),
+                  ((backend,), backend_limit or pipeline_backend_limit)]
+        concurrency_slots = []
+        for key, limit in limits:
+            if not limit or limit < 1:
+                continue
+            slots = self.__concurrency_slots.get(key)
+            if not slots:
+                with self.__backends_attrs_lock:
+                    if key not in self.__concurrency_slots:
+                        self.__concurrency_slots[key] = \
+                            BackendsConcurrencySlots(workspace_context.working_dir, key, limit)
+                    slots = self.__concurrency_slots[key]
+            concurrency_slots.append(slots)
+        return concurrency_slots
+
+    def __action_cache_key(self, backend: str,
+                           action: PipelineAction,
+                           pipeline_context: PipelineContext,
+                           workspace_context: WorkspaceContext) -> Tuple[Optional[str], Optional[ActionCacheSettings]]:
+        """
+        Computes the action cache key, if the action is cacheable at all
+        :param backend:
+        :param action:
+        :param pipeline_context:
+        :param workspace_context:
+        :return:
+        """
+        if not self.__action_cache.enabled:
+            return None, None
+        try:
+            cache_settings = BackendsActionCache.cache_settings(self.__backends[backend], action,
+                                                                pipeline_context, workspace_context)
+            if not cache_settings:
+                return None, None
+            return self.__action_cache.key(self.__backends[backend], self, action, cache_settings,
+                                           pipeline_context, workspace_context,
+                                           self.__needs_keys(action, pipeline_context)), cache_settings
         except Exception as e:
-            logger.error(f"[{pipeline_context.name}] Error occurred while running action "
-                         f"[{action.action_type}] from backend [{backend}] - [{str(e)}]")
-            logger.error(traceback.format_exc())
-        return result
+            logger.warning(f"[{pipeline_context.name}] Could not compute cache key of action "
+                           f"[{action.action_type}] on backend [{backend}] - [{str(e)}]")
+        return None, None
 
     def cleanup_pipeline_backend_action(self, backend: str,
                                         action: PipelineAction,
@@ -204,7 +440,16 @@ class BackendsContext:
             if not self.initialize_backend(backend, workspace_context):
                 logger.error(f"Could not initialize backend [{backend}]")
                 return None
-        return self.__backends[backend].describe_backend(self, workspace_context)
+        return self.__backends[backend].description(self, workspace_context)
+
+    def invalidate_backend_args(self, backend: str) -> None:
+        """
+        Drops the resolved args of a backend, if initialized
+        :param backend:
+        :return:
+        """
+        if backend in self.__backends:
+            self.__backends[backend].invalidate_backend_args()
 
     def backend_context_attribute(self, backend: str,
                                   key: str,
@@ -243,19 +488,31 @@ class BackendsContext:
                     return False
         return True
 
+    @property
+    def action_cache(self) -> BackendsActionCache:
+        """
+        Getter for the action result cache
+        :return:
+        """
+        return self.__action_cache
+
     @property
     def backends_attributes(self) -> Dict[str, Any]:
         """
-        Getter for the attributes
+        Getter for the attributes of the loaded shards, flattened to "{tag}.{backend}.{key}" keys
         :return:
         """
-        return self.__backends_attributes
+        return {
+            (f"{tag}.{backend}.{key}" if tag else f"{backend}.{key}"): val
+            for tag, shard in list(self.__shards.items())
+            for (backend, key), val in list(shard.attributes.items())
+        }
 
     def add_attribute(self,
                       backend: str,
                       key: str,
                       val: Any,
-                      tag: str = None,
+                      tag: Optional[str] = None,
                       exclude_from_db: bool = False) -> None:
         """
         Add a new attribute to the context, with possible tagging
@@ -266,15 +523,31 @@ class BackendsContext:
         :param exclude_from_db:
         :return:
         """
-        self.__backends_attrs_lock.acquire()
-        path = f"{backend}.{key}"
-        if tag:
-            path = f"{tag}.{path}"
-        self.__backends_attributes[path] = val
-        self.__backends_attributes_exclude[path] = exclude_from_db
-        if not exclude_from_db:
-            self.__commit_to_database()
-        self.__backends_attrs_lock.release()
+        self.__shard(tag or None).set((backend, key), val, exclude_from_db,
+                                      persist=self.__persist_attributes and self.__batch_depth == 0)
+        recorded_attributes: Optional[List[CachedAttribute]] = getattr(self.__recorded_attributes, "attributes", None)
+        if recorded_attributes is not None:
+            recorded_attributes.append(CachedAttribute(tag or None, backend, key, val, exclude_from_db))
+
+    def attributes_changes(self) -> Dict[Optional[str], Dict[Tuple[str, str], Any]]:
+        """
+        Attributes set through this context per tag, to be merged into another context
+        :return:
+        """
+        return {tag: changes for tag, shard in list(self.__shards.items()) if (changes := shard.changes())}
+
+    def merge_attributes(self, changes: Dict[Optional[str], Dict[Tuple[str, str], Any]]) -> None:
+        """
+        Merges attributes set through another context, usually of a worker process
+        :param changes:
+        :return:
+        """
+        for tag, attributes in changes.items():
+            shard = self.__shard(tag)
+            for key, val in attributes.items():
+                shard.set(key, val, persist=False)
+            if self.__persist_attributes and self.__batch_depth == 0:
+                shard.commit()
 
     def attribute(self, backend: str, key: str, tag: str = None) -> Any:
         """
@@ -284,16 +557,7 @@ class BackendsContext:
         :param tag:
         :return:
         """
-        self.__backends_attrs_lock.acquire()
-        path = f"{backend}.{key}"
-        if tag:
-            path = f"{tag}.{path}"
-        try:
-            if path in self.__backends_attributes:
-                return self.__backends_attributes[path]
-            return None
-        finally:
-            self.__backends_attrs_lock.release()
+        return self.__shard(tag or None).attributes.get((backend, key))
 
     def has_attribute(self, backend: str, key: str, tag: str = None) -> bool:
         """
@@ -303,14 +567,7 @@ class BackendsContext:
         :param tag:
         :return:
         """
-        self.__backends_attrs_lock.acquire()
-        path = f"{backend}.{key}"
-        if tag:
-            path = f"{tag}.{path}"
-        try:
-            return path in self.__backends_attributes
-        finally:
-            self.__backends_attrs_lock.release()
+        return (backend, key) in self.__shard(tag or None).attributes
 
     def source_dir(self,
                    backend: "Backend",
@@ -340,6 +597,6 @@ class BackendsContext:
 
         # Check if it context of source in working dir
         elif os.path.exists(os.path.join(pipeline_context.working_dir, 'source')) and \
-                ActionType.Source.value in backend.describe_backend(self, workspace_context).actions:
+                backend.description(self, workspace_context).action(ActionType.Source) is not None:
             conan_source_dir = os.path.join(pipeline_context.working_dir, 'source')
         return conan_source_dir
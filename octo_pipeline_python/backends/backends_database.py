@@ -1,7 +1,10 @@
+from typing import Optional
+
 from octo_pipeline_python.common.database import Database
 from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
 
 
 class BackendsDatabase(Database):
-    def __init__(self, context: WorkspaceContext):
-        super().__init__(context.working_dir, context.name, f"{context.name}.backends")
+    def __init__(self, context: WorkspaceContext, tag: Optional[str] = None):
+        prefix = f"{context.name}.backends.{tag}" if tag else f"{context.name}.backends"
+        super().__init__(context.working_dir, context.name, prefix)
@@ -0,0 +1,122 @@
+import importlib
+import importlib.metadata
+import inspect
+from threading import RLock
+from typing import TYPE_CHECKING, Dict, Final, Optional, Set, Type
+
+from octo_pipeline_python.utils.logger import logger
+
+if TYPE_CHECKING:
+    from octo_pipeline_python.backends.backend import Backend
+
+BACKENDS_ENTRY_POINTS_GROUP: Final[str] = "octo_pipeline_python.backends"
+BACKENDS_MANIFEST: Final[Dict[str, str]] = {
+    "ansible": "octo_pipeline_python.backends.ansible.ansible_backend",
+    "blackduck": "octo_pipeline_python.backends.blackduck.blackduck_backend",
+    "cdk": "octo_pipeline_python.backends.cdk.cdk_backend",
+    "cfn-nag": "octo_pipeline_python.backends.cfn_nag.cfn_nag_backend",
+    "clang": "octo_pipeline_python.backends.clang.clang_backend",
+    "conan": "octo_pipeline_python.backends.conan.conan_backend",
+    "cppcheck": "octo_pipeline_python.backends.cppcheck.cppcheck_backend",
+    "docker": "octo_pipeline_python.backends.docker.docker_backend",
+    "file": "octo_pipeline_python.backends.file.file_backend",
+    "git": "octo_pipeline_python.backends.git.git_backend",
+    "golang": "octo_pipeline_python.backends.golang.golang_backend",
+    "gpg": "octo_pipeline_python.backends.gpg.gpg_backend",
+    "patch": "octo_pipeline_python.backends.patch.patch_backend",
+    "perl": "octo_pipeline_python.backends.perl.perl_backend",
+    "pipenv": "octo_pipeline_python.backends.pipenv.pipenv_backend",
+    "pytest": "octo_pipeline_python.backends.pytest.pytest_backend",
+    "s3": "octo_pipeline_python.backends.s3.s3_backend",
+    "setuptools": "octo_pipeline_python.backends.setuptools.setuptools_backend",
+    "snyk": "octo_pipeline_python.backends.snyk.snyk_backend",
+    "tar": "octo_pipeline_python.backends.tar.tar_backend",
+    "yaml": "octo_pipeline_python.backends.yaml.yaml_backend",
+}
+
+
+class BackendsRegistry:
+    """
+    Maps backend names to the modules implementing them, importing a backend only once it is used
+    Backends come from the static manifest, from the entry points of external packages,
+    and from any Backend subclass already imported by other means
+    """
+    __lock = RLock()
+    __modules: Optional[Dict[str, str]] = None
+    __classes: Dict[str, Type["Backend"]] = {}
+
+    @staticmethod
+    def __backend_modules() -> Dict[str, str]:
+        if BackendsRegistry.__modules is None:
+            modules = dict(BACKENDS_MANIFEST)
+            try:
+                for entry_point in importlib.metadata.entry_points(group=BACKENDS_ENTRY_POINTS_GROUP):
+                    modules[entry_point.name] = entry_point.value.split(":")[0]
+            except Exception as e:
+                logger.warning(f"Could not load backends entry points - [{str(e)}]")
+            BackendsRegistry.__modules = modules
+        return BackendsRegistry.__modules
+
+    @staticmethod
+    def __loaded_backend_class(name: str) -> Optional[Type["Backend"]]:
+        from octo_pipeline_python.backends.backend import Backend
+        for backend_class in Backend.__subclasses__():
+            if backend_class.backend_name() == name:
+                return backend_class
+        return None
+
+    @staticmethod
+    def names() -> Set[str]:
+        """
+        Names of all the known backends, whether or not their modules import
+        :return:
+        """
+        return {name for name in BackendsRegistry.__backend_modules() if BackendsRegistry.has_backend(name)}
+
+    @staticmethod
+    def has_backend(name: str) -> bool:
+        """
+        Checks if a backend exists by its name alone, from the manifest, the entry points or the loaded classes
+        Nothing is imported or located, so a backend whose module fails to import is only found out once it is used
+        :param name:
+        :return:
+        """
+        if name in BackendsRegistry.__classes or name in BackendsRegistry.__backend_modules():
+            return True
+        return BackendsRegistry.__loaded_backend_class(name) is not None
+
+    @staticmethod
+    def backend_class(name: str) -> Optional[Type["Backend"]]:
+        """
+        Getter for the backend class, importing its module on first use
+        :param name:
+        :return:
+        """
+        backend_class = BackendsRegistry.__classes.get(name)
+        if backend_class:
+            return backend_class
+        from octo_pipeline_python.backends.backend import Backend
+        with BackendsRegistry.__lock:
+            if name in BackendsRegistry.__classes:
+                return BackendsRegistry.__classes[name]
+            module_name = BackendsRegistry.__backend_modules().get(name)
+            if module_name and BackendsRegistry.has_backend(name):
+                module = importlib.import_module(module_name)
+                for _, member in inspect.getmembers(module, inspect.isclass):
+                    if issubclass(member, Backend) and member is not Backend and member.backend_name() == name:
+                        backend_class = member
+                        break
+            if not backend_class:
+                backend_class = BackendsRegistry.__loaded_backend_class(name)
+            if backend_class:
+                BackendsRegistry.__classes[name] = backend_class
+            return backend_class
+
+    @staticmethod
+    def load_all() -> None:
+        """
+        Imports all the available backends
+        :return:
+        """
+        for name in BackendsRegistry.names():
+            BackendsRegistry.backend_class(name)
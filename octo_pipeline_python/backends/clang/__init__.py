@@ -1 +0,0 @@
-from octo_pipeline_python.backends.clang.clang_backend import ClangBackend
@@ -1 +0,0 @@
-from octo_pipeline_python.backends.conan.conan_backend import ConanBackend
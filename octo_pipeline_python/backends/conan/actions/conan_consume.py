@@ -50,7 +50,8 @@ class ConanConsume(Action):
         from conans.client import conan_api
         from conans.errors import ConanException
 
-        from octo_pipeline_python.backends.conan import ConanBackend
+        from octo_pipeline_python.backends.conan.conan_backend import \
+            ConanBackend
 
         # Execute conan consumption
         conan_client: conan_api.Conan = backends_context.attribute(backend.backend_name(), "conan_client")
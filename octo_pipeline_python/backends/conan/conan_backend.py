@@ -9,7 +9,8 @@ from overrides import overrides
 
 from octo_pipeline_python.actions.action_result import ActionResultCode
 from octo_pipeline_python.actions.action_type import ActionType
-from octo_pipeline_python.backends.backend import Backend
+from octo_pipeline_python.backends.backend import (DEFAULT_RESOURCE_WEIGHT,
+                                                   Backend)
 from octo_pipeline_python.backends.backend_auth_details import \
     BackendAuthDetails
 from octo_pipeline_python.backends.backend_description import \
@@ -30,6 +31,7 @@ from octo_pipeline_python.utils.logger import logger
 from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
 
 TAG = "conan"
+CONAN_BUILD_RESOURCE_WEIGHT = 4
 
 ConanConfigurationDict = Dict[ConanConfiguration, Dict[str, Any]]
 
@@ -348,6 +350,13 @@ class ConanBackend(Backend):
     def backend_name() -> str:
         return TAG
 
+    @staticmethod
+    def resource_weight(action_type: ActionType) -> int:
+        # Builds and unit tests run make with its own parallelism
+        if action_type in (ActionType.Build, ActionType.UnitTests):
+            return CONAN_BUILD_RESOURCE_WEIGHT
+        return DEFAULT_RESOURCE_WEIGHT
+
     @overrides
     def initialize_backend_pipeline_action(self,
                                            action_type: ActionType,
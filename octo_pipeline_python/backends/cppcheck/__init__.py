@@ -1,2 +0,0 @@
-from octo_pipeline_python.backends.cppcheck.cppcheck_backend import \
-    CppCheckBackend
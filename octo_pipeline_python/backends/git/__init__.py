@@ -1 +0,0 @@
-from octo_pipeline_python.backends.git.git_backend import GitBackend
@@ -12,6 +12,7 @@ from octo_pipeline_python.backends.backend import Backend
 from octo_pipeline_python.backends.backends_context import BackendsContext
 from octo_pipeline_python.backends.git.models import GitModel
 from octo_pipeline_python.pipeline.pipeline_context import PipelineContext
+from octo_pipeline_python.utils.git import GitUtils
 from octo_pipeline_python.utils.logger import logger
 from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
 
@@ -47,17 +48,22 @@ class GitSource(Action):
             if len(os.listdir(source_dir)) == 0:
                 logger.info(f"[{pipeline_context.name}][{backend.backend_name()}] "
                             f"Cloning repo [{pipeline_context.scm}] into [{source_dir}]")
-                kwargs = {}
-                if git_args.shallow:
-                    kwargs['depth'] = 1
+                strategy = git_args.clone_strategy()
+                if isinstance(pipeline_context.scm, str):
+                    # Only a single remote has a mirror
+                    strategy = GitUtils.cached_clone_strategy(pipeline_context.scm, strategy)
+                kwargs = strategy.clone_kwargs(git_args.head)
                 if git_args.recursive:
                     kwargs['recursive'] = True
                 repo = git.Repo.clone_from(pipeline_context.scm, source_dir, **kwargs)
+                # Narrow clones already checked out the head
+                if not strategy.narrow:
+                    repo.git.checkout(git_args.head)
             else:
                 logger.info(f"[{pipeline_context.name}][{backend.backend_name()}] "
                             f"Path [{source_dir}] already exists, will use the existing folder")
                 repo = git.Repo(source_dir)
-            repo.git.checkout(git_args.head)
+                repo.git.checkout(git_args.head)
             if git_args.submodule_init:
                 logger.info(f"[{pipeline_context.name}][{backend.backend_name()}] Running submodule update init")
                 repo.git.submodule('update', '--init')
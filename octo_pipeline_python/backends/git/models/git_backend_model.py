@@ -2,10 +2,27 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from octo_pipeline_python.utils.git import GitCloneStrategy
+
 
 class GitModel(BaseModel):
     head: Optional[str] = Field(description="Head branch or tag", default="master")
     mirror: Optional[str] = Field(default=None, description="Mirror remote to add")
     shallow: bool = Field(description="Shallow clone", default=False)
+    depth: Optional[int] = Field(description="Number of commits of history to clone, overrides shallow",
+                                 default=None, gt=0)
+    filter: Optional[str] = Field(description="Partial clone filter, such as blob:none", default=None)
+    single_branch: bool = Field(description="Clone only the history of the head branch", default=False)
+    reference: Optional[str] = Field(description="Local object cache to borrow objects from", default=None)
     recursive: bool = Field(description="Recursive clone", default=False)
     submodule_init: bool = Field(description="Try to run submodule init", default=False)
+
+    def clone_strategy(self) -> GitCloneStrategy:
+        """
+        Clone strategy of the source action
+        :return:
+        """
+        return GitCloneStrategy(depth=self.depth or (1 if self.shallow else None),
+                                filter=self.filter,
+                                single_branch=self.single_branch,
+                                reference=self.reference)
@@ -24,7 +24,8 @@ class SetupToolsPackage(Action):
                 workspace_context: WorkspaceContext,
                 action_name: Optional[str]) -> bool:
         try:
-            from octo_pipeline_python.backends.conan import ConanBackend
+            from octo_pipeline_python.backends.conan.conan_backend import \
+                ConanBackend
             from octo_pipeline_python.backends.conan.models import \
                 ConanConfiguration
 
@@ -1,4 +1,5 @@
 from octo_pipeline_python.commands.backends_command import BackendsCommand
 from octo_pipeline_python.commands.command import Command
+from octo_pipeline_python.commands.daemon_command import DaemonCommand
 from octo_pipeline_python.commands.pipeline_command import PipelineCommand
 from octo_pipeline_python.commands.workspace_command import WorkspaceCommand
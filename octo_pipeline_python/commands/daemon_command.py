@@ -0,0 +1,30 @@
+import argparse
+import os
+
+from octo_pipeline_python.actions.action_result import ActionResultCode
+from octo_pipeline_python.commands.command import Command
+from octo_pipeline_python.utils.logger import logger
+
+
+class DaemonCommand(Command):
+    def define_command(self, subparsers: argparse._SubParsersAction) -> None:
+        daemon_parser = subparsers.add_parser("daemon", help="Keeps the workspace resident for faster commands")
+        daemon_subparsers = daemon_parser.add_subparsers(dest="daemon_action")
+        daemon_subparsers.required = True
+        daemon_subparsers.add_parser("start", help="Serves the current directory in the foreground, "
+                                                   "commands are forwarded to it when OCTO_DAEMON=1")
+        daemon_subparsers.add_parser("stop", help="Stops the daemon serving the current directory")
+        daemon_subparsers.add_parser("status", help="Checks if a daemon serves the current directory")
+
+    def run_command(self, args: argparse.Namespace) -> ActionResultCode:
+        from octo_pipeline_python.daemon import OctoDaemon
+        if args.daemon_action == "start":
+            if not OctoDaemon(os.getcwd()).serve():
+                return ActionResultCode.FAILURE
+            return ActionResultCode.SUCCESS
+        # A running daemon answers stop and status before getting here
+        logger.error(f"No daemon serving [{os.getcwd()}]")
+        return ActionResultCode.FAILURE
+
+    def can_run_command(self, command_name: str, args: argparse.Namespace) -> bool:
+        return command_name == 'daemon'
@@ -1,19 +1,70 @@
 import argparse
+import json
 import os
+import statistics
 import sys
-from typing import Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import git
 
 from octo_pipeline_python.actions.action_result import ActionResultCode
 from octo_pipeline_python.backends.backend_settings import BackendSettings
 from octo_pipeline_python.commands.command import Command
+from octo_pipeline_python.pipeline.pipeline_context import PipelineActionStats
 from octo_pipeline_python.utils.logger import logger
 from octo_pipeline_python.workspace.workspace_description import \
     WorkspaceDescription
 
 
 class PipelineCommand(Command):
+    @staticmethod
+    def __mean(values: Iterable[Optional[float]], unit: int = 1, precision: int = 2) -> str:
+        """
+        Mean of the resources the runs recorded, skipping the runs that overlapped other actions
+        :param values:
+        :param unit:
+        :param precision:
+        :return: The formatted mean, or - when no run recorded them
+        """
+        recorded = [value / unit for value in values if value is not None]
+        if not recorded:
+            return "-"
+        return f"{statistics.fmean(recorded):.{precision}f}"
+
+    @staticmethod
+    def __print_actions_stats(actions_stats: List[PipelineActionStats], last: Optional[int], as_json: bool) -> None:
+        runs: Dict[Tuple[str, str], List[PipelineActionStats]] = {}
+        for stats in actions_stats:
+            runs.setdefault((stats.action_id, stats.backend), []).append(stats)
+        if last:
+            runs = {key: action_runs[-last:] for key, action_runs in runs.items()}
+        if as_json:
+            sys.stdout.write(json.dumps([stats.model_dump(mode="json") for action_runs in runs.values()
+                                         for stats in action_runs], indent=4))
+            return
+        if not runs:
+            sys.stdout.write("No action ran yet\n")
+            return
+        mib = 1024 * 1024
+        sys.stdout.write(f"{'Action':<24}{'Backend':<12}{'Runs':>6}{'Last':>10}{'Mean':>10}{'Max':>10}"
+                         f"{'CPU':>10}{'New peak MiB':>14}{'Read MiB':>10}{'Write MiB':>10}  Result\n")
+        # Actions taking the most time on average first
+        for (action_id, backend), action_runs in sorted(runs.items(),
+                                                        key=lambda item: -statistics.fmean(
+                                                            stats.wall_time for stats in item[1])):
+            # Only the runs that raised the peak of the process know the memory they reached
+            peaks = [stats.peak_rss for stats in action_runs if stats.peak_rss is not None]
+            peak = f"{max(peaks) / mib:.1f}" if peaks else "-"
+            sys.stdout.write(f"{action_id:<24}{backend:<12}{len(action_runs):>6}"
+                             f"{action_runs[-1].wall_time:>10.2f}"
+                             f"{statistics.fmean(stats.wall_time for stats in action_runs):>10.2f}"
+                             f"{max(stats.wall_time for stats in action_runs):>10.2f}"
+                             f"{PipelineCommand.__mean([stats.cpu_time for stats in action_runs]):>10}"
+                             f"{peak:>14}"
+                             f"{PipelineCommand.__mean([stats.read_bytes for stats in action_runs], mib, 1):>10}"
+                             f"{PipelineCommand.__mean([stats.written_bytes for stats in action_runs], mib, 1):>10}"
+                             f"  {action_runs[-1].result_code.name}\n")
+
     def define_command(self, subparsers) -> None:
         pipeline_parser = subparsers.add_parser("pipeline")
         pipeline_subparsers = pipeline_parser.add_subparsers(dest="pipeline_action")
@@ -27,9 +78,19 @@ class PipelineCommand(Command):
         execute_parser = pipeline_subparsers.add_parser("execute", help="Executes the entire pipeline actions")
         execute_parser.add_argument("--reset-cache", help="Resets the cache and starts the pipeline from the beginning",
                                     action="store_true")
+        execute_parser.add_argument("-j", "--jobs", help="Number of parallel actions when the actions declare needs",
+                                    type=int, default=None)
+        execute_parser.add_argument("--no-action-cache", help="Do not use the cached results of the actions",
+                                    action="store_true")
         pipeline_subparsers.add_parser("describe", help="Prints out a detailed description of the pipeline")
         pipeline_subparsers.add_parser("describe-actions", help="Prints out the list of actions on the pipeline")
         pipeline_subparsers.add_parser("clean", help="Cleans up all the actions that ran so far")
+        stats_parser = pipeline_subparsers.add_parser("stats", help="Prints out the timing and resources "
+                                                                    "of the actions over the recent runs")
+        stats_parser.add_argument("--last", help="Only use the last given number of runs of every action",
+                                  type=int, default=None)
+        stats_parser.add_argument("--json", help="Print out the stats of every action run as json",
+                                  action="store_true")
         pipeline_subparsers.add_parser("name", help="Prints out the name of the pipeline")
         pipeline_subparsers.add_parser("version", help="Prints out the version of the pipeline")
         pipeline_subparsers.add_parser("build_number", help="Prints out the build number of the pipeline")
@@ -137,9 +198,12 @@ class PipelineCommand(Command):
             return ActionResultCode.FAILURE
         result = ActionResultCode.SUCCESS
         if args.pipeline_action == "execute":
-            result = self.workspace.singular_pipeline.execute_pipeline(self.backends_context,
-                                                                       self.workspace.context,
-                                                                       args.reset_cache)
+            self.backends_context.action_cache.enabled = not args.no_action_cache
+            with self.backends_context.batch():
+                result = self.workspace.singular_pipeline.execute_pipeline(self.backends_context,
+                                                                           self.workspace.context,
+                                                                           args.reset_cache,
+                                                                           args.jobs)
         elif args.pipeline_action == "describe":
             logger.set_verbose(False)
             sys.stdout.write(self.workspace.singular_pipeline.describe_pipeline().model_dump_json(indent=4))
@@ -151,6 +215,9 @@ class PipelineCommand(Command):
                                         action.surroundings]))
         elif args.pipeline_action == "clean":
             self.workspace.singular_pipeline.cleanup_pipeline(self.backends_context, self.workspace.context)
+        elif args.pipeline_action == "stats":
+            logger.set_verbose(False)
+            PipelineCommand.__print_actions_stats(self.workspace.singular_pipeline.actions_stats, args.last, args.json)
         elif args.pipeline_action == "name":
             logger.set_verbose(False)
             sys.stdout.write(self.workspace.singular_pipeline.context.name)
@@ -1,8 +1,9 @@
 import argparse
-import multiprocessing
+import json
 import os
 import sys
-from typing import Any, Dict, Final, List, NamedTuple, Set, Tuple
+from typing import (Any, Dict, Final, List, NamedTuple, Sequence, Set, Tuple,
+                    Union)
 
 import git
 from colorama import Back, Fore, Style
@@ -10,10 +11,20 @@ from colorama import Back, Fore, Style
 from octo_pipeline_python.actions.action_result import ActionResultCode
 from octo_pipeline_python.actions.action_type import ActionType
 from octo_pipeline_python.commands.command import Command
+from octo_pipeline_python.utils.git import GIT_CACHE_DIR_ENV
 from octo_pipeline_python.utils.logger import logger
+from octo_pipeline_python.utils.tracer import Tracer
 from octo_pipeline_python.workspace.workspace import (DEFAULT_RETRY_COUNT,
                                                       Workspace)
+from octo_pipeline_python.workspace.workspace_executor import \
+    WorkspaceExecutorType
+from octo_pipeline_python.workspace.workspace_history import (
+    DEFAULT_REGRESSION_THRESHOLD, DurationRegression, DurationStats,
+    WorkspaceHistory)
 from octo_pipeline_python.workspace.workspace_pipeline import WorkspacePipeline
+from octo_pipeline_python.workspace.workspace_scheduler import SchedulePolicy
+from octo_pipeline_python.workspace.workspace_sync_engine import \
+    WorkspaceSyncEngineType
 
 
 class WorkspaceCommand(Command):
@@ -47,6 +58,11 @@ class WorkspaceCommand(Command):
             help=f"Resets the cache of the pipeline",
             action="store_true",
         )
+        execute_parser.add_argument(
+            "--no-action-cache",
+            help="Do not use the cached results of the actions",
+            action="store_true",
+        )
         execute_parser.add_argument(
             "-j", "--jobs", help="Number of parallel jobs", type=int, default=None
         )
@@ -62,6 +78,115 @@ class WorkspaceCommand(Command):
             help="Recursive run pipelines per the needs",
             action="store_true",
         )
+        execute_parser.add_argument(
+            "--schedule",
+            help="Order in which ready pipelines start, critical-path prefers the longest remaining chains",
+            choices=[policy.value for policy in SchedulePolicy],
+            default=SchedulePolicy.CriticalPath.value,
+        )
+        execute_parser.add_argument(
+            "--executor",
+            help="Run the pipelines on threads, or each on its own worker process",
+            choices=[executor.value for executor in WorkspaceExecutorType],
+            default=WorkspaceExecutorType.Thread.value,
+        )
+        execute_parser.add_argument(
+            "-k",
+            "--keep-going",
+            help="Keep running the pipelines that do not depend on a failed pipeline",
+            action="store_true",
+        )
+        execute_parser.add_argument(
+            "--fixed-jobs",
+            help="Do not shrink the parallel jobs budget under system load or memory pressure",
+            action="store_true",
+        )
+        execute_parser.add_argument(
+            "--trace-out",
+            help="Write a chrome trace of the execution to the given file, which can be opened in Perfetto",
+            default=None,
+        )
+
+    @staticmethod
+    def __add_history_parser(workspace_subparsers: argparse._SubParsersAction) -> None:
+        history_parser = workspace_subparsers.add_parser("history", help="Query the history of the workspace runs")
+        history_subparsers = history_parser.add_subparsers(dest="history_query", required=True)
+        durations_parser = history_subparsers.add_parser("durations", help="p50 / p95 durations of the pipelines")
+        durations_parser.add_argument("--actions", help="Durations of the actions instead of the pipelines",
+                                      action="store_true")
+        slowest_actions_parser = history_subparsers.add_parser("slowest-actions",
+                                                               help="Actions with the longest median durations")
+        slowest_actions_parser.add_argument("--limit", help="Number of actions to list", type=int, default=10)
+        regressions_parser = history_subparsers.add_parser("regressions",
+                                                           help="Pipelines that got slower between two commits")
+        regressions_parser.add_argument("--actions", help="Regressions of the actions instead of the pipelines",
+                                        action="store_true")
+        regressions_parser.add_argument("--base", help="Commit to compare against, by default the one before the head",
+                                        default=None)
+        regressions_parser.add_argument("--head", help="Commit to compare, by default the last one that ran",
+                                        default=None)
+        regressions_parser.add_argument("--threshold", help="Minimal ratio of the durations to report",
+                                        type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+        for parser in (durations_parser, slowest_actions_parser, regressions_parser):
+            parser.add_argument("--pipeline", help="Only query the runs of the given pipeline", default=None)
+            parser.add_argument("--json", help="Print out the results as json", action="store_true")
+        for parser in (durations_parser, slowest_actions_parser):
+            parser.add_argument("--last", help="Only use the last given number of runs", type=int, default=None)
+
+    @staticmethod
+    def __history_name(result: Union[DurationStats, DurationRegression]) -> str:
+        if result.action:
+            return f"{result.pipeline}/{result.action} [{result.backend}]"
+        return result.pipeline
+
+    @staticmethod
+    def __print_history_as_is(results: Sequence[Union[DurationStats, DurationRegression]], as_json: bool) -> bool:
+        """
+        Prints out the history results as json, or that no run matched
+        :param results:
+        :param as_json:
+        :return: Whether the results were printed, otherwise they are left to print as a table
+        """
+        if as_json:
+            sys.stdout.write(json.dumps([result.model_dump(mode="json") for result in results], indent=4))
+            return True
+        if not results:
+            sys.stdout.write("No recorded runs matched\n")
+            return True
+        return False
+
+    @staticmethod
+    def __print_regressions(regressions: List[DurationRegression], as_json: bool) -> None:
+        if WorkspaceCommand.__print_history_as_is(regressions, as_json):
+            return
+        width = max(len("Name"), *(len(WorkspaceCommand.__history_name(result)) for result in regressions)) + 2
+        sys.stdout.write(f"{'Name':<{width}}{'Base':<10}{'Head':<10}{'Base p50':>10}{'Head p50':>10}{'Ratio':>8}\n")
+        for result in regressions:
+            sys.stdout.write(f"{WorkspaceCommand.__history_name(result):<{width}}"
+                             f"{result.base_sha[:8]:<10}{result.head_sha[:8]:<10}"
+                             f"{result.base_p50:>10.2f}{result.head_p50:>10.2f}{result.ratio:>8.2f}\n")
+
+    @staticmethod
+    def __print_durations(durations: List[DurationStats], as_json: bool) -> None:
+        if WorkspaceCommand.__print_history_as_is(durations, as_json):
+            return
+        width = max(len("Name"), *(len(WorkspaceCommand.__history_name(result)) for result in durations)) + 2
+        sys.stdout.write(f"{'Name':<{width}}{'Runs':>6}{'Failures':>10}{'p50':>10}{'p95':>10}{'Last':>10}\n")
+        for result in durations:
+            sys.stdout.write(f"{WorkspaceCommand.__history_name(result):<{width}}{result.runs:>6}{result.failures:>10}"
+                             f"{result.p50:>10.2f}{result.p95:>10.2f}{result.last:>10.2f}\n")
+
+    @staticmethod
+    def __print_history(args: argparse.Namespace, history: WorkspaceHistory) -> None:
+        if args.history_query == "regressions":
+            WorkspaceCommand.__print_regressions(
+                history.regressions(args.actions, args.pipeline, args.base, args.head, args.threshold), args.json)
+            return
+        actions = args.history_query == "slowest-actions" or args.actions
+        durations = history.durations(actions, args.pipeline, args.last)
+        if args.history_query == "slowest-actions":
+            durations = durations[:args.limit]
+        WorkspaceCommand.__print_durations(durations, args.json)
 
     def __add_execute_action_parser(self, workspace_subparsers) -> None:
         execute_action_parser = workspace_subparsers.add_parser("execute-action")
@@ -86,6 +211,9 @@ class WorkspaceCommand(Command):
                                                        action="store_true")
                             action_parser.add_argument("--retries", help="Number of retries if failing",
                                                        default=DEFAULT_RETRY_COUNT, type=int)
+                            action_parser.add_argument("--trace-out",
+                                                       help="Write a chrome trace of the execution to the given file",
+                                                       default=None)
                             added_actions.append(item)
             else:
                 for action_type in ActionType:
@@ -97,6 +225,9 @@ class WorkspaceCommand(Command):
                                                action="store_true")
                     action_parser.add_argument("--retries", help="Number of retries if failing",
                                                default=DEFAULT_RETRY_COUNT, type=int)
+                    action_parser.add_argument("--trace-out",
+                                               help="Write a chrome trace of the execution to the given file",
+                                               default=None)
 
     def __add_clean_parser(self, workspace_subparsers) -> None:
         clean_parser = workspace_subparsers.add_parser("clean")
@@ -111,7 +242,7 @@ class WorkspaceCommand(Command):
                                                help=f"Do not resets the cache of {pipeline_name} pipeline",
                                                action="store_false")
             pipeline_clean_parser.add_argument("-j", "--jobs", help="Number of parallel jobs",
-                                               default=None)
+                                               default=None, type=int)
             pipeline_clean_parser.add_argument("--retries", help="Number of retries if failing",
                                                default=DEFAULT_RETRY_COUNT, type=int)
             pipeline_clean_parser.add_argument("-r", "--recursive", help="Recursive run pipelines per the needs",
@@ -161,6 +292,8 @@ class WorkspaceCommand(Command):
         state_parser = workspace_subparsers.add_parser("state", help="Print out the state of the workspace")
         state_parser.add_argument("--quick", help="Quickly evaluate the state without working with remote repo",
                                   action="store_true")
+        state_parser.add_argument("--refresh", help="Check the remote repos again even for unchanged pipelines",
+                                  action="store_true")
 
         class ParserArguments(NamedTuple):
             args: Tuple[Any, ...] = tuple()
@@ -168,14 +301,21 @@ class WorkspaceCommand(Command):
 
         sync_arguments: Final[Tuple[ParserArguments, ...]] = (
             ParserArguments(args=("-j", "--jobs",),
-                            kwargs={"help": "Number of parallel jobs", "type": int,
-                                    "default": min(multiprocessing.cpu_count() / 2, 8)}),
+                            kwargs={"help": "Number of parallel jobs", "type": int, "default": None}),
             ParserArguments(args=("--retries",),
                             kwargs={"help": "Number of retries if failing to sync pipeline",
                                     "type": int, "default": 3, "dest": "sync_retry"}),
             ParserArguments(args=("--backoff-factor",),
                             kwargs={"help": "Backoff factor on retrying failed pipeline", "type": float,
                                     "default": 1.3}),
+            ParserArguments(args=("--engine",),
+                            kwargs={"help": "Sync on a pool of threads, or on asyncio driven git processes",
+                                    "choices": [engine.value for engine in WorkspaceSyncEngineType],
+                                    "default": WorkspaceSyncEngineType.Thread.value}),
+            ParserArguments(args=("--git-cache",),
+                            kwargs={"help": f"Directory of the bare mirrors new clones borrow objects from, "
+                                            f"shared by the workspaces of the machine [{GIT_CACHE_DIR_ENV}]",
+                                    "default": None}),
         )
         sync_parser = workspace_subparsers.add_parser("sync", help="Sync the workspace")
         sync_parser.add_argument("--no-code-sync", help="Do not try and git pull for latest code", action="store_true")
@@ -198,8 +338,20 @@ class WorkspaceCommand(Command):
             self.__add_execute_action_parser(workspace_subparsers)
             self.__add_clean_parser(workspace_subparsers)
             self.__add_clean_action_parser(workspace_subparsers)
+            WorkspaceCommand.__add_history_parser(workspace_subparsers)
 
     def run_command(self, args: argparse.Namespace) -> ActionResultCode:
+        if not getattr(args, "trace_out", None):
+            return self.__run_workspace_action(args)
+        tracer = Tracer.start()
+        try:
+            return self.__run_workspace_action(args)
+        finally:
+            tracer.stop()
+            tracer.dump(args.trace_out)
+            logger.info(f"Wrote the execution trace to [{args.trace_out}]")
+
+    def __run_workspace_action(self, args: argparse.Namespace) -> ActionResultCode:
         result = ActionResultCode.SUCCESS
         if args.workspace_action == "init":
             source_dir = os.getcwd()
@@ -230,14 +382,16 @@ class WorkspaceCommand(Command):
                         logger.error(f"Provided destination [{source_dir}] is not an empty directory")
                     return ActionResultCode.FAILURE
                 self.workspace: Workspace = \
-                    Workspace.init_workspace_to(args.org, args.name, args.scm, source_dir, args.head)
+                    Workspace.init_workspace_to(args.org, args.name, args.scm, source_dir, args.head, args.git_cache)
             if self.workspace:
                 logger.info("Successfully initialized workspace")
                 if not args.no_sync:
-                    unresolved: List[str] = self.workspace.sync_workspace(parallel_jobs=args.jobs,
-                                                                          sync_retry=args.sync_retry,
-                                                                          backoff_factor=args.backoff_factor)
-                    if len(unresolved) > 0:
+                    init_unresolved = self.workspace.sync_workspace(parallel_jobs=args.jobs,
+                                                                    sync_retry=args.sync_retry,
+                                                                    backoff_factor=args.backoff_factor,
+                                                                    engine=WorkspaceSyncEngineType(args.engine),
+                                                                    git_cache_dir=args.git_cache)
+                    if len(init_unresolved) > 0:
                         logger.error("Failed to fully sync workspace")
                     else:
                         logger.info("Synced workspace successfully")
@@ -256,8 +410,11 @@ class WorkspaceCommand(Command):
         elif args.workspace_action == "describe-pipelines":
             logger.set_verbose(False)
             sys.stdout.write("\n".join(self.workspace.describe_pipelines()))
+        elif args.workspace_action == "history":
+            logger.set_verbose(False)
+            WorkspaceCommand.__print_history(args, self.workspace.history)
         elif args.workspace_action == "state":
-            state = self.workspace.workspace_state(args.quick)
+            state = self.workspace.workspace_state(args.quick, args.refresh)
             WorkspaceCommand.__print_pipelines(state.unresolved_pipelines, "Unresolved Pipelines",
                                                Back.WHITE, Fore.WHITE)
             WorkspaceCommand.__print_pipelines(state.unsynced_pipelines, "Unsynced Pipelines",
@@ -273,7 +430,9 @@ class WorkspaceCommand(Command):
         elif args.workspace_action == "sync":
             unresolved: List[str] = self.workspace.sync_workspace(args.no_code_sync, parallel_jobs=args.jobs,
                                                                   sync_retry=args.sync_retry,
-                                                                  backoff_factor=args.backoff_factor)
+                                                                  backoff_factor=args.backoff_factor,
+                                                                  engine=WorkspaceSyncEngineType(args.engine),
+                                                                  git_cache_dir=args.git_cache)
             if len(unresolved) > 0:
                 logger.error("Failed to fully sync workspace")
                 result = ActionResultCode.FAILURE
@@ -281,14 +440,21 @@ class WorkspaceCommand(Command):
                 logger.info("Synced workspace successfully")
         elif args.workspace_action == "execute":
             pipeline_name = args.pipeline
+            self.backends_context.action_cache.enabled = not args.no_action_cache
             if pipeline_name == "all":
                 result = self.workspace.execute_pipelines(self.backends_context, [],
                                                           args.reset_cache, args.jobs,
-                                                          args.retries, args.recursive)
+                                                          args.retries, args.recursive,
+                                                          SchedulePolicy(args.schedule),
+                                                          WorkspaceExecutorType(args.executor),
+                                                          args.keep_going, not args.fixed_jobs)
             else:
                 result = self.workspace.execute_pipelines(self.backends_context, [pipeline_name],
                                                           args.reset_cache, args.jobs,
-                                                          args.retries, args.recursive)
+                                                          args.retries, args.recursive,
+                                                          SchedulePolicy(args.schedule),
+                                                          WorkspaceExecutorType(args.executor),
+                                                          args.keep_going, not args.fixed_jobs)
         elif args.workspace_action == "execute-action":
             pipeline_name = args.execute_action
             action_type = args.execute_action_type
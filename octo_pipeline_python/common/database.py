@@ -1,14 +1,14 @@
-import os
-import pickle
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set
 
+from octo_pipeline_python.common.database_engine import DatabaseEngine
 from octo_pipeline_python.utils.logger import logger
 
 
 class Database:
-    def __init__(self, base_path: str, tag: str, prefix: str = ''):
-        self.__db_file = os.path.join(base_path, ".cache", f".{prefix}.db")
+    def __init__(self, base_path: str, tag: str, prefix: str = '', engine: Optional[str] = None):
+        self.__engine = DatabaseEngine.create(base_path, prefix, engine)
         self.__database = {}
+        self.__changed_keys: Set[str] = set()
         self.__tag = tag
         self.__dirty = False
         self.reload()
@@ -33,6 +33,14 @@ class Database:
         """
         return self.__tag
 
+    @property
+    def engine(self) -> DatabaseEngine:
+        """
+        Engine the DB is stored with
+        :return:
+        """
+        return self.__engine
+
     def contains(self, key: str) -> bool:
         """
         Checks if key in database
@@ -49,6 +57,7 @@ class Database:
         :return:
         """
         self.__database[key] = value
+        self.__changed_keys.add(key)
 
     def get(self, key: str) -> Any:
         """
@@ -69,19 +78,19 @@ class Database:
         :return:
         """
         self.__database[key] = value
+        self.__changed_keys.add(key)
         self.__dirty = True
         if flush:
             self.flush()
 
     def flush(self) -> None:
         """
-        Flushes the database to file
+        Flushes the changes of the database to file
         :return:
         """
-        if not os.path.exists(os.path.dirname(self.__db_file)):
-            os.makedirs(os.path.dirname(self.__db_file))
-        with open(self.__db_file, 'wb') as f:
-            pickle.dump(self.__database, f, protocol=pickle.HIGHEST_PROTOCOL)
+        changes = {key: self.__database[key] for key in self.__changed_keys if key in self.__database}
+        self.__engine.write(changes, self.__database)
+        self.__changed_keys = set()
         self.__dirty = False
 
     def reset(self) -> None:
@@ -90,22 +99,23 @@ class Database:
         :return:
         """
         logger.info(f"[{self.tag}] Resetting database")
-        if os.path.exists(self.__db_file):
-            os.remove(self.__db_file)
+        self.__engine.reset()
         self.__database = {}
+        self.__changed_keys = set()
         self.__dirty = True
 
     def reload(self) -> Optional[Dict[str, Any]]:
         """
-        Reloads the workspace db file
+        Reloads the db file
         :return:
         """
-        if os.path.exists(self.__db_file):
-            try:
-                with open(self.__db_file, 'rb') as f:
-                    self.__database = pickle.load(f)
-                    self.__dirty = False
-                    return self.__database
-            except Exception:
-                logger.warning(f"[{self.tag}] Could not load DB file")
+        try:
+            database = self.__engine.load()
+            if database is not None:
+                self.__database = database
+                self.__changed_keys = set()
+                self.__dirty = False
+                return self.__database
+        except Exception:
+            logger.warning(f"[{self.tag}] Could not load DB file")
         return None
@@ -0,0 +1,232 @@
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from abc import abstractmethod
+from typing import Any, Dict, Final, Optional
+
+from octo_pipeline_python.utils.logger import logger
+
+DATABASE_ENGINE_ENV: Final[str] = "OCTO_DB_ENGINE"
+PICKLE_ENGINE: Final[str] = "pickle"
+JOURNAL_ENGINE: Final[str] = "journal"
+DEFAULT_DATABASE_ENGINE: Final[str] = PICKLE_ENGINE
+JOURNAL_RECORD_HEADER = struct.Struct(">II")
+DEFAULT_JOURNAL_COMPACTION_RECORDS: Final[int] = 128
+
+
+class DatabaseEngine:
+    def __init__(self, base_path: str, prefix: str):
+        self.__cache_dir = os.path.join(base_path, ".cache")
+        self.__prefix = prefix
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        Getter for the directory the database files are stored in
+        :return:
+        """
+        return self.__cache_dir
+
+    @property
+    def prefix(self) -> str:
+        """
+        Getter for the prefix of the database files
+        :return:
+        """
+        return self.__prefix
+
+    @staticmethod
+    def create(base_path: str, prefix: str, engine: Optional[str] = None) -> "DatabaseEngine":
+        """
+        Creates the database engine, either the given one or the one set on the environment
+        :param base_path:
+        :param prefix:
+        :param engine:
+        :return:
+        """
+        engine = engine or os.environ.get(DATABASE_ENGINE_ENV, DEFAULT_DATABASE_ENGINE)
+        if engine == JOURNAL_ENGINE:
+            return JournalDatabaseEngine(base_path, prefix)
+        if engine != PICKLE_ENGINE:
+            logger.warning(f"Unknown database engine [{engine}], using [{PICKLE_ENGINE}]")
+        return PickleDatabaseEngine(base_path, prefix)
+
+    @staticmethod
+    def atomic_write(path: str, data: bytes, sync: bool = False) -> None:
+        """
+        Writes the file through a temporary file, so a crash can never leave a partial file behind
+        :param path:
+        :param data:
+        :param sync: Whether to also sync the file to disk before replacing, to survive a power loss
+        :return:
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=os.path.dirname(path))
+        try:
+            try:
+                # Raw descriptor writes, since this may run from Database.__del__ during interpreter shutdown
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                if sync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @abstractmethod
+    def load(self) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def write(self, changes: Dict[str, Any], database: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        pass
+
+
+class PickleDatabaseEngine(DatabaseEngine):
+    """
+    Stores the entire database as a single pickle, rewritten on every flush
+    """
+    def __init__(self, base_path: str, prefix: str):
+        super().__init__(base_path, prefix)
+        self.__db_file = os.path.join(self.cache_dir, f".{prefix}.db")
+
+    @property
+    def db_file(self) -> str:
+        return self.__db_file
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Loads the pickle file if exists
+        :return:
+        """
+        if os.path.exists(self.__db_file):
+            with open(self.__db_file, 'rb') as f:
+                return pickle.load(f)
+        return None
+
+    def write(self, changes: Dict[str, Any], database: Dict[str, Any]) -> None:
+        """
+        Rewrites the entire database
+        :param changes:
+        :param database:
+        :return:
+        """
+        DatabaseEngine.atomic_write(self.__db_file, pickle.dumps(database, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def reset(self) -> None:
+        """
+        Removes the pickle file
+        :return:
+        """
+        if os.path.exists(self.__db_file):
+            os.remove(self.__db_file)
+
+
+class JournalDatabaseEngine(DatabaseEngine):
+    """
+    Stores the database as an append only journal of changes
+    Every record is framed with its length and crc, a torn record at the tail is dropped on load,
+    and the journal is compacted into a single snapshot record once it grows long enough
+    """
+    def __init__(self, base_path: str, prefix: str,
+                 compaction_records: int = DEFAULT_JOURNAL_COMPACTION_RECORDS):
+        super().__init__(base_path, prefix)
+        self.__journal_file = os.path.join(self.cache_dir, f".{prefix}.journal")
+        self.__compaction_records = compaction_records
+        self.__records = 0
+
+    @property
+    def journal_file(self) -> str:
+        return self.__journal_file
+
+    @staticmethod
+    def __frame(changes: Dict[str, Any]) -> bytes:
+        payload = pickle.dumps(changes, protocol=pickle.HIGHEST_PROTOCOL)
+        return JOURNAL_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def __compact(self, database: Dict[str, Any]) -> None:
+        # Synced, since the compacted journal replaces all the records appended so far
+        DatabaseEngine.atomic_write(self.__journal_file, self.__frame(database), sync=True)
+        self.__records = 1
+
+    def __migrate(self) -> Optional[Dict[str, Any]]:
+        pickle_engine = PickleDatabaseEngine(os.path.dirname(self.cache_dir), self.prefix)
+        try:
+            database = pickle_engine.load()
+        except Exception:
+            logger.warning(f"Could not migrate DB file [{pickle_engine.db_file}]")
+            return None
+        if database is None:
+            return None
+        logger.info(f"Migrating DB file [{pickle_engine.db_file}] to journal")
+        self.__compact(database)
+        pickle_engine.reset()
+        return database
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Replays the journal, dropping a torn or corrupted tail
+        :return:
+        """
+        if not os.path.exists(self.__journal_file):
+            return self.__migrate()
+        database: Dict[str, Any] = {}
+        records = 0
+        valid_size = 0
+        with open(self.__journal_file, 'rb') as f:
+            data = f.read()
+        while valid_size + JOURNAL_RECORD_HEADER.size <= len(data):
+            length, crc = JOURNAL_RECORD_HEADER.unpack_from(data, valid_size)
+            start = valid_size + JOURNAL_RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                break
+            database.update(pickle.loads(payload))
+            records += 1
+            valid_size = start + length
+        if valid_size != len(data):
+            logger.warning(f"Dropping [{len(data) - valid_size}] bytes of torn journal [{self.__journal_file}]")
+            with open(self.__journal_file, 'r+b') as f:
+                f.truncate(valid_size)
+        self.__records = records
+        return database
+
+    def write(self, changes: Dict[str, Any], database: Dict[str, Any]) -> None:
+        """
+        Appends the changes to the journal, compacting it if needed
+        :param changes:
+        :param database:
+        :return:
+        """
+        if self.__records + 1 >= self.__compaction_records or not os.path.exists(self.__journal_file):
+            self.__compact(database)
+            return
+        if not changes:
+            return
+        # Single write call of the entire record on an append only descriptor
+        fd = os.open(self.__journal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, self.__frame(changes))
+        finally:
+            os.close(fd)
+        self.__records += 1
+
+    def reset(self) -> None:
+        """
+        Removes the journal
+        :return:
+        """
+        if os.path.exists(self.__journal_file):
+            os.remove(self.__journal_file)
+        self.__records = 0
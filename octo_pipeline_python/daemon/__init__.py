@@ -0,0 +1,2 @@
+from octo_pipeline_python.daemon.octo_daemon import OctoDaemon
+from octo_pipeline_python.daemon.octo_daemon_client import OctoDaemonClient
@@ -0,0 +1,205 @@
+import io
+import json
+import logging
+import os
+import socketserver
+import sys
+import traceback
+from threading import RLock, Thread
+from typing import Any, Dict, List, Optional, Tuple
+
+from octo_pipeline_python.daemon.octo_daemon_client import (DAEMON_DIR_MODE,
+                                                            OctoDaemonClient)
+from octo_pipeline_python.utils.logger import logger
+
+WORKSPACE_DEFINITION_FILES = ["workspace.yml", "pipeline.yml", "settings.yml"]
+
+
+class OctoDaemonStream(io.TextIOBase):
+    """
+    Text stream forwarding everything written to it to the client
+    """
+    def __init__(self, handler: "OctoDaemonHandler", stream: str):
+        super().__init__()
+        self.__handler = handler
+        self.__stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, data: str) -> int:
+        self.__handler.send({"stream": self.__stream, "data": data})
+        return len(data)
+
+
+class OctoDaemonHandler(socketserver.StreamRequestHandler):
+    server: "OctoDaemonServer"
+
+    def send(self, message: Dict[str, Any]) -> None:
+        try:
+            OctoDaemonClient.send(self.request, message)
+        except OSError:
+            pass
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        request: Dict[str, Any] = json.loads(line)
+        exit_code = self.server.daemon.run_request(request,
+                                                   OctoDaemonStream(self, "stdout"),
+                                                   OctoDaemonStream(self, "stderr"))
+        self.send({"exit": exit_code})
+
+
+class OctoDaemonServer(socketserver.UnixStreamServer):
+    def __init__(self, path: str, daemon: "OctoDaemon"):
+        self.daemon = daemon
+        super().__init__(path, OctoDaemonHandler)
+
+    def verify_request(self, request: Any, client_address: Any) -> bool:
+        if OctoDaemonClient.trusted_peer(request):
+            return True
+        logger.warning("Refused a daemon client of another user")
+        return False
+
+
+class OctoDaemon:
+    """
+    Keeps the workspace, its backends context and the parsed definitions resident,
+    and runs the commands forwarded by the clients one at a time
+    """
+    def __init__(self, cwd: str):
+        self.__cwd = os.path.realpath(cwd)
+        self.__lock = RLock()
+        self.__cli: Optional[Tuple[Any, Any, Any, Any]] = None
+        self.__fingerprint: Optional[Tuple] = None
+        self.__server: Optional[OctoDaemonServer] = None
+
+    @property
+    def socket_path(self) -> str:
+        """
+        Getter for the socket the daemon listens on
+        :return:
+        """
+        return OctoDaemonClient.socket_path(self.__cwd)
+
+    def __definitions_fingerprint(self, workspace: Any) -> Tuple:
+        from octo_pipeline_python.workspace.workspace_fingerprints import \
+            WorkspaceFingerprints
+        paths: List[str] = []
+        pipelines: List[Tuple[str, Any]] = []
+        if workspace:
+            context = workspace.context
+            for base in (context.source_dir, os.path.join(context.source_dir, "pipeline")):
+                paths.extend(os.path.join(base, name) for name in WORKSPACE_DEFINITION_FILES)
+            if context.settings_path:
+                paths.append(context.settings_path)
+            # The definitions and checkouts of the workspace pipelines themselves
+            for name in sorted(workspace.describe_pipelines(with_groups=False)):
+                pipeline_path = workspace.pipeline_path(name)
+                if pipeline_path and os.path.exists(pipeline_path):
+                    pipelines.append((name, WorkspaceFingerprints.fingerprint(pipeline_path)))
+        return tuple((path, os.stat(path).st_mtime_ns if os.path.exists(path) else None) for path in paths), \
+            tuple(pipelines)
+
+    def __resident_cli(self) -> Tuple[Any, Any, Any, Any]:
+        from octo_pipeline_python.octo import create_cli
+        if self.__cli and self.__fingerprint == self.__definitions_fingerprint(self.__cli[0]):
+            return self.__cli
+        if self.__cli:
+            logger.info(f"Workspace definitions changed, reloading daemon [{self.__cwd}]")
+        self.__cli = create_cli()
+        self.__fingerprint = self.__definitions_fingerprint(self.__cli[0])
+        return self.__cli
+
+    def __run_daemon_request(self, argv: List[str], stdout: io.TextIOBase, stderr: io.TextIOBase) -> int:
+        if argv[:1] == ["stop"]:
+            stderr.write(f"Stopping daemon [{self.__cwd}]\n")
+            self.shutdown()
+            return 0
+        if argv[:1] == ["status"]:
+            stdout.write(f"Daemon serving [{self.__cwd}] on [{self.socket_path}]\n")
+            return 0
+        stderr.write(f"Daemon already running for [{self.__cwd}]\n")
+        return 1
+
+    def run_request(self, request: Dict[str, Any], stdout: io.TextIOBase, stderr: io.TextIOBase) -> int:
+        """
+        Runs a single forwarded command line with the client environment and output streams
+        :param request:
+        :param stdout:
+        :param stderr:
+        :return: The exit code of the command
+        """
+        from octo_pipeline_python.octo import run_cli
+        with self.__lock:
+            if os.path.realpath(request.get("cwd", "")) != self.__cwd:
+                stderr.write(f"Daemon serves [{self.__cwd}], not [{request.get('cwd')}]\n")
+                return 1
+            argv: List[str] = request["argv"]
+            if argv[:1] == ["daemon"]:
+                return self.__run_daemon_request(argv[1:], stdout, stderr)
+            environ = dict(os.environ)
+            handlers = [h for h in logging.getLogger().handlers if isinstance(h, logging.StreamHandler)]
+            handlers_streams = [h.stream for h in handlers]
+            saved_stdout, saved_stderr = sys.stdout, sys.stderr
+            try:
+                # Only the variables the client forwarded, over the environment the daemon was started in
+                os.environ.update(request.get("env", {}))
+                sys.stdout, sys.stderr = stdout, stderr
+                for handler in handlers:
+                    handler.setStream(stderr)
+                workspace, backends_context, parser, commands = self.__resident_cli()
+                return run_cli(argv, workspace, backends_context, parser, commands)
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else 1
+            except Exception:
+                stderr.write(traceback.format_exc())
+                return 1
+            finally:
+                for handler, stream in zip(handlers, handlers_streams):
+                    handler.setStream(stream)
+                sys.stdout, sys.stderr = saved_stdout, saved_stderr
+                os.environ.clear()
+                os.environ.update(environ)
+
+    def serve(self) -> bool:
+        """
+        Serves the clients until stopped
+        :return:
+        """
+        path = self.socket_path
+        os.makedirs(os.path.dirname(path), mode=DAEMON_DIR_MODE, exist_ok=True)
+        reason = OctoDaemonClient.secure_socket_dir(path)
+        if reason:
+            logger.error(f"Refusing to serve on [{path}] - [{reason}]")
+            return False
+        if os.path.exists(path):
+            if OctoDaemonClient.request(self.__cwd, {"argv": ["daemon", "status"], "cwd": self.__cwd}) is not None:
+                logger.error(f"Daemon already running for [{self.__cwd}]")
+                return False
+            os.remove(path)
+        with self.__lock:
+            self.__resident_cli()
+        self.__server = OctoDaemonServer(path, self)
+        logger.info(f"Daemon serving [{self.__cwd}] on [{path}]")
+        try:
+            self.__server.serve_forever()
+        finally:
+            self.__server.server_close()
+            if os.path.exists(path):
+                os.remove(path)
+        return True
+
+    def shutdown(self) -> None:
+        """
+        Stops serving after the current request
+        :return:
+        """
+        if self.__server:
+            # Requests are handled on the serving thread, which shutdown() would wait for
+            Thread(target=self.__server.shutdown, daemon=True).start()
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+DAEMON_ENV: Final[str] = "OCTO_DAEMON"
+DAEMON_SOCKET_ENV: Final[str] = "OCTO_DAEMON_SOCKET"
+DAEMON_FORWARD_ENV: Final[str] = "OCTO_DAEMON_FORWARD_ENV"
+DAEMON_CONNECT_TIMEOUT: Final[float] = 0.5
+DAEMON_DIR_MODE: Final[int] = 0o700
+# Variables read by octo and its backends, forwarded to the daemon along with the ones listed on DAEMON_FORWARD_ENV
+# Credentials are never forwarded, the daemon keeps the ones of the environment it was started in
+DAEMON_FORWARDED_ENV: Final[Tuple[str, ...]] = ("PATH", "HOME", "LANG", "LC_ALL", "TERM",
+                                                "VIRTUAL_ENV", "SITE_PACKAGES", "PIPENV_VENV_IN_PROJECT",
+                                                "BRANCH_NAME", "GIT_BRANCH", "BUILD_NUMBER",
+                                                "JENKINS_HOME", "JENKINS_URL",
+                                                "CONAN_USER_HOME", "OCTO_CONAN_USER_HOME",
+                                                "DEPLOY_ENV", "DEPLOY_MASTER", "PIPELINE_BASIC_KEYRING")
+DAEMON_FORWARDED_ENV_PREFIXES: Final[Tuple[str, ...]] = ("OCTO_",)
+# Overrides of the pipelines versions, as <PIPELINE>_VERSION
+DAEMON_FORWARDED_ENV_SUFFIXES: Final[Tuple[str, ...]] = ("_VERSION",)
+
+
+class OctoDaemonClient:
+    """
+    Thin client forwarding an octo invocation to a resident daemon over its unix socket
+    Kept free of any heavy imports, so forwarding a command costs only the interpreter startup
+    """
+    @staticmethod
+    def enabled() -> bool:
+        """
+        Whether the commands should be forwarded to a daemon when one is running
+        :return:
+        """
+        return os.environ.get(DAEMON_ENV, "").lower() in ("1", "true", "yes", "on")
+
+    @staticmethod
+    def socket_path(cwd: str) -> str:
+        """
+        Socket of the daemon serving the given directory
+        Kept under the user runtime directory if there is one, or under a directory of the user in the temp directory
+        :param cwd:
+        :return:
+        """
+        if os.environ.get(DAEMON_SOCKET_ENV):
+            return os.environ[DAEMON_SOCKET_ENV]
+        digest = hashlib.sha1(os.path.realpath(cwd).encode()).hexdigest()[:16]
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        if runtime_dir and os.path.isdir(runtime_dir):
+            return os.path.join(runtime_dir, "octo-daemon", f"{digest}.sock")
+        return os.path.join(tempfile.gettempdir(), f"octo-daemon-{os.getuid()}", f"{digest}.sock")
+
+    @staticmethod
+    def secure_socket_dir(path: str) -> Optional[str]:
+        """
+        Checks that the directory of the socket is owned by the current user and accessible only to it,
+        so no other user could have placed a socket in it
+        :param path: The socket path
+        :return: The reason the directory cannot be trusted, None if it can
+        """
+        socket_dir = os.path.dirname(os.path.abspath(path))
+        try:
+            dir_stat = os.lstat(socket_dir)
+        except OSError as e:
+            return str(e)
+        if not stat.S_ISDIR(dir_stat.st_mode):
+            return f"[{socket_dir}] is not a directory"
+        if dir_stat.st_uid != os.getuid():
+            return f"[{socket_dir}] is not owned by the current user"
+        if stat.S_IMODE(dir_stat.st_mode) != DAEMON_DIR_MODE:
+            return f"[{socket_dir}] is accessible to other users, expected mode [{oct(DAEMON_DIR_MODE)}]"
+        return None
+
+    @staticmethod
+    def peer_uid(sock: socket.socket) -> Optional[int]:
+        """
+        User of the process on the other end of the socket
+        :param sock:
+        :return: None if the platform does not report it
+        """
+        if not hasattr(socket, "SO_PEERCRED"):
+            return None
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", credentials)
+        return uid
+
+    @staticmethod
+    def trusted_peer(sock: socket.socket) -> bool:
+        """
+        Whether the process on the other end of the socket runs as the current user
+        Platforms that do not report it rely on the socket directory being accessible only to the user
+        :param sock:
+        :return:
+        """
+        uid = OctoDaemonClient.peer_uid(sock)
+        return uid is None or uid == os.getuid()
+
+    @staticmethod
+    def forwarded_env() -> Dict[str, str]:
+        """
+        Variables of the environment the daemon needs to run a command as if it ran locally
+        :return:
+        """
+        names = set(DAEMON_FORWARDED_ENV)
+        names.update(name.strip() for name in os.environ.get(DAEMON_FORWARD_ENV, "").split(",") if name.strip())
+        return {name: value for name, value in os.environ.items()
+                if name in names
+                or name.startswith(DAEMON_FORWARDED_ENV_PREFIXES)
+                or name.endswith(DAEMON_FORWARDED_ENV_SUFFIXES)}
+
+    @staticmethod
+    def send(sock: socket.socket, message: Dict[str, Any]) -> None:
+        """
+        Sends a single newline delimited message
+        :param sock:
+        :param message:
+        :return:
+        """
+        sock.sendall(json.dumps(message).encode() + b"\n")
+
+    @staticmethod
+    def request(cwd: str, request: Dict[str, Any]) -> Optional[int]:
+        """
+        Sends a request to the daemon and streams back its output
+        :param cwd:
+        :param request:
+        :return: The exit code, None if no trusted daemon could be reached
+        """
+        path = OctoDaemonClient.socket_path(cwd)
+        if not os.path.exists(path):
+            return None
+        reason = OctoDaemonClient.secure_socket_dir(path)
+        if reason:
+            sys.stderr.write(f"Not forwarding to the daemon socket [{path}] - [{reason}]\n")
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(DAEMON_CONNECT_TIMEOUT)
+            sock.connect(path)
+            sock.settimeout(None)
+        except OSError:
+            sock.close()
+            return None
+        if not OctoDaemonClient.trusted_peer(sock):
+            sock.close()
+            sys.stderr.write(f"Not forwarding to the daemon socket [{path}] - [served by another user]\n")
+            return None
+        with sock, sock.makefile("rb") as stream:
+            OctoDaemonClient.send(sock, request)
+            for line in stream:
+                message = json.loads(line)
+                if "exit" in message:
+                    return message["exit"]
+                out = sys.stdout if message.get("stream") == "stdout" else sys.stderr
+                out.write(message.get("data", ""))
+                out.flush()
+        return 1
+
+    @staticmethod
+    def forward(argv: List[str]) -> Optional[int]:
+        """
+        Forwards the command line to the daemon serving the current directory
+        :param argv:
+        :return: The exit code, None if the command should run locally
+        """
+        cwd = os.getcwd()
+        return OctoDaemonClient.request(cwd, {"argv": argv, "cwd": cwd, "env": OctoDaemonClient.forwarded_env()})
@@ -5,57 +5,135 @@
 import argparse
 import os
 import sys
-from typing import List
+from typing import TYPE_CHECKING, List, Optional, Tuple, cast
 
-import argcomplete
+from octo_pipeline_python.daemon.octo_daemon_client import OctoDaemonClient
+from octo_pipeline_python.utils.startup_profiler import StartupProfiler
 
-import octo_pipeline_python.backends.backends
-from octo_pipeline_python.actions.action_result import ActionResultCode
-from octo_pipeline_python.backends.backends_context import BackendsContext
-from octo_pipeline_python.commands import (BackendsCommand, Command,
-                                           PipelineCommand, WorkspaceCommand)
-from octo_pipeline_python.utils.logger import logger
-from octo_pipeline_python.workspace.workspace import Workspace
-from octo_pipeline_python.workspace.workspace_builder import WorkspaceBuilder
+if TYPE_CHECKING:
+    from octo_pipeline_python.backends.backends_context import BackendsContext
+    from octo_pipeline_python.commands import Command
+    from octo_pipeline_python.workspace.workspace import Workspace
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
 
-def main():
+def create_cli() -> Tuple[Optional["Workspace"], Optional["BackendsContext"],
+                          argparse.ArgumentParser, List["Command"]]:
+    """
+    Creates the workspace of the current directory and the commands parser over it
+    :return:
+    """
+    with StartupProfiler.phase("imports"):
+        from octo_pipeline_python.backends.backends_context import \
+            BackendsContext
+        from octo_pipeline_python.commands import (BackendsCommand, Command,
+                                                   DaemonCommand,
+                                                   PipelineCommand,
+                                                   WorkspaceCommand)
+        from octo_pipeline_python.utils.metrics import METRICS_FILE_ENV
+        from octo_pipeline_python.workspace.workspace import Workspace
+        from octo_pipeline_python.workspace.workspace_builder import \
+            WorkspaceBuilder
+
     parser = argparse.ArgumentParser()
+    parser.add_argument("--metrics-out",
+                        help=f"Write the execution metrics to the given .prom file, for the node exporter "
+                             f"textfile collector [{METRICS_FILE_ENV}]",
+                        default=None)
     subparsers = parser.add_subparsers(dest="command")
     subparsers.required = True
 
     # Create the supported commands list
     # For each command let it define his parsers
-    workspace: Workspace = WorkspaceBuilder.create()
+    with StartupProfiler.phase("WorkspaceBuilder.create"):
+        workspace: Workspace = WorkspaceBuilder.create()
     backends_context = None
     if workspace:
-        backends_context = BackendsContext(workspace.context)
+        with StartupProfiler.phase("BackendsContext"):
+            backends_context = BackendsContext(workspace.context)
     commands: List[Command] = [PipelineCommand(workspace, backends_context),
                                BackendsCommand(workspace, backends_context),
-                               WorkspaceCommand(workspace, backends_context)]
+                               WorkspaceCommand(workspace, backends_context),
+                               # The daemon serves with a workspace of its own, and never uses the backends context
+                               DaemonCommand(workspace, cast(BackendsContext, backends_context))]
     for command in commands:
-        command.define_command(subparsers)
+        with StartupProfiler.phase(f"{type(command).__name__}.define_command"):
+            command.define_command(subparsers)
+    return workspace, backends_context, parser, commands
 
-    argcomplete.autocomplete(parser)
-    args, unknown = parser.parse_known_args()
-    if len(unknown) > 0:
-        workspace.context.extra_args = unknown
-    # Run the fitting commands
-    for command in commands:
-        if command.can_run_command(args.command, args):
-            result = command.run_command(args)
-            if result == ActionResultCode.SUCCESS:
-                sys.exit(0)
-            elif result == ActionResultCode.FAILURE:
-                logger.error("Failed running command")
-                sys.exit(1)
-            elif result == ActionResultCode.ACTION_DOES_NOT_EXIST:
-                logger.error("No action found")
-                sys.exit(1)
-            elif result == ActionResultCode.PARTIAL_SUCCESS:
-                sys.exit(2)
+
+def run_cli(argv: List[str],
+            workspace: Optional["Workspace"],
+            backends_context: Optional["BackendsContext"],
+            parser: argparse.ArgumentParser,
+            commands: List["Command"]) -> int:
+    """
+    Runs a single command line over an already created workspace
+    :param argv:
+    :param workspace:
+    :param backends_context:
+    :param parser:
+    :param commands:
+    :return: The exit code of the command
+    """
+    from octo_pipeline_python.actions.action_result import ActionResultCode
+    from octo_pipeline_python.utils.logger import logger
+    from octo_pipeline_python.utils.metrics import METRICS_FILE_ENV, Metrics
+    with StartupProfiler.phase("parse_known_args"):
+        args, unknown = parser.parse_known_args(argv)
+    if workspace:
+        workspace.context.extra_args = unknown if len(unknown) > 0 else None
+    metrics_out = args.metrics_out or os.environ.get(METRICS_FILE_ENV)
+    metrics = Metrics.start(metrics_out) if metrics_out else None
+    try:
+        # Run the fitting commands
+        for command in commands:
+            if command.can_run_command(args.command, args):
+                with StartupProfiler.phase(f"{type(command).__name__}.run_command"):
+                    result = command.run_command(args)
+                if result == ActionResultCode.SUCCESS:
+                    return 0
+                elif result == ActionResultCode.FAILURE:
+                    logger.error("Failed running command")
+                    return 1
+                elif result == ActionResultCode.ACTION_DOES_NOT_EXIST:
+                    logger.error("No action found")
+                    return 1
+                elif result == ActionResultCode.PARTIAL_SUCCESS:
+                    return 2
+        return 0
+    finally:
+        if metrics:
+            metrics.stop()
+            # Commands that executed nothing leave the metrics of the last run in place
+            if not metrics.empty:
+                try:
+                    metrics.write()
+                    logger.info(f"Wrote the execution metrics to [{metrics.output_path}]")
+                except OSError as e:
+                    logger.warning(f"Could not write the execution metrics to [{metrics.output_path}] - [{str(e)}]")
+
+
+def main():
+    argv = sys.argv[1:]
+    # Forward to a resident daemon if asked to, daemon stop and status are always answered by it
+    if (OctoDaemonClient.enabled() and argv[:2] != ["daemon", "start"]) or \
+            argv[:2] in (["daemon", "stop"], ["daemon", "status"]):
+        exit_code = OctoDaemonClient.forward(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    profiler = StartupProfiler.from_argv(argv)
+    try:
+        import argcomplete
+        workspace, backends_context, parser, commands = create_cli()
+        argcomplete.autocomplete(parser)
+        exit_code = run_cli(argv, workspace, backends_context, parser, commands)
+    finally:
+        if profiler:
+            profiler.dump()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
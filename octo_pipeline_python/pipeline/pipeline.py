@@ -1,7 +1,14 @@
+import concurrent.futures
+import multiprocessing
 import os
 import shutil
+import traceback
 from datetime import datetime
-from typing import List, Optional, Tuple, Union
+from threading import RLock
+from time import monotonic
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import networkx
 
 from octo_pipeline_python.actions.action_result import (ActionResult,
                                                         ActionResultCode)
@@ -9,14 +16,20 @@ from octo_pipeline_python.actions.action_type import ActionType
 from octo_pipeline_python.backends.backends_context import BackendsContext
 from octo_pipeline_python.common.surrounding import Surrounding
 from octo_pipeline_python.pipeline.pipeline_action import PipelineAction
-from octo_pipeline_python.pipeline.pipeline_context import PipelineContext
+from octo_pipeline_python.pipeline.pipeline_context import (
+    PipelineActionStats, PipelineContext, PipelineStats)
 from octo_pipeline_python.pipeline.pipeline_database import PipelineDatabase
 from octo_pipeline_python.pipeline.pipeline_description import \
     PipelineDescription
-from octo_pipeline_python.utils.git import GitUtils
+from octo_pipeline_python.utils.git import GitCloneStrategy, GitUtils
 from octo_pipeline_python.utils.logger import logger
+from octo_pipeline_python.utils.metrics import Metrics
+from octo_pipeline_python.utils.resource_usage import ResourceUsageMeter
+from octo_pipeline_python.utils.tracer import Tracer
 from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
 
+DEFAULT_PARALLEL_ACTIONS = max(1, min(multiprocessing.cpu_count() // 2, 8))
+
 
 class Pipeline:
     """
@@ -29,8 +42,29 @@ class Pipeline:
         self.__partial_success_results: List[ActionResult] = []
         self.__db = PipelineDatabase(self.__context, self.describe_pipeline())
         self.__is_initialized = False
+        self.__actions_graph: Optional[networkx.DiGraph] = self.__build_actions_graph()
+        self.__stats_lock = RLock()
         if self.__db.contains("stats"):
-            self.__context.stats = self.__db.get("stats")
+            # Validated again, so stats stored before fields were added get their defaults
+            self.__context.stats = PipelineStats.model_validate(vars(self.__db.get("stats")))
+
+    def __build_actions_graph(self) -> Optional[networkx.DiGraph]:
+        """
+        Builds the dependency graph of the actions by their index
+        The graph only exists if at least one of the actions declared needs / after
+        :return:
+        """
+        if not any(action.declares_dependencies for action in self.__actions):
+            return None
+        action_ids: Dict[str, List[int]] = {}
+        for idx, action in enumerate(self.__actions):
+            action_ids.setdefault(action.action_id, []).append(idx)
+        graph = networkx.DiGraph()
+        for idx, action in enumerate(self.__actions):
+            graph.add_node(idx)
+            for dependency in (action.needs or []) + (action.after or []):
+                graph.add_edges_from([(dependency_idx, idx) for dependency_idx in action_ids.get(dependency, [])])
+        return graph
 
     @staticmethod
     def init_pipeline_to(organizations: List[str],
@@ -39,7 +73,9 @@ class Pipeline:
                          to_path: str,
                          head: str = "master",
                          ignore_workspace: bool = False,
-                         external: bool = False) -> Optional["Pipeline"]:
+                         external: bool = False,
+                         clone_strategy: Optional[GitCloneStrategy] = None,
+                         git_cache_dir: Optional[str] = None) -> Optional["Pipeline"]:
         """
         Tries to initialize a pipeline to a given path
         :param organizations:
@@ -49,6 +85,8 @@ class Pipeline:
         :param head:
         :param ignore_workspace:
         :param external:
+        :param clone_strategy:
+        :param git_cache_dir:
         :return:
         """
         from octo_pipeline_python.pipeline.pipeline_builder import \
@@ -61,7 +99,7 @@ class Pipeline:
                     return None
                 return PipelineBuilder.create(to_path, ignore_workspace=ignore_workspace)
         for org in organizations:
-            repo_scm = GitUtils.clone_and_checkout(scm, org, name, to_path, head)
+            repo_scm = GitUtils.clone_and_checkout(scm, org, name, to_path, head, clone_strategy, git_cache_dir)
             if repo_scm:
                 if external:
                     return None
@@ -98,6 +136,29 @@ class Pipeline:
         """
         return not self.__db.has_steps
 
+    @property
+    def actions_stats(self) -> List[PipelineActionStats]:
+        """
+        Getter for the stats of the action runs kept across the pipeline runs, oldest first
+        :return:
+        """
+        return self.__db.actions_stats
+
+    def flush(self) -> None:
+        """
+        Persists the pipeline DB right away, instead of when the pipeline is released
+        :return:
+        """
+        self.__db.flush()
+
+    @property
+    def is_graph(self) -> bool:
+        """
+        Checks if the pipeline actions run as a dependency graph instead of in order
+        :return:
+        """
+        return self.__actions_graph is not None
+
     @property
     def failed(self) -> bool:
         """
@@ -174,8 +235,7 @@ class Pipeline:
                     logger.error(f"[{self.context.name}] Could not initialize backend "
                                  f"[{backend}] for action [{action.action_type}]")
                     return ActionResultCode.FAILURE
-                action_result = backends_context.execute_pipeline_backend_action(backend, action,
-                                                                                 self.__context, workspace_context)
+                action_result = self.__execute_backend_action(backend, action, backends_context, workspace_context)
                 if not action_result or action_result.result_code == ActionResultCode.FAILURE:
                     logger.error(f"[{self.context.name}] Failed to run pipeline action"
                                  f" [{action.action_type}] on backend [{backend}]" + 
@@ -188,19 +248,191 @@ class Pipeline:
         self.__db.commit("stats", self.__context.stats)
         return result
 
+    def __execute_backend_action(self, backend: str,
+                                 action: PipelineAction,
+                                 backends_context: BackendsContext,
+                                 workspace_context: WorkspaceContext) -> Optional[ActionResult]:
+        """
+        Executes an action on a backend, recording its timing and the resources used by its child processes
+        The child processes resources are known only for the whole process, so they are not recorded for
+        actions that ran alongside other actions of this process
+        :param backend:
+        :param action:
+        :param backends_context:
+        :param workspace_context:
+        :return:
+        """
+        start_time = datetime.now()
+        with ResourceUsageMeter() as meter:
+            action_result = backends_context.execute_pipeline_backend_action(backend, action,
+                                                                             self.__context, workspace_context)
+        usage = meter.usage
+        attributed = not meter.overlapped
+        stats = PipelineActionStats(action_id=action.action_id,
+                                    backend=backend,
+                                    start_time=start_time,
+                                    wall_time=usage.wall_time,
+                                    cpu_time=usage.cpu_time if attributed else None,
+                                    peak_rss=usage.peak_rss if attributed else None,
+                                    read_bytes=usage.read_bytes if attributed else None,
+                                    written_bytes=usage.written_bytes if attributed else None,
+                                    result_code=action_result.result_code if action_result
+                                    else ActionResultCode.FAILURE)
+        with self.__stats_lock:
+            self.__context.stats.actions_executed = (self.__context.stats.actions_executed or 0) + 1
+            self.__context.stats.actions[f"{action.action_id}/{backend}"] = stats
+        self.__db.add_action_stats(stats)
+        Metrics.observe("octo_action_duration_seconds", stats.wall_time,
+                        backend=backend, action=action.action_type.value)
+        Metrics.inc("octo_actions_total", backend=backend, action=action.action_type.value,
+                    result=stats.result_code.name.lower())
+        Metrics.flush()
+        return action_result
+
+    def __execute_action(self, action: PipelineAction,
+                         backends_context: BackendsContext,
+                         workspace_context: WorkspaceContext) -> ActionResultCode:
+        """
+        Executes a single pipeline action on all of its backends
+        Does not touch the pipeline DB so it can run from the actions graph workers
+        :param action:
+        :param backends_context:
+        :param workspace_context:
+        :return:
+        """
+        result = ActionResultCode.SUCCESS
+        for backend in action.backends:
+            if self.__db.is_step_disabled(action.action_type.value,
+                                          backend,
+                                          "execute") or \
+                    action.action_name and self.__db.is_step_disabled(action.action_name,
+                                                                      backend,
+                                                                      "execute"):
+                logger.info(f"[{self.context.name}] Action [{action.action_type}] "
+                            f"from backend [{backend}] is disabled in execute" +
+                            (f" for action name [{action.action_name}]" if action.action_name else ""))
+                continue
+            if not backends_context.initialize_pipeline_backend_action(backend, action,
+                                                                       self.__context, workspace_context):
+                logger.error(f"[{self.context.name}] Could not initialize backend "
+                             f"[{backend}] for action [{action.action_type}]")
+                return ActionResultCode.FAILURE
+            action_result = self.__execute_backend_action(backend, action, backends_context, workspace_context)
+            if not action_result or action_result.result_code == ActionResultCode.FAILURE:
+                logger.error(f"[{self.context.name}] Failed to run pipeline action "
+                             f"[{action.action_type}] on backend [{backend}]" +
+                             (f" for action name [{action.action_name}]" if action.action_name else ""))
+                return ActionResultCode.FAILURE
+            if action_result.result_code == ActionResultCode.PARTIAL_SUCCESS:
+                self.__partial_success_results.append(action_result)
+            if action_result.result_code != ActionResultCode.SUCCESS:
+                result = action_result.result_code
+        return result
+
+    def __execute_actions_graph(self,
+                                graph: networkx.DiGraph,
+                                backends_context: BackendsContext,
+                                workspace_context: WorkspaceContext,
+                                parallel_jobs: Optional[int] = None) -> ActionResultCode:
+        """
+        Executes the pipeline actions per their needs / after graph
+        Actions that do not depend on each other run concurrently on a worker pool
+        Completed actions are stored on the DB, so a failed pipeline resumes from the failed actions
+        :param graph:
+        :param backends_context:
+        :param workspace_context:
+        :param parallel_jobs:
+        :return:
+        """
+        if not parallel_jobs:
+            parallel_jobs = DEFAULT_PARALLEL_ACTIONS
+        result = ActionResultCode.SUCCESS
+        completed: Set[int] = set()
+        pending: Set[int] = set()
+        for idx, action in enumerate(self.__actions):
+            if self.__db.is_step_completed(idx):
+                completed.add(idx)
+            elif self.__context.surrounding not in action.surroundings:
+                logger.info(f"[{self.context.name}] Action [{action.action_type}] Does not fit surrounding "
+                            f"[{self.__context.surrounding}], Ignoring")
+                completed.add(idx)
+            else:
+                pending.add(idx)
+        failed = False
+        with concurrent.futures.ThreadPoolExecutor(max_workers=parallel_jobs) as executor:
+            active_futures: Dict[concurrent.futures.Future, int] = {}
+            while len(pending) > 0 or len(active_futures) > 0:
+                if not failed:
+                    for idx in sorted(pending):
+                        if all(dependency in completed for dependency in graph.predecessors(idx)):
+                            self.__db.mark_step_started(idx)
+                            active_futures[executor.submit(self.__execute_action, self.__actions[idx],
+                                                           backends_context, workspace_context)] = idx
+                            pending.remove(idx)
+                if len(active_futures) == 0:
+                    break
+                done, _ = concurrent.futures.wait(active_futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for f in done:
+                    idx = active_futures.pop(f)
+                    try:
+                        action_result = f.result()
+                    except Exception as e:
+                        logger.error(f"[{self.context.name}] Error occurred while running action "
+                                     f"[{self.__actions[idx].action_id}] - [{str(e)}]")
+                        logger.error(traceback.format_exc())
+                        action_result = ActionResultCode.FAILURE
+                    if action_result == ActionResultCode.FAILURE:
+                        failed = True
+                        continue
+                    if action_result != ActionResultCode.SUCCESS:
+                        result = action_result
+                    completed.add(idx)
+                    self.__db.mark_step_completed(idx)
+                self.__db.commit("stats", self.__context.stats)
+        if failed:
+            self.__db.mark_dirty()
+            self.__db.flush()
+            return ActionResultCode.FAILURE
+        self.__db.complete_steps()
+        self.__db.commit("stats", self.__context.stats)
+        return result
+
     def execute_pipeline(self,
                          backends_context: BackendsContext,
                          workspace_context: WorkspaceContext,
-                         clear_database: bool = False) -> ActionResultCode:
+                         clear_database: bool = False,
+                         parallel_jobs: Optional[int] = None) -> ActionResultCode:
         """
         Executes the entire pipeline
-        Each action will be executed in order
+        Each action will be executed in order, unless the actions declare needs / after
+        in which case independent actions are executed concurrently
         If a backend was not initialized yet, will also try and initialize the backend
         :param backends_context:
         :param workspace_context:
         :param clear_database:
+        :param parallel_jobs:
         :return: bool
         """
+        start = monotonic()
+        with Tracer.span(self.context.name, "pipeline", pipeline=self.context.name):
+            result = self.__execute_pipeline(backends_context, workspace_context, clear_database, parallel_jobs)
+        Metrics.observe("octo_pipeline_duration_seconds", monotonic() - start, pipeline=self.context.name)
+        Metrics.inc("octo_pipelines_total", pipeline=self.context.name, result=result.name.lower())
+        Metrics.flush()
+        return result
+
+    def __execute_pipeline(self, backends_context: BackendsContext,
+                           workspace_context: WorkspaceContext,
+                           clear_database: bool,
+                           parallel_jobs: Optional[int]) -> ActionResultCode:
+        """
+        Executes the entire pipeline, see execute_pipeline
+        :param backends_context:
+        :param workspace_context:
+        :param clear_database:
+        :param parallel_jobs:
+        :return:
+        """
         # Create the working dir
         if not os.path.exists(self.context.working_dir):
             os.makedirs(self.context.working_dir)
@@ -214,54 +446,48 @@ class Pipeline:
             self.__context.stats.start_time = datetime.now()
             self.__partial_success_results = []
         # Start the pipeline
-        result = ActionResultCode.SUCCESS
-        for action in self.__actions[self.__db.current_step_idx:]:
-            if self.__context.surrounding not in action.surroundings:
-                logger.info(f"[{self.context.name}] Action [{action.action_type}] Does not fit surrounding "
-                            f"[{self.__context.surrounding}], Ignoring")
-                self.step_next_pipeline_action()
-                continue
-            for backend in action.backends:
-                if self.__db.is_step_disabled(action.action_type.value,
-                                              backend,
-                                              "execute") or \
-                        action.action_name and self.__db.is_step_disabled(action.action_name,
-                                                                          backend,
-                                                                          "execute"):
-                    logger.info(f"[{self.context.name}] Action [{action.action_type}] "
-                                f"from backend [{backend}] is disabled in execute" +
-                                (f" for action name [{action.action_name}]" if action.action_name else ""))
+        if self.__actions_graph is not None:
+            result = self.__execute_actions_graph(self.__actions_graph, backends_context, workspace_context,
+                                                  parallel_jobs)
+            if result == ActionResultCode.FAILURE:
+                return result
+        else:
+            result = ActionResultCode.SUCCESS
+            for action in self.__actions[self.__db.current_step_idx:]:
+                if self.__context.surrounding not in action.surroundings:
+                    logger.info(f"[{self.context.name}] Action [{action.action_type}] Does not fit surrounding "
+                                f"[{self.__context.surrounding}], Ignoring")
+                    self.step_next_pipeline_action()
                     continue
-                if not backends_context.initialize_pipeline_backend_action(backend, action,
-                                                                           self.__context, workspace_context):
-                    logger.error(f"[{self.context.name}] Could not initialize backend "
-                                 f"[{backend}] for action [{action.action_type}]")
-                    return ActionResultCode.FAILURE
-                action_result = backends_context.execute_pipeline_backend_action(backend, action,
-                                                                                 self.__context, workspace_context)
-                if not action_result or action_result.result_code == ActionResultCode.FAILURE:
-                    logger.error(f"[{self.context.name}] Failed to run pipeline action "
-                                 f"[{action.action_type}] on backend [{backend}]" +
-                                 (f" for action name [{action.action_name}]" if action.action_name else ""))
+                action_result = self.__execute_action(action, backends_context, workspace_context)
+                if action_result == ActionResultCode.FAILURE:
                     self.__db.mark_dirty()
                     self.__db.flush()
                     return ActionResultCode.FAILURE
-                if action_result.result_code == ActionResultCode.PARTIAL_SUCCESS:
-                    self.__partial_success_results.append(action_result)
-                if action_result.result_code != ActionResultCode.SUCCESS:
-                    result = action_result.result_code
-            self.step_next_pipeline_action()
+                if action_result != ActionResultCode.SUCCESS:
+                    result = action_result
+                self.step_next_pipeline_action()
 
         # Check finalized result
         if len(self.__partial_success_results) > 0:
             logger.warning(f"[{self.context.name}] Partially succeeded running pipeline")
-            for result in self.__partial_success_results:
-                BackendsContext.print_result(result, self.context)
+            for partial_success_result in self.__partial_success_results:
+                BackendsContext.print_result(partial_success_result, self.context)
         else:
             logger.info(f"[{self.context.name}] Successfully Finished Executing Pipeline")
         self.__context.stats.end_time = datetime.now()
         return result
 
+    def __executed_actions_reversed(self) -> List[PipelineAction]:
+        """
+        Getter for the actions that ran so far, in the reversed order for cleanup
+        :return:
+        """
+        if self.is_graph:
+            return [self.__actions[idx] for idx in reversed(list(networkx.topological_sort(self.__actions_graph)))
+                    if self.__db.is_step_started(idx) or not self.__db.has_steps]
+        return list(reversed(self.__actions[:self.__db.current_step_idx+1]))
+
     def cleanup_pipeline(self,
                          backends_context: BackendsContext,
                          workspace_context: WorkspaceContext,
@@ -284,7 +510,7 @@ class Pipeline:
             logger.error(f"[{self.context.name}] Failed to initialize pipeline")
             return None
         # Run the actions reversed for cleanup
-        for action in reversed(self.__actions[:self.__db.current_step_idx+1]):
+        for action in self.__executed_actions_reversed():
             if self.__context.surrounding not in action.surroundings:
                 logger.info(f"[{self.context.name}] Action [{action.action_type}] Does not fit surrounding "
                             f"[{self.__context.surrounding}], Ignoring")
@@ -326,7 +552,7 @@ class Pipeline:
         # Create the working dir
         if not os.path.exists(self.__context.working_dir):
             return None
-        for action in reversed(self.__actions[:self.__db.current_step_idx+1]):
+        for action in self.__executed_actions_reversed():
             if self.__context.surrounding not in action.surroundings and \
                Surrounding.OnDemand not in action.surroundings:
                 logger.info(f"[{self.context.name}] Action [{action.action_type}] Does not fit surrounding "
@@ -429,8 +655,7 @@ class Pipeline:
                     logger.error(f"[{self.context.name}] Could not initialize backend "
                                  f"[{backend}] for action [{action.action_type}]")
                     return ActionResultCode.FAILURE
-                action_result = backends_context.execute_pipeline_backend_action(backend, action,
-                                                                                 self.__context, workspace_context)
+                action_result = self.__execute_backend_action(backend, action, backends_context, workspace_context)
                 if not action_result or action_result.result_code == ActionResultCode.FAILURE:
                     logger.error(f"[{self.context.name}] Failed to run pipeline action "
                                  f"[{action.action_type}] on backend [{backend}]" +
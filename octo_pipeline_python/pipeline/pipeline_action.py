@@ -11,3 +11,23 @@ class PipelineAction(BaseModel):
     backends: List[str] = Field(description="On which backends to run the action")
     surroundings: List[Surrounding] = Field(description="Which surroundings is the action allowed to run on")
     action_name: Optional[str] = Field(default=None, description="Action name to make the action unique")
+    needs: Optional[List[str]] = Field(default=None,
+                                       description="Actions of the pipeline that must succeed before this action runs")
+    after: Optional[List[str]] = Field(default=None,
+                                       description="Actions of the pipeline that must run first if they run at all")
+
+    @property
+    def action_id(self) -> str:
+        """
+        Identifier of the action inside the pipeline, used for the needs / after references
+        :return:
+        """
+        return self.action_name or self.action_type.value
+
+    @property
+    def declares_dependencies(self) -> bool:
+        """
+        Checks if the action declared explicit dependencies, even empty ones
+        :return:
+        """
+        return self.needs is not None or self.after is not None
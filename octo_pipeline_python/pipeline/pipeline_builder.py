@@ -2,10 +2,10 @@ import getpass
 import os
 from typing import Dict, List, Optional
 
+import networkx
 import yaml
 
 from octo_pipeline_python.actions.action_type import ActionType
-from octo_pipeline_python.backends.backend import Backend
 from octo_pipeline_python.backends.backend_settings import BackendSettings
 from octo_pipeline_python.common.surrounding import Surrounding
 from octo_pipeline_python.pipeline.pipeline import Pipeline
@@ -51,6 +51,47 @@ class PipelineBuilder:
                 maintainers.extend(pipeline_yaml['maintainers'])
         return maintainers
 
+    @staticmethod
+    def __get_action_dependencies(action: Dict, key: str) -> Optional[List[str]]:
+        """
+        Tries to get the needs / after dependencies of an action
+        :param action:
+        :param key:
+        :return: None if the action does not declare the key
+        """
+        if key not in action:
+            return None
+        dependencies = action[key]
+        if not dependencies:
+            return []
+        if isinstance(dependencies, str):
+            return [dependencies]
+        return list(dependencies)
+
+    @staticmethod
+    def __validate_dependencies(pipeline: List[PipelineAction]) -> bool:
+        """
+        Validates that the needs of the actions exist and that the actions do not form a cycle
+        :param pipeline:
+        :return:
+        """
+        action_ids = {action.action_id for action in pipeline}
+        graph = networkx.DiGraph()
+        for action in pipeline:
+            graph.add_node(action.action_id)
+            for need in action.needs or []:
+                if need not in action_ids:
+                    logger.warning(f"Action [{action.action_id}] needs unknown action [{need}]")
+                    return False
+                graph.add_edge(need, action.action_id)
+            graph.add_edges_from([(after, action.action_id) for after in action.after or [] if after in action_ids])
+        if not networkx.algorithms.dag.is_directed_acyclic_graph(graph):
+            cycle = [u for (u, v) in networkx.algorithms.cycles.find_cycle(graph)]
+            cycle.append(cycle[0])
+            logger.warning(f"Pipeline actions contain a circular dependency [{' -> '.join(cycle)}]")
+            return False
+        return True
+
     @staticmethod
     def __get_surrounding():
         """
@@ -133,7 +174,8 @@ class PipelineBuilder:
         :param ignore_workspace:
         :return:
         """
-        import octo_pipeline_python.backends.backends
+        from octo_pipeline_python.backends.backends_registry import \
+            BackendsRegistry
 
         # Try to find pipeline file if not given
         if not pipeline_file_path:
@@ -152,12 +194,12 @@ class PipelineBuilder:
                 elif pipeline_name and pipeline_name in workspace.describe_pipelines(with_groups=False):
                     return PipelineBuilder.create(source_dir=workspace.pipeline_path(pipeline_name))
                 else:
-                    pipeline_name: Optional[str] = Search.\
+                    found_pipeline_name = Search.\
                         search_pipeline_name(hints=[source_dir],
                                              possible_pipelines=workspace.describe_pipelines(
                                                  with_groups=False))
-                    if pipeline_name:
-                        return PipelineBuilder.create(source_dir=workspace.pipeline_path(pipeline_name))
+                    if found_pipeline_name:
+                        return PipelineBuilder.create(source_dir=workspace.pipeline_path(found_pipeline_name))
                     return None
         # Make sure it exists
         if not os.path.exists(pipeline_file_path):
@@ -217,7 +259,7 @@ class PipelineBuilder:
                     if len(backends) == 0:
                         logger.warning(f"Action [{action_type_name}] must have at least one backend")
                         return None
-                    if any(backend not in [s.backend_name() for s in Backend.__subclasses__()] for backend in backends):
+                    if any(not BackendsRegistry.has_backend(backend) for backend in backends):
                         logger.warning(f"Some of the backends are invalid [{backends}]")
                         return None
                     if 'surroundings' not in action:
@@ -231,5 +273,9 @@ class PipelineBuilder:
                     pipeline.append(PipelineAction(action_type=action_type,
                                                    backends=backends,
                                                    surroundings=surroundings,
-                                                   action_name=action_name))
+                                                   action_name=action_name,
+                                                   needs=PipelineBuilder.__get_action_dependencies(action, "needs"),
+                                                   after=PipelineBuilder.__get_action_dependencies(action, "after")))
+            if not PipelineBuilder.__validate_dependencies(pipeline):
+                return None
             return Pipeline(context, pipeline)
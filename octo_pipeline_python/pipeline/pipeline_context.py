@@ -2,20 +2,50 @@ import os
 import subprocess
 import sys
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 from packaging.version import Version
 from pydantic import BaseModel, Field, field_validator
 
+from octo_pipeline_python.actions.action_result import ActionResultCode
 from octo_pipeline_python.common.surrounding import Surrounding
 from octo_pipeline_python.utils.logger import logger
 
+if TYPE_CHECKING:
+    from octo_pipeline_python.actions.action_cache_settings import \
+        ActionCacheSettings
+    from octo_pipeline_python.actions.action_type import ActionType
+    from octo_pipeline_python.backends.backend import Backend
+
+
+class PipelineActionStats(BaseModel):
+    action_id: str = Field(description="Identifier of the action inside the pipeline")
+    backend: str = Field(description="Backend the action ran on")
+    start_time: datetime = Field(description="Start time of the action")
+    wall_time: float = Field(description="Wall time of the action in seconds")
+    cpu_time: Optional[float] = Field(default=None,
+                                      description="User and system time of the child processes that finished "
+                                                  "during the action in seconds, none when it overlapped other actions")
+    peak_rss: Optional[int] = Field(default=None,
+                                    description="Peak resident memory of the child processes since the process start "
+                                                "in bytes, only when the action raised it and did not overlap "
+                                                "other actions")
+    read_bytes: Optional[int] = Field(default=None,
+                                      description="Bytes read from disk by the child processes during the action, "
+                                                  "none when it overlapped other actions")
+    written_bytes: Optional[int] = Field(default=None,
+                                         description="Bytes written to disk by the child processes during the action, "
+                                                     "none when it overlapped other actions")
+    result_code: ActionResultCode = Field(description="Result code of the action")
+
 
 class PipelineStats(BaseModel):
     start_time: Optional[datetime] = Field(
         default=None, description="Start time of the pipeline")
     end_time: Optional[datetime] = Field(default=None, description="End time of the pipeline")
     actions_executed: Optional[int] = Field(description="Number of actions executed so far", default=0)
+    actions: Dict[str, PipelineActionStats] = Field(default_factory=dict,
+                                                    description="Stats of the last run of every action per backend")
 
 
 class PipelineContext(BaseModel):
@@ -70,7 +100,7 @@ class PipelineContext(BaseModel):
         """
         from octo_pipeline_python.backends.backend_description import \
             BackendDescription
-        backend_desc: BackendDescription = backend.describe_backend(self, workspace_context)
+        backend_desc: BackendDescription = backend.description(None, workspace_context)
         if backend.backend_name() in self.backends_settings and \
                 self.backends_settings[backend.backend_name()].backend_args:
             return backend_desc.backend_model.model_validate(self.backends_settings[backend.backend_name()].backend_args)
@@ -104,6 +134,39 @@ class PipelineContext(BaseModel):
                 return action_combined_settings
         return None
 
+    def backend_cache_settings_for_backend(self, backend: "Backend", action_type: "ActionType",
+                                           action_name: Optional[str] = None) -> \
+            Optional["ActionCacheSettings"]:
+        """
+        Getter for the action result cache settings of the backend per pipeline
+        :param backend:
+        :param action_type:
+        :param action_name:
+        :return:
+        """
+        if self.backends_settings and backend.backend_name() in self.backends_settings:
+            cache_settings = self.backends_settings[backend.backend_name()].backend_cache_settings
+            if cache_settings:
+                if action_name and action_name in cache_settings:
+                    return cache_settings[action_name]
+                if action_type and action_type in cache_settings:
+                    return cache_settings[action_type]
+        return None
+
+    def backend_concurrency_limits_for_backend(self, backend: "Backend", action_type: "ActionType",
+                                               action_name: Optional[str] = None) -> \
+            Tuple[Optional[int], Optional[int]]:
+        """
+        Getter for the concurrency limits of the backend and of the action per pipeline
+        :param backend:
+        :param action_type:
+        :param action_name:
+        :return:
+        """
+        if self.backends_settings and backend.backend_name() in self.backends_settings:
+            return self.backends_settings[backend.backend_name()].concurrency_limits(action_type, action_name)
+        return None, None
+
     def run_contextual(self, command: str, log_command: bool = True, **kwargs) -> subprocess.Popen:
         runner = ""
         os_pip_path = os.path.join(self.source_dir, "pipenvs", sys.platform)
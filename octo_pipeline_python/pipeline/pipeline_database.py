@@ -1,14 +1,19 @@
-from typing import Optional
+from threading import RLock
+from typing import Final, List, Optional, Set
 
 from overrides import overrides
 
 from octo_pipeline_python.common.database import Database
 from octo_pipeline_python.pipeline.pipeline_action import PipelineAction
-from octo_pipeline_python.pipeline.pipeline_context import PipelineContext
+from octo_pipeline_python.pipeline.pipeline_context import (
+    PipelineActionStats, PipelineContext)
 from octo_pipeline_python.pipeline.pipeline_description import \
     PipelineDescription
 from octo_pipeline_python.utils.logger import logger
 
+ACTIONS_STATS_KEY: Final[str] = "actions-stats"
+MAX_ACTIONS_STATS: Final[int] = 500
+
 
 class PipelineDatabase(Database):
     def __init__(self, context: PipelineContext, pipeline_description: PipelineDescription):
@@ -18,6 +23,9 @@ class PipelineDatabase(Database):
         self.__current_step_idx = 0
         self.__dirty = False
         self.__disabled_steps = []
+        self.__started_steps: Set[int] = set()
+        self.__completed_steps: Set[int] = set()
+        self.__actions_stats_lock = RLock()
         if self.contains("step"):
             self.__current_step_idx = self.get("step")
         if self.contains("dirty"):
@@ -28,6 +36,10 @@ class PipelineDatabase(Database):
                 self.__current_step_idx += 1
         if self.contains("disabled-steps"):
             self.__disabled_steps = self.get("disabled-steps")
+        if self.contains("started-steps"):
+            self.__started_steps = set(self.get("started-steps"))
+        if self.contains("completed-steps"):
+            self.__completed_steps = set(self.get("completed-steps"))
 
     def mark_dirty(self) -> None:
         """
@@ -89,6 +101,49 @@ class PipelineDatabase(Database):
             logger.info(f"[{self.tag}] Reached first step")
         self.commit("step", self.__current_step_idx, False)
 
+    def mark_step_started(self, idx: int) -> None:
+        """
+        Marks a step as started, used when the actions run as a graph and not in order
+        :param idx:
+        :return:
+        """
+        self.__started_steps.add(idx)
+        self.commit("started-steps", self.__started_steps, False)
+
+    def mark_step_completed(self, idx: int) -> None:
+        """
+        Marks a step as completed, used when the actions run as a graph and not in order
+        :param idx:
+        :return:
+        """
+        self.__completed_steps.add(idx)
+        self.commit("completed-steps", self.__completed_steps, False)
+
+    def is_step_started(self, idx: int) -> bool:
+        """
+        Checks if a step was started
+        :param idx:
+        :return:
+        """
+        return idx in self.__started_steps
+
+    def is_step_completed(self, idx: int) -> bool:
+        """
+        Checks if a step was completed
+        :param idx:
+        :return:
+        """
+        return idx in self.__completed_steps
+
+    def complete_steps(self) -> None:
+        """
+        Moves the step pointer past the last step, once all of the steps completed
+        :return:
+        """
+        self.__current_step_idx = len(self.__description.actions)
+        logger.info(f"[{self.tag}] Reached last step")
+        self.commit("step", self.__current_step_idx, False)
+
     def disable_step(self,
                      action: str,
                      backend: Optional[str] = None,
@@ -161,11 +216,34 @@ class PipelineDatabase(Database):
                 return True
         return False
 
+    def add_action_stats(self, stats: PipelineActionStats) -> None:
+        """
+        Adds the stats of an action run to the history kept across the runs, dropping the oldest runs
+        :param stats:
+        :return:
+        """
+        with self.__actions_stats_lock:
+            self.commit(ACTIONS_STATS_KEY, self.actions_stats[-(MAX_ACTIONS_STATS - 1):] + [stats], False)
+
+    @property
+    def actions_stats(self) -> List[PipelineActionStats]:
+        """
+        Getter for the history of the action runs, oldest first
+        :return:
+        """
+        return list(self.get(ACTIONS_STATS_KEY) or [])
+
     @overrides
     def reset(self) -> None:
         self.__current_step_idx = 0
         self.__dirty = False
+        self.__started_steps = set()
+        self.__completed_steps = set()
+        # The history of the action runs outlives the resets, it is what the runs are compared by
+        actions_stats = self.actions_stats
         super().reset()
+        if actions_stats:
+            self.commit(ACTIONS_STATS_KEY, actions_stats, False)
 
     @property
     def current_step(self) -> Optional[PipelineAction]:
@@ -1,11 +1,81 @@
+import concurrent.futures
+import hashlib
 import os
 import re
-from typing import List, Optional
+import shutil
+import subprocess
+from typing import Any, Dict, Final, List, Optional
 
 import git
+from pydantic import BaseModel, ConfigDict, Field
 
 from octo_pipeline_python.utils.logger import logger
 
+DEFAULT_SYNC_STATUS_JOBS: Final[int] = 16
+GIT_CACHE_DIR_ENV: Final[str] = "OCTO_GIT_CACHE_DIR"
+
+
+class GitSyncStatus(BaseModel):
+    path: str = Field(description="Path of the repo")
+    branch: Optional[str] = Field(default=None, description="Checked out branch")
+    remote: str = Field(description="Remote the branch was compared with")
+    ahead: Optional[int] = Field(default=None, description="Commits on the branch missing from the remote")
+    behind: Optional[int] = Field(default=None, description="Commits on the remote missing from the branch")
+    error: Optional[str] = Field(default=None, description="Why the status could not be computed")
+
+    @property
+    def out_of_sync(self) -> bool:
+        """
+        Whether the branch differs from the remote, a status that could not be computed counts as out of sync
+        :return:
+        """
+        return self.error is not None or bool(self.ahead) or bool(self.behind)
+
+
+class GitCloneStrategy(BaseModel):
+    depth: Optional[int] = Field(default=None, gt=0, description="Number of commits of history to clone")
+    filter: Optional[str] = Field(default=None, description="Partial clone filter, such as blob:none")
+    single_branch: bool = Field(default=False, description="Clone only the history of the head branch")
+    reference: Optional[str] = Field(default=None, description="Local object cache to borrow objects from")
+    model_config = ConfigDict(frozen=True)
+
+    @property
+    def narrow(self) -> bool:
+        """
+        Whether the clone only fetches the head branch, so it has to clone it directly
+        :return:
+        """
+        return self.depth is not None or self.single_branch
+
+    def clone_kwargs(self, branch: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Clone options of the strategy, in the keyword form of the git command wrapper
+        :param branch:
+        :return:
+        """
+        kwargs: Dict[str, Any] = {}
+        if branch and self.narrow:
+            kwargs["branch"] = branch
+        if self.depth is not None:
+            kwargs["depth"] = self.depth
+        if self.filter:
+            kwargs["filter"] = self.filter
+        if self.single_branch:
+            kwargs["single_branch"] = True
+        if self.reference:
+            # A missing cache falls back to a regular clone instead of failing it
+            kwargs["reference_if_able"] = self.reference
+        return kwargs
+
+    def clone_args(self, branch: Optional[str] = None) -> List[str]:
+        """
+        Clone options of the strategy, as git command line arguments
+        :param branch:
+        :return:
+        """
+        return [f"--{key.replace('_', '-')}" if value is True else f"--{key.replace('_', '-')}={value}"
+                for key, value in self.clone_kwargs(branch).items()]
+
 
 class GitUtils:
     @staticmethod
@@ -59,44 +129,152 @@ class GitUtils:
         return False
 
     @staticmethod
-    def clone_and_checkout(scm: str, org: str, name: str, to_path, branch: str) -> Optional[str]:
+    def mirror_cache_dir(cache_dir: Optional[str] = None) -> Optional[str]:
+        """
+        Machine wide directory of the bare mirrors new clones borrow objects from, if enabled
+        :param cache_dir: Directory given explicitly, taking precedence over the environment
+        :return:
+        """
+        cache_dir = cache_dir or os.environ.get(GIT_CACHE_DIR_ENV)
+        return os.path.abspath(os.path.expanduser(cache_dir)) if cache_dir else None
+
+    @staticmethod
+    def mirror_path(cache_dir: str, url: str) -> str:
+        """
+        Path of the bare mirror of a remote url in the cache
+        :param cache_dir:
+        :param url:
+        :return:
+        """
+        name = re.sub(r"\.git$", "", url.rstrip("/").split("/")[-1].split(":")[-1]) or "repo"
+        return os.path.join(cache_dir, f"{name}-{hashlib.sha1(url.encode()).hexdigest()[:16]}.git")
+
+    @staticmethod
+    def update_mirror(url: str, cache_dir: str) -> Optional[str]:
+        """
+        Creates or refreshes with a single fetch the bare mirror of a remote url
+        The mirror is locked while updated, so workspaces sharing the cache never update it at once
+        Its objects are never pruned or collected, as the clones borrowing them would break
+        Mirrors are not used where the lock cannot be taken, as on Windows
+        :param url:
+        :param cache_dir:
+        :return: Path of the mirror, None if the remote could not be mirrored
+        """
+        try:
+            import fcntl
+        except ImportError:
+            logger.warning(f"Mirror cache is not supported on this platform, cloning [{url}] without it")
+            return None
+        path = GitUtils.mirror_path(cache_dir, url)
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(f"{path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if os.path.exists(path):
+                    subprocess.run(["git", "--git-dir", path, "fetch", "--quiet", "origin"],
+                                   env=env, check=True, capture_output=True)
+                    return path
+                # Cloned aside, so an interrupted clone never leaves a broken mirror behind
+                staging_path = f"{path}.tmp"
+                shutil.rmtree(staging_path, ignore_errors=True)
+                subprocess.run(["git", "clone", "--quiet", "--mirror", url, staging_path],
+                               env=env, check=True, capture_output=True)
+                subprocess.run(["git", "--git-dir", staging_path, "config", "gc.auto", "0"],
+                               env=env, check=True, capture_output=True)
+                os.rename(staging_path, path)
+                logger.info(f"Mirrored [{url}] into [{path}]")
+                return path
+            except (subprocess.CalledProcessError, OSError) as e:
+                logger.debug(f"Failed to mirror [{url}] [{e}]")
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return None
+
+    @staticmethod
+    def cached_clone_strategy(url: str, strategy: Optional[GitCloneStrategy] = None,
+                              cache_dir: Optional[str] = None) -> GitCloneStrategy:
+        """
+        Clone strategy borrowing objects from the mirror cache, when enabled and no reference was given
+        :param url:
+        :param strategy:
+        :param cache_dir: Directory of the mirrors, defaults to the one of the environment
+        :return:
+        """
+        strategy = strategy or GitCloneStrategy()
+        cache_dir = GitUtils.mirror_cache_dir(cache_dir)
+        if strategy.reference or not cache_dir:
+            return strategy
+        mirror = GitUtils.update_mirror(url, cache_dir)
+        return strategy.model_copy(update={"reference": mirror}) if mirror else strategy
+
+    @staticmethod
+    def clone_and_checkout(scm: str, org: str, name: str, to_path, branch: str,
+                           strategy: Optional[GitCloneStrategy] = None,
+                           cache_dir: Optional[str] = None) -> Optional[str]:
         ssh_scm = GitUtils.create_ssh_scm_for(scm, org, name)
+        strategy = GitUtils.cached_clone_strategy(ssh_scm, strategy, cache_dir)
         try:
             logger.info(f"Trying to checkout [{name}] from org [{org}] ")
-            repo = git.Repo.clone_from(ssh_scm, to_path)
-            repo.git.checkout(branch)
+            repo = git.Repo.clone_from(ssh_scm, to_path, **strategy.clone_kwargs(branch))
+            if not strategy.narrow:
+                repo.git.checkout(branch)
             return ssh_scm
         except:
             pass
         return None
 
     @staticmethod
-    def is_behind_on_commits(path: str, remote: str = "origin") -> bool:
+    def sync_status(path: str, remote: str = "origin", fetch: bool = True) -> GitSyncStatus:
+        """
+        Compares the checked out branch with its remote with a single fetch
+        Both counts come from one rev-list walk instead of iterating the commits
+        :param path:
+        :param remote:
+        :param fetch:
+        :return:
+        """
+        status = GitSyncStatus(path=path, remote=remote)
         try:
             repo = git.Repo(path)
-            head_branch = repo.active_branch
-            repo.git.fetch(remote)
-            commits_behind = sum(1 for c in repo.iter_commits(f"{head_branch}..{remote}/{head_branch}"))
-            if commits_behind > 0:
-                return True
-            return False
-        except:
-            pass
-        return True
+            status.branch = str(repo.active_branch)
+            if fetch:
+                repo.git.fetch(remote)
+            ahead, behind = repo.git.rev_list("--left-right", "--count",
+                                              f"{status.branch}...{remote}/{status.branch}").split()
+            status.ahead = int(ahead)
+            status.behind = int(behind)
+        except Exception as e:
+            status.error = str(e)
+        return status
+
+    @staticmethod
+    def sync_statuses(paths: List[str],
+                      remote: str = "origin",
+                      fetch: bool = True,
+                      parallel_jobs: int = DEFAULT_SYNC_STATUS_JOBS) -> Dict[str, GitSyncStatus]:
+        """
+        Computes the sync status of many repos, fetching at most parallel_jobs of them at once
+        :param paths:
+        :param remote:
+        :param fetch:
+        :param parallel_jobs:
+        :return:
+        """
+        if not paths:
+            return {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(parallel_jobs, len(paths)))) as executor:
+            return dict(zip(paths, executor.map(lambda path: GitUtils.sync_status(path, remote, fetch), paths)))
+
+    @staticmethod
+    def is_behind_on_commits(path: str, remote: str = "origin") -> bool:
+        status = GitUtils.sync_status(path, remote)
+        return status.error is not None or (status.behind or 0) > 0
 
     @staticmethod
     def is_ahead_on_commits(path: str, remote: str = "origin") -> bool:
-        try:
-            repo = git.Repo(path)
-            head_branch = repo.active_branch
-            repo.git.fetch(remote)
-            commits_ahead = sum(1 for c in repo.iter_commits(f"{remote}/{head_branch}..{head_branch}"))
-            if commits_ahead > 0:
-                return True
-            return False
-        except:
-            pass
-        return True
+        status = GitUtils.sync_status(path, remote)
+        return status.error is not None or (status.ahead or 0) > 0
 
     @staticmethod
     def pull_latest_code(path: str, remote: str = "origin") -> bool:
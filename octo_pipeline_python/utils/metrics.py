@@ -0,0 +1,259 @@
+import os
+import threading
+import time
+from enum import Enum
+from typing import Dict, Final, List, NamedTuple, Optional, Tuple
+
+from octo_pipeline_python.utils.logger import logger
+
+METRICS_FILE_ENV: Final[str] = "OCTO_METRICS_FILE"
+# Minimal seconds between two writes of the metrics file while running
+METRICS_WRITE_INTERVAL: Final[float] = 5.0
+ACTION_DURATION_BUCKETS: Final[Tuple[float, ...]] = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+PIPELINE_DURATION_BUCKETS: Final[Tuple[float, ...]] = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+QUEUE_WAIT_BUCKETS: Final[Tuple[float, ...]] = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600)
+
+Labels = Tuple[Tuple[str, str], ...]
+MetricsSnapshot = Dict[Tuple[str, Labels], List[float]]
+
+
+class MetricType(str, Enum):
+    Counter = "counter"
+    Gauge = "gauge"
+    Histogram = "histogram"
+
+
+class MetricDefinition(NamedTuple):
+    type: MetricType
+    help: str
+    buckets: Tuple[float, ...] = ()
+
+
+METRICS: Final[Dict[str, MetricDefinition]] = {
+    "octo_action_duration_seconds": MetricDefinition(MetricType.Histogram,
+                                                     "Duration of the pipeline actions per backend",
+                                                     ACTION_DURATION_BUCKETS),
+    "octo_actions_total": MetricDefinition(MetricType.Counter,
+                                           "Pipeline actions that ran per backend and result"),
+    "octo_action_cache_lookups_total": MetricDefinition(MetricType.Counter,
+                                                        "Lookups of the action cache per backend"),
+    "octo_action_cache_hits_total": MetricDefinition(MetricType.Counter,
+                                                     "Lookups of the action cache per backend that restored a result"),
+    "octo_pipeline_duration_seconds": MetricDefinition(MetricType.Histogram,
+                                                       "Duration of the pipeline executions",
+                                                       PIPELINE_DURATION_BUCKETS),
+    "octo_pipelines_total": MetricDefinition(MetricType.Counter,
+                                             "Pipeline executions per result"),
+    "octo_workspace_queue_wait_seconds": MetricDefinition(MetricType.Histogram,
+                                                          "Time ready pipelines waited for a slot of the workspace",
+                                                          QUEUE_WAIT_BUCKETS),
+    "octo_workspace_pipelines_in_flight": MetricDefinition(MetricType.Gauge,
+                                                           "Pipelines running on the workspace pool"),
+    "octo_workspace_pipelines_ready": MetricDefinition(MetricType.Gauge,
+                                                       "Pipelines ready to run and waiting for a slot"),
+    "octo_metrics_write_timestamp_seconds": MetricDefinition(MetricType.Gauge,
+                                                             "Unix time the metrics were last written at"),
+}
+
+
+class Metrics:
+    """
+    Collects metrics of an execution and writes them in the Prometheus text format,
+    to be picked up by the textfile collector of the node exporter
+    Counters start over on every run, which Prometheus handles as a counter reset
+    """
+    __instance: Optional["Metrics"] = None
+
+    def __init__(self, output_path: Optional[str] = None):
+        self.__output_path = output_path
+        self.__lock = threading.Lock()
+        self.__values: MetricsSnapshot = {}
+        self.__last_write = 0.0
+
+    @staticmethod
+    def start(output_path: Optional[str] = None) -> "Metrics":
+        """
+        Creates a metrics collector and starts collecting into it
+        Collectors without an output path only collect, such as the ones of worker processes
+        :param output_path:
+        :return:
+        """
+        metrics = Metrics(output_path)
+        Metrics.__instance = metrics
+        return metrics
+
+    @staticmethod
+    def current() -> Optional["Metrics"]:
+        """
+        Getter for the collecting metrics
+        :return:
+        """
+        return Metrics.__instance
+
+    def stop(self) -> None:
+        """
+        Stops collecting metrics
+        :return:
+        """
+        if Metrics.__instance is self:
+            Metrics.__instance = None
+
+    @property
+    def output_path(self) -> Optional[str]:
+        """
+        Getter for the path the metrics are written to
+        :return:
+        """
+        return self.__output_path
+
+    @property
+    def empty(self) -> bool:
+        """
+        Whether no metric was collected
+        :return:
+        """
+        with self.__lock:
+            return len(self.__values) == 0
+
+    @staticmethod
+    def __key(name: str, labels: Dict[str, str]) -> Tuple[str, Labels]:
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def inc(name: str, value: float = 1, **labels: str) -> None:
+        """
+        Increments a counter, if collecting
+        :param name:
+        :param value:
+        :param labels:
+        :return:
+        """
+        metrics = Metrics.__instance
+        if metrics:
+            key = Metrics.__key(name, labels)
+            with metrics.__lock:
+                metrics.__values.setdefault(key, [0.0])[0] += value
+
+    @staticmethod
+    def set(name: str, value: float, **labels: str) -> None:
+        """
+        Sets the value of a gauge, if collecting
+        :param name:
+        :param value:
+        :param labels:
+        :return:
+        """
+        metrics = Metrics.__instance
+        if metrics:
+            key = Metrics.__key(name, labels)
+            with metrics.__lock:
+                metrics.__values[key] = [float(value)]
+
+    @staticmethod
+    def observe(name: str, value: float, **labels: str) -> None:
+        """
+        Observes a value on a histogram, if collecting
+        Histograms are kept as the cumulative count per bucket, followed by the sum and the count of the values
+        :param name:
+        :param value:
+        :param labels:
+        :return:
+        """
+        metrics = Metrics.__instance
+        if metrics:
+            buckets = METRICS[name].buckets
+            key = Metrics.__key(name, labels)
+            with metrics.__lock:
+                values = metrics.__values.setdefault(key, [0.0] * (len(buckets) + 2))
+                for idx, bucket in enumerate(buckets):
+                    if value <= bucket:
+                        values[idx] += 1
+                values[-2] += value
+                values[-1] += 1
+
+    def snapshot(self) -> MetricsSnapshot:
+        """
+        Copy of the collected metrics, which can be merged into another collector
+        :return:
+        """
+        with self.__lock:
+            return {key: list(values) for key, values in self.__values.items()}
+
+    def merge(self, snapshot: MetricsSnapshot) -> None:
+        """
+        Adds the metrics collected by another collector, such as of a worker process
+        Counters and histograms are summed, gauges are taken as is
+        :param snapshot:
+        :return:
+        """
+        with self.__lock:
+            for key, values in snapshot.items():
+                current = self.__values.get(key)
+                if current is None or METRICS[key[0]].type == MetricType.Gauge:
+                    self.__values[key] = list(values)
+                else:
+                    self.__values[key] = [a + b for a, b in zip(current, values)]
+
+    @staticmethod
+    def __format_labels(labels: Labels) -> str:
+        if not labels:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in labels)
+        return "{" + ",".join(f"{key}=\"{value}\"" for (key, _), value in zip(labels, escaped)) + "}"
+
+    def render(self) -> str:
+        """
+        Renders the collected metrics in the Prometheus text format
+        :return:
+        """
+        lines: List[str] = []
+        snapshot = self.snapshot()
+        for name, definition in METRICS.items():
+            series = sorted((labels, values) for (metric, labels), values in snapshot.items() if metric == name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {definition.help}")
+            lines.append(f"# TYPE {name} {definition.type.value}")
+            for labels, values in series:
+                if definition.type != MetricType.Histogram:
+                    lines.append(f"{name}{Metrics.__format_labels(labels)} {values[0]!r}")
+                    continue
+                for bucket, count in zip(definition.buckets + (float("inf"),), values[:-2] + [values[-1]]):
+                    le = "+Inf" if bucket == float("inf") else repr(float(bucket))
+                    lines.append(f"{name}_bucket{Metrics.__format_labels(labels + (('le', le),))} {count!r}")
+                lines.append(f"{name}_sum{Metrics.__format_labels(labels)} {values[-2]!r}")
+                lines.append(f"{name}_count{Metrics.__format_labels(labels)} {values[-1]!r}")
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """
+        Writes the collected metrics to the output file
+        Written to a temporary file first and renamed over it, so the collector never reads a partial file
+        :return:
+        """
+        if not self.__output_path:
+            return
+        self.__last_write = time.monotonic()
+        with self.__lock:
+            self.__values[("octo_metrics_write_timestamp_seconds", ())] = [time.time()]
+        output_dir = os.path.dirname(os.path.abspath(self.__output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        temp_path = f"{self.__output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(self.render())
+        os.replace(temp_path, self.__output_path)
+
+    @staticmethod
+    def flush() -> None:
+        """
+        Writes the collected metrics while running, if collecting and the last write is old enough
+        Failing to write is only warned about, the execution goes on
+        :return:
+        """
+        metrics = Metrics.__instance
+        if metrics and metrics.__output_path and \
+                time.monotonic() - metrics.__last_write >= METRICS_WRITE_INTERVAL:
+            try:
+                metrics.write()
+            except OSError as e:
+                logger.warning(f"Could not write the execution metrics to [{metrics.__output_path}] - [{str(e)}]")
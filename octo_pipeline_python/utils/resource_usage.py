@@ -0,0 +1,103 @@
+import resource
+import sys
+import threading
+import time
+from types import TracebackType
+from typing import Final, NamedTuple, Optional, Type
+
+# Size of the blocks the rusage input and output operations are counted in
+RUSAGE_BLOCK_SIZE: Final[int] = 512
+# The max rss is reported in kilobytes, other than on macOS where it is in bytes
+MAX_RSS_UNIT: Final[int] = 1 if sys.platform == "darwin" else 1024
+
+
+class ResourceUsage(NamedTuple):
+    """
+    Resources used by the child processes, cumulative from the process start when sampled,
+    or spent over a block of work when taken as the difference of two samples
+    The peak rss is the largest of all the child processes that finished since the process start
+    """
+    wall_time: float
+    cpu_time: float
+    peak_rss: Optional[int]
+    read_bytes: int
+    written_bytes: int
+
+    @staticmethod
+    def sample() -> "ResourceUsage":
+        """
+        Samples the resources used so far by the child processes that finished
+        :return:
+        """
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return ResourceUsage(wall_time=time.monotonic(),
+                             cpu_time=usage.ru_utime + usage.ru_stime,
+                             peak_rss=usage.ru_maxrss * MAX_RSS_UNIT,
+                             read_bytes=usage.ru_inblock * RUSAGE_BLOCK_SIZE,
+                             written_bytes=usage.ru_oublock * RUSAGE_BLOCK_SIZE)
+
+    def since(self, start: "ResourceUsage") -> "ResourceUsage":
+        """
+        Resources used from an earlier sample to this one
+        The peak rss is a high water mark and cannot be subtracted, it is kept only if it grew in between,
+        as only then it belongs to a child process that finished in between, and is none otherwise
+        :param start:
+        :return:
+        """
+        grew = self.peak_rss is not None and (start.peak_rss is None or self.peak_rss > start.peak_rss)
+        return ResourceUsage(wall_time=self.wall_time - start.wall_time,
+                             cpu_time=self.cpu_time - start.cpu_time,
+                             peak_rss=self.peak_rss if grew else None,
+                             read_bytes=self.read_bytes - start.read_bytes,
+                             written_bytes=self.written_bytes - start.written_bytes)
+
+
+class ResourceUsageMeter:
+    """
+    Measures the resources used by the child processes over a block of work, such as an action
+    The child processes resources are only known for the whole process, so a block that ran alongside
+    other blocks of the process is marked as overlapped, as their child processes are counted on each of them
+    """
+    __lock = threading.Lock()
+    __running = 0
+    __started = 0
+
+    def __init__(self) -> None:
+        self.__start = ResourceUsage(wall_time=0.0, cpu_time=0.0, peak_rss=None, read_bytes=0, written_bytes=0)
+        self.__sequence = 0
+        self.__overlapped = False
+        self.__usage = self.__start
+
+    @property
+    def usage(self) -> ResourceUsage:
+        """
+        Getter for the resources used over the block, empty until it ended
+        :return:
+        """
+        return self.__usage
+
+    @property
+    def overlapped(self) -> bool:
+        """
+        Getter for whether other blocks ran at some point alongside this one
+        :return:
+        """
+        return self.__overlapped
+
+    def __enter__(self) -> "ResourceUsageMeter":
+        with ResourceUsageMeter.__lock:
+            ResourceUsageMeter.__running += 1
+            self.__overlapped = ResourceUsageMeter.__running > 1
+            self.__sequence = ResourceUsageMeter.__started
+            ResourceUsageMeter.__started += 1
+        self.__start = ResourceUsage.sample()
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.__usage = ResourceUsage.sample().since(self.__start)
+        with ResourceUsageMeter.__lock:
+            ResourceUsageMeter.__running -= 1
+            # Any block started after this one ran alongside it
+            self.__overlapped = self.__overlapped or ResourceUsageMeter.__started != self.__sequence + 1
@@ -0,0 +1,175 @@
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import json
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Any, Dict, Final, Iterator, List, Optional, Sequence
+
+PROFILE_STARTUP_FLAG: Final[str] = "--profile-startup"
+
+
+class TimedLoader(importlib.abc.Loader):
+    """
+    Loader proxy timing the execution of the module it loads
+    """
+    def __init__(self, loader: importlib.abc.Loader, fullname: str, profiler: "StartupProfiler"):
+        self.__loader = loader
+        self.__fullname = fullname
+        self.__profiler = profiler
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.__loader, item)
+
+    def create_module(self, spec: importlib.machinery.ModuleSpec) -> Optional[types.ModuleType]:
+        return self.__loader.create_module(spec)
+
+    def exec_module(self, module: types.ModuleType) -> None:
+        self.__profiler.import_started(self.__fullname)
+        try:
+            self.__loader.exec_module(module)
+        finally:
+            self.__profiler.import_finished(self.__fullname)
+
+
+class TimedFinder(importlib.abc.MetaPathFinder):
+    """
+    Meta path finder wrapping the specs found by the rest of the finders with a timed loader
+    """
+    def __init__(self, profiler: "StartupProfiler"):
+        self.__profiler = profiler
+        self.__local = threading.local()
+
+    def find_spec(self, fullname: str, path: Optional[Sequence[str]],
+                  target: Optional[types.ModuleType] = None) -> Optional[importlib.machinery.ModuleSpec]:
+        if getattr(self.__local, "finding", False):
+            return None
+        self.__local.finding = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec:
+                    break
+        finally:
+            self.__local.finding = False
+        if spec and spec.loader and hasattr(spec.loader, "exec_module"):
+            spec.loader = TimedLoader(spec.loader, fullname, self.__profiler)
+        return spec
+
+
+class StartupProfiler:
+    """
+    Records the import time of every module and the duration of the startup phases
+    Enabled with --profile-startup, or --profile-startup=<path> to write the report to a file
+    """
+    __instance: Optional["StartupProfiler"] = None
+
+    def __init__(self, output_path: Optional[str] = None):
+        self.__output_path = output_path
+        self.__start = time.perf_counter()
+        self.__finder = TimedFinder(self)
+        self.__imports: List[Dict[str, Any]] = []
+        self.__imports_stack: List[List[float]] = []
+        self.__phases: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def from_argv(argv: List[str]) -> Optional["StartupProfiler"]:
+        """
+        Creates and installs the profiler if asked to on the command line, removing the flag from it
+        :param argv:
+        :return:
+        """
+        for arg in list(argv):
+            if arg == PROFILE_STARTUP_FLAG or arg.startswith(f"{PROFILE_STARTUP_FLAG}="):
+                argv.remove(arg)
+                profiler = StartupProfiler(arg.split("=", 1)[1] if "=" in arg else None)
+                profiler.install()
+                return profiler
+        return None
+
+    @staticmethod
+    def current() -> Optional["StartupProfiler"]:
+        """
+        Getter for the installed profiler
+        :return:
+        """
+        return StartupProfiler.__instance
+
+    @staticmethod
+    @contextmanager
+    def phase(name: str) -> Iterator[None]:
+        """
+        Times a startup phase, if profiling
+        :param name:
+        :return:
+        """
+        profiler = StartupProfiler.__instance
+        if not profiler:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profiler.__phases.append({"phase": name,
+                                      "start": start - profiler.__start,
+                                      "duration": time.perf_counter() - start})
+
+    def install(self) -> None:
+        """
+        Starts timing imports
+        :return:
+        """
+        StartupProfiler.__instance = self
+        sys.meta_path.insert(0, self.__finder)
+
+    def uninstall(self) -> None:
+        """
+        Stops timing imports
+        :return:
+        """
+        if self.__finder in sys.meta_path:
+            sys.meta_path.remove(self.__finder)
+        if StartupProfiler.__instance is self:
+            StartupProfiler.__instance = None
+
+    def import_started(self, fullname: str) -> None:
+        # Start time and time spent on nested imports
+        self.__imports_stack.append([time.perf_counter(), 0.0])
+
+    def import_finished(self, fullname: str) -> None:
+        start, nested = self.__imports_stack.pop()
+        cumulative = time.perf_counter() - start
+        if self.__imports_stack:
+            self.__imports_stack[-1][1] += cumulative
+        self.__imports.append({"module": fullname, "self": cumulative - nested, "cumulative": cumulative})
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Builds the report of the startup, imports sorted by their own import time
+        :return:
+        """
+        return {
+            "total": time.perf_counter() - self.__start,
+            "phases": self.__phases,
+            "imports": sorted(self.__imports, key=lambda x: x["self"], reverse=True)
+        }
+
+    def dump(self) -> None:
+        """
+        Writes the report to the output file, or to stderr if none was given
+        :return:
+        """
+        self.uninstall()
+        report = json.dumps(self.report(), indent=2)
+        if self.__output_path:
+            with open(self.__output_path, "w") as f:
+                f.write(report)
+        else:
+            sys.stderr.write(report + "\n")
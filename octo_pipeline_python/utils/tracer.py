@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+TraceEvents = List[Dict[str, Any]]
+
+
+class Tracer:
+    """
+    Records spans of an execution and writes them in the chrome trace format, which can be opened in Perfetto
+    Spans are recorded with the wall clock, so the spans of worker processes line up with the ones of the workspace
+    """
+    __instance: Optional["Tracer"] = None
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__events: TraceEvents = []
+        self.__threads: Set[Tuple[int, int]] = set()
+
+    @staticmethod
+    def start() -> "Tracer":
+        """
+        Creates a tracer and starts recording spans into it
+        :return:
+        """
+        tracer = Tracer()
+        Tracer.__instance = tracer
+        return tracer
+
+    @staticmethod
+    def current() -> Optional["Tracer"]:
+        """
+        Getter for the recording tracer
+        :return:
+        """
+        return Tracer.__instance
+
+    def stop(self) -> None:
+        """
+        Stops recording spans
+        :return:
+        """
+        if Tracer.__instance is self:
+            Tracer.__instance = None
+
+    @staticmethod
+    def __now() -> int:
+        return time.time_ns() // 1000
+
+    def __record(self, event: Dict[str, Any]) -> None:
+        pid, tid = os.getpid(), threading.get_ident()
+        with self.__lock:
+            if (pid, tid) not in self.__threads:
+                self.__threads.add((pid, tid))
+                self.__events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                                      "args": {"name": threading.current_thread().name}})
+            self.__events.append(dict(event, pid=pid, tid=tid))
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, category: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Records a span around the block, if tracing
+        The yielded arguments can be added to by the block, such as with its result
+        :param name:
+        :param category:
+        :param args:
+        :return:
+        """
+        tracer = Tracer.__instance
+        if not tracer:
+            yield args
+            return
+        start = Tracer.__now()
+        try:
+            yield args
+        finally:
+            tracer.__record({"name": name, "cat": category, "ph": "X", "ts": start,
+                             "dur": Tracer.__now() - start,
+                             "args": {key: value for key, value in args.items() if value is not None}})
+
+    @staticmethod
+    def counter(name: str, **values: float) -> None:
+        """
+        Records the values of a counter, if tracing
+        :param name:
+        :param values:
+        :return:
+        """
+        tracer = Tracer.__instance
+        if tracer:
+            tracer.__record({"name": name, "ph": "C", "ts": Tracer.__now(), "args": values})
+
+    @property
+    def events(self) -> TraceEvents:
+        """
+        Getter for the recorded events
+        :return:
+        """
+        with self.__lock:
+            return list(self.__events)
+
+    def merge(self, events: TraceEvents) -> None:
+        """
+        Adds the events recorded by another tracer, such as of a worker process
+        :param events:
+        :return:
+        """
+        with self.__lock:
+            self.__events.extend(events)
+
+    def dump(self, output_path: str) -> None:
+        """
+        Writes the recorded events to a chrome trace file
+        :param output_path:
+        :return:
+        """
+        with open(output_path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
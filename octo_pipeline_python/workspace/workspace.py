@@ -1,30 +1,48 @@
 import concurrent.futures
 import functools
+import heapq
 import multiprocessing
 import os
 import shutil
+import sqlite3
 import traceback
+from datetime import datetime
 from random import uniform
 from threading import RLock
-from time import sleep
+from time import monotonic, sleep
 from typing import Callable, Dict, Final, List, Optional, Set, Tuple, Union
 
 import networkx
 
 from octo_pipeline_python.actions.action_result import ActionResultCode
 from octo_pipeline_python.actions.action_type import ActionType
+from octo_pipeline_python.backends.backend import DEFAULT_RESOURCE_WEIGHT
 from octo_pipeline_python.backends.backends_context import BackendsContext
+from octo_pipeline_python.backends.backends_registry import BackendsRegistry
 from octo_pipeline_python.pipeline.pipeline import Pipeline
 from octo_pipeline_python.pipeline.pipeline_builder import PipelineBuilder
 from octo_pipeline_python.utils.git import GitUtils
 from octo_pipeline_python.utils.logger import logger
+from octo_pipeline_python.utils.metrics import Metrics
 from octo_pipeline_python.utils.search import Search
+from octo_pipeline_python.utils.tracer import Tracer
 from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
 from octo_pipeline_python.workspace.workspace_database import WorkspaceDatabase
 from octo_pipeline_python.workspace.workspace_description import \
     WorkspaceDescription
+from octo_pipeline_python.workspace.workspace_executor import (
+    WorkspaceExecutorType, execute_pipeline_process)
+from octo_pipeline_python.workspace.workspace_fingerprints import (
+    PipelineFingerprint, WorkspaceFingerprints)
+from octo_pipeline_python.workspace.workspace_history import WorkspaceHistory
 from octo_pipeline_python.workspace.workspace_pipeline import WorkspacePipeline
+from octo_pipeline_python.workspace.workspace_resources import (
+    DEFAULT_SAMPLE_INTERVAL, IO_PARALLEL_JOBS, WorkspaceResources)
+from octo_pipeline_python.workspace.workspace_scheduler import (
+    SchedulePolicy, WorkspaceScheduler)
 from octo_pipeline_python.workspace.workspace_state import WorkspaceState
+from octo_pipeline_python.workspace.workspace_sync_engine import (
+    WorkspaceSyncEngine, WorkspaceSyncEngineType)
 
 COND_VAR_TIMEOUT = 3.0
 DEFAULT_RETRY_COUNT = 1
@@ -44,17 +62,21 @@ class Workspace:
         if self.__db.contains("stats"):
             self.__context.stats = self.__db.get("stats")
         self.__workspace_state: Optional[WorkspaceState] = None
+        self.__fingerprints = WorkspaceFingerprints(self.__db)
+        self.__pipelines_fingerprints: Dict[str, PipelineFingerprint] = {}
         self.__sync_lock = RLock()
         self.__resolve_lock = RLock()
         self.__ws_pipelines_lock = RLock()
         self.__failed_pipelines: List[str] = []
+        self.__history = WorkspaceHistory(context)
 
     @staticmethod
     def init_workspace_to(organization: str,
                           name: str,
                           scm: str,
                           to_path: str,
-                          head: str = "master") -> Optional["Workspace"]:
+                          head: str = "master",
+                          git_cache_dir: Optional[str] = None) -> Optional["Workspace"]:
         """
         Tries to initialize a workspace to the given directory
         :param organization:
@@ -62,6 +84,7 @@ class Workspace:
         :param scm:
         :param to_path:
         :param head:
+        :param git_cache_dir:
         :return:
         """
         from octo_pipeline_python.workspace.workspace_builder import \
@@ -71,7 +94,7 @@ class Workspace:
         if len(os.listdir(to_path)) > 0:
             if GitUtils.checkout_to_branch(to_path, head):
                 return WorkspaceBuilder.create(source_dir=to_path)
-        scm = GitUtils.clone_and_checkout(scm, organization, name, to_path, head)
+        scm = GitUtils.clone_and_checkout(scm, organization, name, to_path, head, cache_dir=git_cache_dir)
         if scm:
             workspace: Workspace = WorkspaceBuilder.create(source_dir=to_path)
             if workspace:
@@ -90,6 +113,14 @@ class Workspace:
         """
         return self.__context
 
+    @property
+    def history(self) -> WorkspaceHistory:
+        """
+        Getter for the history of the workspace runs
+        :return:
+        """
+        return self.__history
+
     @property
     def workspace(self) -> Dict[str, List[WorkspacePipeline]]:
         """
@@ -124,9 +155,8 @@ class Workspace:
                 return PipelineBuilder.create(source_dir=self.pipeline_path(pipeline_name))
         return None
 
-    def workspace_state(self, quick: bool = False) -> WorkspaceState:
-        self.__resolve_state(quick)
-        return self.__workspace_state
+    def workspace_state(self, quick: bool = False, refresh: bool = False) -> WorkspaceState:
+        return self.__resolve_state(quick, refresh=refresh)
 
     def __update_resolved_state(self, state_list: Union[Dict[str, List[WorkspacePipeline]], Dict[str, List[Pipeline]]],
                                 pipeline: Optional[Union[WorkspacePipeline, List[WorkspacePipeline], Pipeline]],
@@ -143,28 +173,51 @@ class Workspace:
         finally:
             self.__resolve_lock.release()
 
+    def __out_of_sync(self, pipeline: Pipeline, fingerprint: PipelineFingerprint, refresh: bool) -> bool:
+        """
+        Checks if the pipeline is behind or ahead of its remote
+        The last check is reused while the pipeline did not change
+        :param pipeline:
+        :param fingerprint:
+        :param refresh:
+        :return:
+        """
+        out_of_sync = None if refresh else self.__fingerprints.out_of_sync(pipeline.context.name, fingerprint)
+        if out_of_sync is None:
+            out_of_sync = GitUtils.sync_status(pipeline.context.source_dir).out_of_sync
+            self.__fingerprints.update(pipeline.context.name, fingerprint, out_of_sync)
+        return out_of_sync
+
     def __resolve_pipeline_state_thread(self, pipeline: WorkspacePipeline, pipeline_path: str,
-                                        base_path: str, quick: bool) -> None:
+                                        base_path: str, quick: bool, refresh: bool = False) -> None:
         if not os.path.exists(pipeline_path):
             self.__update_resolved_state(self.__workspace_state.unresolved_pipelines, pipeline, base_path)
             return
 
-        ws_pipeline: Optional[Union[Pipeline, List[Pipeline]]] = \
-            [p for p in self.__workspace_pipelines[base_path] if p.context.name == pipeline.name]
-        if len(ws_pipeline) > 0:
-            ws_pipeline = ws_pipeline[0]
+        fingerprint = WorkspaceFingerprints.fingerprint(pipeline_path)
+        built_pipelines = [p for p in self.__workspace_pipelines[base_path] if p.context.name == pipeline.name]
+        ws_pipeline: Optional[Pipeline]
+        if len(built_pipelines) > 0 and self.__pipelines_fingerprints.get(pipeline.name) == fingerprint:
+            ws_pipeline = built_pipelines[0]
         else:
-            ws_pipeline: Pipeline = PipelineBuilder.create(pipeline_path, self.context.working_dir,
-                                                           ignore_workspace=True)
+            # Either never built, or its definition or checkout changed since it was built
+            ws_pipeline = PipelineBuilder.create(pipeline_path, self.context.working_dir, ignore_workspace=True)
+            self.__resolve_lock.acquire()
+            try:
+                for stale_pipeline in built_pipelines:
+                    self.__workspace_pipelines[base_path].remove(stale_pipeline)
+            finally:
+                self.__resolve_lock.release()
             if ws_pipeline:
+                self.__pipelines_fingerprints[pipeline.name] = fingerprint
                 self.__update_resolved_state(self.__workspace_pipelines, ws_pipeline, base_path)
             else:
                 self.__update_resolved_state(self.__workspace_state.unresolved_pipelines, pipeline, base_path)
                 return
+        self.__fingerprints.update(pipeline.name, fingerprint)
 
         if ws_pipeline.context.head != pipeline.head or \
-                (not quick and (GitUtils.is_behind_on_commits(ws_pipeline.context.source_dir) or
-                                GitUtils.is_ahead_on_commits(ws_pipeline.context.source_dir))):
+                (not quick and self.__out_of_sync(ws_pipeline, fingerprint, refresh)):
             if ws_pipeline.completed:
                 self.__update_resolved_state(self.__workspace_state.completed_pipelines, pipeline, base_path)
             elif not pipeline.executable:
@@ -179,27 +232,30 @@ class Workspace:
             self.__update_resolved_state(self.__workspace_state.synced_pipelines, pipeline, base_path)
 
     def __resolve_state(self, quick: bool = False,
-                        parallel_jobs: Optional[int] = None) -> None:
+                        parallel_jobs: Optional[int] = None,
+                        refresh: bool = False) -> WorkspaceState:
         """
         Tries and resolves the workspace state
-        :return:
+        Remote checks are reused for pipelines that did not change, unless asked to refresh them
+        :return: The resolved state
         """
         if not parallel_jobs:
-            parallel_jobs = min(multiprocessing.cpu_count() / 2, 8)
+            parallel_jobs = IO_PARALLEL_JOBS
+        workspace_state = WorkspaceState(unresolved_pipelines={},
+                                         unsynced_pipelines={},
+                                         synced_pipelines={},
+                                         completed_pipelines={},
+                                         read_only_pipelines={},
+                                         failed_pipelines={})
         self.__resolve_lock.acquire()
-        self.__workspace_state = WorkspaceState(unresolved_pipelines={},
-                                                unsynced_pipelines={},
-                                                synced_pipelines={},
-                                                completed_pipelines={},
-                                                read_only_pipelines={},
-                                                failed_pipelines={})
+        self.__workspace_state = workspace_state
         self.__resolve_lock.release()
         with concurrent.futures.ThreadPoolExecutor(max_workers=parallel_jobs) as executor:
             active_futures = set()
             for path, pipelines in self.__workspace.items():
                 if not os.path.exists(path):
                     # All of the pipelines do not exist
-                    self.__update_resolved_state(self.__workspace_state.unresolved_pipelines, pipelines, path)
+                    self.__update_resolved_state(workspace_state.unresolved_pipelines, pipelines, path)
                     continue
                 if path not in self.__workspace_pipelines:
                     self.__update_resolved_state(self.__workspace_pipelines, None, path)
@@ -207,9 +263,12 @@ class Workspace:
                     pipeline_path = os.path.join(self.context.source_dir, path, pipeline.name)
                     active_futures.add(
                         executor.submit(self.__resolve_pipeline_state_thread,
-                                        pipeline=pipeline, pipeline_path=pipeline_path, base_path=path, quick=quick)
+                                        pipeline=pipeline, pipeline_path=pipeline_path, base_path=path, quick=quick,
+                                        refresh=refresh)
                     )
             concurrent.futures.wait(active_futures, return_when=concurrent.futures.ALL_COMPLETED)
+        self.__fingerprints.flush()
+        return workspace_state
 
     def describe_workspace(self) -> WorkspaceDescription:
         """
@@ -264,11 +323,13 @@ class Workspace:
                     return pipeline
         return None
 
-    def __sync_unresolved_pipeline_thread(self, path: str, workspace_pipeline: WorkspacePipeline) -> None:
+    def __sync_unresolved_pipeline_thread(self, path: str, workspace_pipeline: WorkspacePipeline,
+                                          git_cache_dir: Optional[str] = None) -> None:
         """
         Tries to create the actual pipeline, clone and checkout to branch
         :param path:
         :param workspace_pipeline:
+        :param git_cache_dir:
         :return:
         """
         pipeline_path = os.path.join(path, workspace_pipeline.name)
@@ -279,7 +340,9 @@ class Workspace:
                                                        pipeline_path,
                                                        workspace_pipeline.head,
                                                        True,
-                                                       workspace_pipeline.external)
+                                                       workspace_pipeline.external,
+                                                       workspace_pipeline.clone,
+                                                       git_cache_dir)
         if not pipeline and not workspace_pipeline.external:
             logger.warning(f"Failed to resolve pipeline {workspace_pipeline.name} [Pipeline files were not found]")
             self.__ws_pipelines_lock.acquire()
@@ -336,32 +399,42 @@ class Workspace:
                        no_code_sync: bool = False,
                        parallel_jobs: Optional[int] = None,
                        sync_retry: int = 3,
-                       backoff_factor: float = 1.3) -> Optional[List[str]]:
+                       backoff_factor: float = 1.3,
+                       engine: WorkspaceSyncEngineType = WorkspaceSyncEngineType.Thread,
+                       git_cache_dir: Optional[str] = None) -> List[str]:
         """
         Syncs the workspace, clones the repos if needed
         And checks out to branches if needed accordingly
         :return: List of pipelines that failed to sync
         """
         self.__sync_lock.acquire()
-        if not parallel_jobs:
-            parallel_jobs = min(multiprocessing.cpu_count() / 2, 8)
-
         try:
-            self.__resolve_state(parallel_jobs=parallel_jobs)
+            # Syncing acts on the remotes, so they are always checked again
+            workspace_state = self.__resolve_state(parallel_jobs=parallel_jobs, refresh=True)
             self.__failed_pipelines = []
+            if engine == WorkspaceSyncEngineType.Asyncio:
+                sync_engine = WorkspaceSyncEngine(self.context, parallel_jobs, sync_retry, backoff_factor,
+                                                  git_cache_dir=git_cache_dir)
+                self.__failed_pipelines = sync_engine.sync(workspace_state.unresolved_pipelines,
+                                                           workspace_state.unsynced_pipelines,
+                                                           no_code_sync)
+                return self.__failed_pipelines
+            if not parallel_jobs:
+                parallel_jobs = IO_PARALLEL_JOBS
             with concurrent.futures.ThreadPoolExecutor(max_workers=parallel_jobs) as executor:
                 active_futures = set()
 
-                for path, unresolved_pipelines in self.__workspace_state.unresolved_pipelines.items():
+                for path, unresolved_pipelines in workspace_state.unresolved_pipelines.items():
                     if not os.path.exists(path):
                         os.makedirs(path)
                     for unresolved_pipeline in unresolved_pipelines:
                         active_futures.add(
                             executor.submit(self.__sync_unresolved_pipeline_thread,
-                                            path=path, workspace_pipeline=unresolved_pipeline)
+                                            path=path, workspace_pipeline=unresolved_pipeline,
+                                            git_cache_dir=git_cache_dir)
                         )
 
-                for path, unsynced_pipelines in self.__workspace_state.unsynced_pipelines.items():
+                for path, unsynced_pipelines in workspace_state.unsynced_pipelines.items():
                     for unsynced_pipeline in unsynced_pipelines:
                         active_futures.add(
                             executor.submit(self.__sync_unsynced_pipeline_thread,
@@ -453,17 +526,96 @@ class Workspace:
                 continue
         return ActionResultCode.SUCCESS, pipeline
 
+    @staticmethod
+    def __pipeline_weight(workspace_pipeline: WorkspacePipeline, pipeline: Pipeline) -> int:
+        """
+        Tokens the pipeline takes from the workspace budget, either set on the workspace
+        or the heaviest of the backends of its actions
+        :param workspace_pipeline:
+        :param pipeline:
+        :return:
+        """
+        if workspace_pipeline.weight:
+            return workspace_pipeline.weight
+        weight = DEFAULT_RESOURCE_WEIGHT
+        for action in pipeline.actions:
+            for backend in action.backends:
+                try:
+                    backend_class = BackendsRegistry.backend_class(backend)
+                except Exception:
+                    backend_class = None
+                if backend_class:
+                    weight = max(weight, backend_class.resource_weight(action.action_type))
+        return weight
+
+    def __reload_pipeline(self, workspace_pipeline: WorkspacePipeline) -> None:
+        """
+        Reloads a pipeline from its DB, after it was executed by another process
+        :param workspace_pipeline:
+        :return:
+        """
+        self.__ws_pipelines_lock.acquire()
+        try:
+            path_pipelines = self.__workspace_pipelines.get(workspace_pipeline.path, [])
+            for idx, pipeline in enumerate(path_pipelines):
+                if pipeline.context.name == workspace_pipeline.name:
+                    reloaded = PipelineBuilder.create(pipeline.context.source_dir, self.context.working_dir,
+                                                      ignore_workspace=True)
+                    if reloaded:
+                        path_pipelines[idx] = reloaded
+                    return
+        finally:
+            self.__ws_pipelines_lock.release()
+
+    def __estimated_durations(self) -> Dict[str, float]:
+        """
+        Median durations of the pipelines over their recorded runs, empty if the history cannot be read
+        :return:
+        """
+        try:
+            return self.__history.estimated_durations()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read the workspace history [{self.__history.path}] - [{str(e)}]")
+        return {}
+
+    def __record_history(self, name: str, start_time: datetime, duration: float, result: ActionResultCode) -> None:
+        """
+        Records a pipeline run on the workspace history, with the actions that ran since it started
+        :param name:
+        :param start_time:
+        :param duration:
+        :param result:
+        :return:
+        """
+        # Looked up again, as pipelines executed by another process were reloaded
+        pipeline = self.pipeline(name)
+        if not pipeline:
+            return
+        try:
+            self.__history.record_run(name,
+                                      GitUtils.get_head_commit(pipeline.context.source_dir),
+                                      GitUtils.get_head_branch(pipeline.context.source_dir),
+                                      start_time, duration, result,
+                                      [stats for stats in pipeline.actions_stats if stats.start_time >= start_time])
+        except sqlite3.Error as e:
+            logger.warning(f"[{name}] Could not record the run on the workspace history - [{str(e)}]")
+
     def __execute_pipelines_action(self,
                                    backends_context: BackendsContext,
                                    action: Callable,
                                    filters: Optional[List[str]],
                                    parallel_jobs: Optional[int],
                                    retries: Optional[int],
-                                   recursive: Optional[bool]) -> ActionResultCode:
+                                   recursive: Optional[bool],
+                                   schedule: Optional[SchedulePolicy] = None,
+                                   process_action: Optional[Callable] = None,
+                                   keep_going: bool = False,
+                                   adaptive_jobs: bool = True,
+                                   record_history: bool = False) -> ActionResultCode:
         # Get a simple list of pipelines filtered
         # Start executing them
         if not parallel_jobs:
-            parallel_jobs = min(multiprocessing.cpu_count() / 2, 8)
+            parallel_jobs = max(1, min(multiprocessing.cpu_count() // 2, 8))
         logger.info("Running workspace pipelines with [%d] parallel size",
                     parallel_jobs)
         self.__ws_pipelines_lock.acquire()
@@ -485,14 +637,15 @@ class Workspace:
 
             workspace_pipelines_name: Final[Tuple[str, ...]] = \
                 tuple(wp.name for wp in workspace_pipelines)
-            completed_pipelines = [
+            completed_pipelines: Set[str] = {
                 p.name
                 for completed_pipeline in
                 self.__workspace_state.completed_pipelines.values()
                 for p in completed_pipeline
                 if p.name not in workspace_pipelines_name
-            ]
+            }
             failed_pipelines = []
+            succeeded_pipelines = []
 
             # Build a DAG of all dependencies
             pipeline_graph = networkx.DiGraph()
@@ -518,50 +671,137 @@ class Workspace:
                                  f" [{need}]")
                     return ActionResultCode.FAILURE
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=parallel_jobs) as executor:
-                active_futures = set()
-                while len(workspace_pipelines) > 0:
-                    for workspace_pipeline in workspace_pipelines.copy():
-                        if all(n in completed_pipelines for n in
-                               workspace_pipeline.needs):
-                            pipeline: Pipeline = \
-                                next(p for p in
-                                     self.__workspace_pipelines[workspace_pipeline.path]
-                                     if
-                                     p.context.name == workspace_pipeline.name)
+            pipelines_index: Dict[str, Pipeline] = {
+                p.context.name: p
+                for path in {wp.path for wp in workspace_pipelines}
+                for p in self.__workspace_pipelines[path]
+            }
+            pipelines: Dict[str, Pipeline] = {wp.name: pipelines_index[wp.name] for wp in workspace_pipelines}
+            workspace_pipelines_index: Dict[str, WorkspacePipeline] = {wp.name: wp for wp in workspace_pipelines}
+            weights: Dict[str, int] = {
+                name: self.__pipeline_weight(workspace_pipelines_index[name], pipeline)
+                for name, pipeline in pipelines.items()
+            }
+            resources = WorkspaceResources(parallel_jobs, adaptive_jobs)
+            schedule = schedule or SchedulePolicy.CriticalPath
+            scheduler = WorkspaceScheduler(pipeline_graph, pipelines, schedule,
+                                           self.__estimated_durations()
+                                           if schedule == SchedulePolicy.CriticalPath else None)
+            logger.info(f"Scheduling workspace pipelines by [{scheduler.policy.value}]")
+
+            # Count the needs of every pipeline that still have to run, pipelines become ready once it drops to 0
+            pending_needs: Dict[str, int] = {
+                name: sum(1 for need in pipeline_graph.predecessors(name) if need not in completed_pipelines)
+                for name in workspace_pipelines_name
+            }
+            ready_pipelines: List[Tuple[float, int, str]] = []
+            ready_since: Dict[str, float] = {}
+            for name in workspace_pipelines_name:
+                if pending_needs[name] == 0:
+                    heapq.heappush(ready_pipelines, scheduler.priority(name) + (name,))
+                    ready_since[name] = monotonic()
+            pending_pipelines: Set[str] = set(workspace_pipelines_name)
+
+            pool: concurrent.futures.Executor
+            if process_action:
+                # Spawned workers, so no lock held by a thread of the workspace is inherited
+                pool = concurrent.futures.ProcessPoolExecutor(max_workers=parallel_jobs,
+                                                              mp_context=multiprocessing.get_context("spawn"))
+            else:
+                pool = concurrent.futures.ThreadPoolExecutor(max_workers=parallel_jobs, thread_name_prefix="pipeline")
+            with Tracer.span(self.context.name, "workspace", pipelines=len(workspace_pipelines_name),
+                             parallel_jobs=parallel_jobs, schedule=scheduler.policy.value), \
+                    backends_context.batch(), pool as executor:
+                active_futures: Dict[concurrent.futures.Future, str] = {}
+                started_at: Dict[str, Tuple[datetime, float]] = {}
+                while len(ready_pipelines) > 0 or len(active_futures) > 0:
+                    # Submit only as many as the budget admits, so the most critical ready pipelines start first
+                    blocked = False
+                    while len(ready_pipelines) > 0:
+                        name = ready_pipelines[0][-1]
+                        if not resources.try_acquire(weights[name]):
+                            blocked = True
+                            break
+                        heapq.heappop(ready_pipelines)
+                        if process_action:
+                            f = executor.submit(process_action, self.context,
+                                                pipelines[name].context.source_dir, retries)
+                        else:
                             f = executor.submit(action, backends_context,
-                                                pipeline, retries)
-                            active_futures.add(f)
-                            workspace_pipelines.remove(workspace_pipeline)
-
+                                                pipelines[name], retries)
+                        active_futures[f] = name
+                        started_at[name] = datetime.now(), monotonic()
+                        Metrics.observe("octo_workspace_queue_wait_seconds",
+                                        started_at[name][1] - ready_since.pop(name))
+                        pending_pipelines.remove(name)
+                    Tracer.counter("pipelines", running=len(active_futures), ready=len(ready_pipelines))
+                    Metrics.set("octo_workspace_pipelines_in_flight", len(active_futures))
+                    Metrics.set("octo_workspace_pipelines_ready", len(ready_pipelines))
+                    Tracer.counter("tokens", in_use=resources.in_use, capacity=resources.capacity())
+
+                    # While blocked on the budget, wake up to sample it again even if nothing finished
                     done, not_done = concurrent.futures.wait(active_futures,
+                                                             timeout=DEFAULT_SAMPLE_INTERVAL if blocked else None,
                                                              return_when=concurrent.futures.FIRST_COMPLETED)
-                    if any((success == ActionResultCode.FAILURE for success, _
-                            in tuple(f.result() for f in done))):
+                    if not keep_going and any((success == ActionResultCode.FAILURE for success, _
+                                               in tuple(f.result() for f in done))):
                         # a pipeline failed, wait for results from all
                         # pipelines already submitted before stopping
                         done, not_done = concurrent.futures.wait(active_futures,
                                                                  return_when=concurrent.futures.ALL_COMPLETED)
 
-                    active_futures = active_futures.difference(done)
                     for f in done:
-                        success, pipeline = f.result()
+                        name = active_futures.pop(f)
+                        resources.release(weights[name])
+                        success, result = f.result()
+                        if process_action:
+                            backends_context.merge_attributes(result.attributes_changes)
+                            tracer = Tracer.current()
+                            if tracer:
+                                tracer.merge(result.trace_events)
+                            collector = Metrics.current()
+                            if collector:
+                                collector.merge(result.metrics)
+                            self.__reload_pipeline(workspace_pipelines_index[name])
+                        if record_history:
+                            start_time, start = started_at[name]
+                            self.__record_history(name, start_time, monotonic() - start, success)
                         if success == ActionResultCode.SUCCESS or success == ActionResultCode.PARTIAL_SUCCESS:
-                            completed_pipelines.append(pipeline.context.name)
+                            completed_pipelines.add(name)
+                            succeeded_pipelines.append(name)
+                            for dependent in pipeline_graph.successors(name):
+                                pending_needs[dependent] -= 1
+                                if pending_needs[dependent] == 0:
+                                    heapq.heappush(ready_pipelines, scheduler.priority(dependent) + (dependent,))
+                                    ready_since[dependent] = monotonic()
                         else:
-                            failed_pipelines.append(pipeline.context.name)
-                    if len(failed_pipelines) > 0:
+                            failed_pipelines.append(name)
+                            if keep_going:
+                                # Dependents never become ready, the rest of the graph keeps running
+                                skipped = networkx.descendants(pipeline_graph, name) & pending_pipelines
+                                if skipped:
+                                    logger.warning(f"[{name}] Failed, skipping its dependents "
+                                                   f"[{', '.join(sorted(skipped))}]")
+                    Metrics.flush()
+                    if len(failed_pipelines) > 0 and not keep_going:
                         break
+                Tracer.counter("pipelines", running=len(active_futures), ready=len(ready_pipelines))
+                Metrics.set("octo_workspace_pipelines_in_flight", len(active_futures))
+                Metrics.set("octo_workspace_pipelines_ready", len(ready_pipelines))
 
             if len(failed_pipelines) > 0:
                 logger.error(f"Some pipelines failed to finish:")
                 for p in failed_pipelines:
                     logger.error(f"  {p}")
-                if len(workspace_pipelines) > 0:
+                if len(pending_pipelines) > 0:
                     logger.warning(f"Pipelines that did not run due to"
                                    f" previous failures:")
-                    for p in workspace_pipelines:
-                        logger.warning(f"  {p.name}")
+                    for p in sorted(pending_pipelines):
+                        logger.warning(f"  {p}")
+                if keep_going and len(succeeded_pipelines) > 0:
+                    logger.info("Pipelines that succeeded:")
+                    for p in succeeded_pipelines:
+                        logger.info(f"  {p}")
                 return ActionResultCode.FAILURE
             return ActionResultCode.SUCCESS
         except:
@@ -576,10 +816,20 @@ class Workspace:
                           reset_cache: Optional[bool] = False,
                           parallel_jobs: Optional[int] = None,
                           retries: Optional[int] = DEFAULT_RETRY_COUNT,
-                          recursive: Optional[bool] = False) -> ActionResultCode:
+                          recursive: Optional[bool] = False,
+                          schedule: Optional[SchedulePolicy] = None,
+                          executor: WorkspaceExecutorType = WorkspaceExecutorType.Thread,
+                          keep_going: bool = False,
+                          adaptive_jobs: bool = True) -> ActionResultCode:
+        process_action: Optional[Callable] = None
+        if executor == WorkspaceExecutorType.Process:
+            process_action = functools.partial(execute_pipeline_process, bool(reset_cache),
+                                               backends_context.action_cache.enabled, Tracer.current() is not None,
+                                               Metrics.current() is not None)
         return self.__execute_pipelines_action(backends_context,
                                                functools.partial(self.__execute_pipeline_thread, reset_cache),
-                                               filters, parallel_jobs, retries, recursive)
+                                               filters, parallel_jobs, retries, recursive, schedule,
+                                               process_action, keep_going, adaptive_jobs, record_history=True)
 
     def clean_pipelines(self, backends_context: BackendsContext,
                         filters: Optional[List[str]] = None,
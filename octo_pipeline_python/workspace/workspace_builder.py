@@ -2,11 +2,13 @@ import os
 from typing import Dict, List, Optional, Tuple, Union
 
 import yaml
+from pydantic import ValidationError
 
 from octo_pipeline_python.backends.backend_settings import BackendSettings
 from octo_pipeline_python.common.surrounding import Surrounding
 from octo_pipeline_python.pipeline.pipeline import Pipeline
 from octo_pipeline_python.pipeline.pipeline_builder import PipelineBuilder
+from octo_pipeline_python.utils.git import GitCloneStrategy
 from octo_pipeline_python.utils.logger import logger
 from octo_pipeline_python.utils.search import PIPELINE_FOLDER, Search
 from octo_pipeline_python.workspace.workspace import Workspace
@@ -57,6 +59,33 @@ class WorkspaceBuilder:
             head = value['head']
         return head
 
+    @staticmethod
+    def __get_weight(value: Union[Dict, str]) -> Optional[int]:
+        """
+        Getter for the pipeline resource weight per value
+        :param value:
+        :return:
+        """
+        if isinstance(value, Dict) and isinstance(value.get('weight'), int) and value['weight'] > 0:
+            return value['weight']
+        return None
+
+    @staticmethod
+    def __get_clone_strategy(name: str, value: Union[Dict, str]) -> Optional[GitCloneStrategy]:
+        """
+        Getter for the pipeline clone strategy per value
+        :param name:
+        :param value:
+        :return:
+        """
+        if not isinstance(value, Dict) or not isinstance(value.get('clone'), Dict):
+            return None
+        try:
+            return GitCloneStrategy(**value['clone'])
+        except ValidationError:
+            logger.warning(f"[{name}] Ignoring invalid clone strategy [{value['clone']}]")
+        return None
+
     @staticmethod
     def __get_workspace_executable(value: Union[Dict, str], workspace_executable: bool) -> bool:
         """
@@ -104,7 +133,8 @@ class WorkspaceBuilder:
                                                                   path_prefix, workspace_executable))
             elif isinstance(workspace_item, Dict):
                 for key, value in workspace_item.items():
-                    if (isinstance(value, Dict) and "needs" in value or "head" in value) or isinstance(value, str):
+                    if (isinstance(value, Dict) and ("needs" in value or "weight" in value or "clone" in value) or "head" in value) or \
+                            isinstance(value, str):
                         # New item
                         workspace[path_prefix].append(
                             WorkspacePipeline(name=key,
@@ -114,7 +144,9 @@ class WorkspaceBuilder:
                                               executable=WorkspaceBuilder.__get_workspace_executable(value,
                                                                                                      workspace_executable),
                                               external=WorkspaceBuilder.__get_workspace_external(value,
-                                                                                                 workspace_external)))
+                                                                                                 workspace_external),
+                                              weight=WorkspaceBuilder.__get_weight(value),
+                                              clone=WorkspaceBuilder.__get_clone_strategy(key, value)))
                     elif isinstance(value, List):
                         workspace.update(WorkspaceBuilder.__get_workspace(value, context,
                                                                           os.path.join(path_prefix, key)))
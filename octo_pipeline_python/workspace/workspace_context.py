@@ -1,12 +1,17 @@
 import sys
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
 from octo_pipeline_python.actions.action_type import ActionType
 from octo_pipeline_python.common.surrounding import Surrounding
 
+if TYPE_CHECKING:
+    from octo_pipeline_python.actions.action_cache_settings import \
+        ActionCacheSettings
+    from octo_pipeline_python.backends.backend import Backend
+
 
 class WorkspaceStats(BaseModel):
     init_time: Optional[datetime] = Field(default=None, description="Start time of the pipeline")
@@ -37,7 +42,7 @@ class WorkspaceContext(BaseModel):
         """
         from octo_pipeline_python.backends.backend_description import \
             BackendDescription
-        backend_desc: BackendDescription = backend.describe_backend(self, workspace_context)
+        backend_desc: BackendDescription = backend.description(None, workspace_context)
         if self.backends_settings:
             if backend.backend_name() in self.backends_settings and \
                     self.backends_settings[backend.backend_name()].backend_args:
@@ -71,6 +76,39 @@ class WorkspaceContext(BaseModel):
                 return action_combined_settings
         return {}
 
+    def backend_cache_settings_for_backend(self, backend: "Backend", action_type: "ActionType",
+                                           action_name: Optional[str] = None) -> \
+            Optional["ActionCacheSettings"]:
+        """
+        Getter for the action result cache settings of the backend per workspace
+        :param backend:
+        :param action_type:
+        :param action_name:
+        :return:
+        """
+        if self.backends_settings and backend.backend_name() in self.backends_settings:
+            cache_settings = self.backends_settings[backend.backend_name()].backend_cache_settings
+            if cache_settings:
+                if action_name and action_name in cache_settings:
+                    return cache_settings[action_name]
+                if action_type and action_type in cache_settings:
+                    return cache_settings[action_type]
+        return None
+
+    def backend_concurrency_limits_for_backend(self, backend: "Backend", action_type: "ActionType",
+                                               action_name: Optional[str] = None) -> \
+            Tuple[Optional[int], Optional[int]]:
+        """
+        Getter for the concurrency limits of the backend and of the action per workspace
+        :param backend:
+        :param action_type:
+        :param action_name:
+        :return:
+        """
+        if self.backends_settings and backend.backend_name() in self.backends_settings:
+            return self.backends_settings[backend.backend_name()].concurrency_limits(action_type, action_name)
+        return None, None
+
 
 # Workaround for circular import of backend settings
 from octo_pipeline_python.backends.backend_settings import BackendSettings
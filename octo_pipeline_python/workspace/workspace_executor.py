@@ -0,0 +1,70 @@
+import traceback
+from enum import Enum
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from octo_pipeline_python.actions.action_result import ActionResultCode
+from octo_pipeline_python.utils.logger import logger
+from octo_pipeline_python.utils.metrics import Metrics, MetricsSnapshot
+from octo_pipeline_python.utils.tracer import TraceEvents, Tracer
+from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
+
+AttributesChanges = Dict[Optional[str], Dict[Tuple[str, str], Any]]
+
+
+class PipelineProcessResult(NamedTuple):
+    attributes_changes: AttributesChanges = {}
+    trace_events: TraceEvents = []
+    metrics: MetricsSnapshot = {}
+
+
+class WorkspaceExecutorType(str, Enum):
+    Thread = "thread"
+    Process = "process"
+
+
+def execute_pipeline_process(reset_cache: bool,
+                             action_cache_enabled: bool,
+                             trace: bool,
+                             metrics: bool,
+                             workspace_context: WorkspaceContext,
+                             source_dir: str,
+                             retries: int) -> Tuple[ActionResultCode, PipelineProcessResult]:
+    """
+    Executes a pipeline inside a worker process
+    The pipeline and the backends context are rebuilt in the worker, attributes are not persisted by it
+    and are returned to be merged into the backends context of the workspace, along with the recorded spans and metrics
+    :param reset_cache:
+    :param action_cache_enabled:
+    :param trace:
+    :param metrics:
+    :param workspace_context:
+    :param source_dir:
+    :param retries:
+    :return:
+    """
+    from octo_pipeline_python.backends.backends_context import BackendsContext
+    from octo_pipeline_python.pipeline.pipeline_builder import PipelineBuilder
+    pipeline = PipelineBuilder.create(source_dir, workspace_context.working_dir, ignore_workspace=True)
+    if not pipeline:
+        return ActionResultCode.FAILURE, PipelineProcessResult()
+    tracer = Tracer.start() if trace else None
+    collector = Metrics.start() if metrics else None
+    backends_context = BackendsContext(workspace_context, persist_attributes=False)
+    backends_context.action_cache.enabled = action_cache_enabled
+    result = ActionResultCode.FAILURE
+    for _ in range(retries):
+        try:
+            result = pipeline.execute_pipeline(backends_context, workspace_context, reset_cache)
+            break
+        except Exception as e:
+            logger.error(f"[{pipeline.context.name}] Error occurred while executing pipeline "
+                         f"in worker process - [{str(e)}]")
+            logger.error(traceback.format_exc())
+    # The parent reloads the pipeline from its DB once the worker is done
+    pipeline.flush()
+    if tracer:
+        tracer.stop()
+    if collector:
+        collector.stop()
+    return result, PipelineProcessResult(backends_context.attributes_changes(), tracer.events if tracer else [],
+                                         collector.snapshot() if collector else {})
@@ -0,0 +1,113 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+from threading import RLock
+from typing import Dict, Final, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from octo_pipeline_python.backends.backend_settings import SETTINGS_FILE_NAME
+from octo_pipeline_python.pipeline.pipeline_builder import PIPELINE_FILE_NAME
+from octo_pipeline_python.utils.git import GitUtils
+from octo_pipeline_python.utils.search import Search
+from octo_pipeline_python.workspace.workspace_database import WorkspaceDatabase
+
+FINGERPRINTS_DB_KEY: Final[str] = "fingerprints"
+DEFAULT_REMOTE_STATUS_TTL: Final[timedelta] = timedelta(minutes=5)
+
+
+class PipelineFingerprint(BaseModel):
+    head_branch: Optional[str] = Field(default=None, description="Checked out branch of the pipeline")
+    head_commit: Optional[str] = Field(default=None, description="Checked out commit of the pipeline")
+    pipeline_file_mtime: Optional[float] = Field(default=None, description="Modification time of the pipeline file")
+    pipeline_file_hash: Optional[str] = Field(default=None, description="Content hash of the pipeline file")
+    settings_file_mtime: Optional[float] = Field(default=None, description="Modification time of the settings file")
+    model_config = ConfigDict(frozen=True)
+
+
+class PipelineFingerprintRecord(BaseModel):
+    fingerprint: PipelineFingerprint = Field(description="Fingerprint of the pipeline when it was last resolved")
+    out_of_sync: Optional[bool] = Field(
+        default=None, description="Whether the pipeline was behind or ahead of its remote on the last check")
+    remote_checked_at: Optional[datetime] = Field(default=None, description="Time of the last remote check")
+
+
+class WorkspaceFingerprints:
+    """
+    Fingerprints of the workspace pipelines, persisted on the workspace DB
+    The result of the remote check of a pipeline is reused while its fingerprint did not change
+    and the check is recent enough
+    """
+    def __init__(self, db: WorkspaceDatabase, remote_status_ttl: timedelta = DEFAULT_REMOTE_STATUS_TTL):
+        self.__db = db
+        self.__remote_status_ttl = remote_status_ttl
+        self.__lock = RLock()
+        self.__records: Dict[str, PipelineFingerprintRecord] = dict(db.get(FINGERPRINTS_DB_KEY) or {})
+        self.__dirty = False
+
+    @staticmethod
+    def __mtime(path: Optional[str]) -> Optional[float]:
+        if path and os.path.exists(path):
+            return os.path.getmtime(path)
+        return None
+
+    @staticmethod
+    def fingerprint(pipeline_path: str) -> PipelineFingerprint:
+        """
+        Computes the fingerprint of the pipeline on the given path
+        :param pipeline_path:
+        :return:
+        """
+        pipeline_file = Search.search(pipeline_path, PIPELINE_FILE_NAME)
+        pipeline_file_hash = None
+        if pipeline_file:
+            with open(pipeline_file, "rb") as f:
+                pipeline_file_hash = hashlib.sha256(f.read()).hexdigest()
+        return PipelineFingerprint(head_branch=GitUtils.get_head_branch(pipeline_path),
+                                   head_commit=GitUtils.get_head_commit(pipeline_path),
+                                   pipeline_file_mtime=WorkspaceFingerprints.__mtime(pipeline_file),
+                                   pipeline_file_hash=pipeline_file_hash,
+                                   settings_file_mtime=WorkspaceFingerprints.__mtime(
+                                       Search.search(pipeline_path, SETTINGS_FILE_NAME)))
+
+    def out_of_sync(self, name: str, fingerprint: PipelineFingerprint) -> Optional[bool]:
+        """
+        Getter for the last remote check of the pipeline, None if it has to be checked again
+        :param name:
+        :param fingerprint:
+        :return:
+        """
+        record = self.__records.get(name)
+        if not record or record.fingerprint != fingerprint or record.out_of_sync is None or \
+                not record.remote_checked_at or datetime.now() - record.remote_checked_at > self.__remote_status_ttl:
+            return None
+        return record.out_of_sync
+
+    def update(self, name: str, fingerprint: PipelineFingerprint, out_of_sync: Optional[bool] = None) -> None:
+        """
+        Stores the fingerprint of the pipeline, along with the result of its remote check if it was checked
+        :param name:
+        :param fingerprint:
+        :param out_of_sync:
+        :return:
+        """
+        with self.__lock:
+            record = self.__records.get(name)
+            if out_of_sync is None and record and record.fingerprint == fingerprint:
+                return
+            self.__records[name] = PipelineFingerprintRecord(
+                fingerprint=fingerprint,
+                out_of_sync=out_of_sync,
+                remote_checked_at=datetime.now() if out_of_sync is not None else None)
+            self.__dirty = True
+
+    def flush(self) -> None:
+        """
+        Persists the fingerprints if any of them changed
+        :return:
+        """
+        with self.__lock:
+            if not self.__dirty:
+                return
+            self.__dirty = False
+            self.__db.commit(FINGERPRINTS_DB_KEY, dict(self.__records), flush=True)
@@ -0,0 +1,243 @@
+import math
+import os
+import socket
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Final, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from octo_pipeline_python.actions.action_result import ActionResultCode
+from octo_pipeline_python.pipeline.pipeline_context import PipelineActionStats
+from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
+
+HISTORY_DB_FILE_NAME: Final[str] = "history.db"
+HISTORY_DB_TIMEOUT: Final[float] = 30.0
+DEFAULT_REGRESSION_THRESHOLD: Final[float] = 1.2
+HISTORY_SCHEMA: Final[str] = """
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    id INTEGER PRIMARY KEY,
+    pipeline TEXT NOT NULL,
+    sha TEXT,
+    branch TEXT,
+    host TEXT,
+    start_time REAL NOT NULL,
+    duration REAL NOT NULL,
+    result INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS action_runs (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES pipeline_runs(id),
+    pipeline TEXT NOT NULL,
+    action TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    sha TEXT,
+    host TEXT,
+    start_time REAL NOT NULL,
+    duration REAL NOT NULL,
+    cpu_time REAL,
+    peak_rss INTEGER,
+    result INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pipeline_runs_by_pipeline ON pipeline_runs(pipeline, start_time);
+CREATE INDEX IF NOT EXISTS action_runs_by_action ON action_runs(pipeline, action, backend, start_time);
+"""
+SUCCEEDED_RESULTS: Final[Tuple[int, ...]] = (int(ActionResultCode.SUCCESS), int(ActionResultCode.PARTIAL_SUCCESS))
+
+
+class DurationStats(BaseModel):
+    pipeline: str = Field(description="Name of the pipeline")
+    action: Optional[str] = Field(default=None, description="Identifier of the action, none for the whole pipeline")
+    backend: Optional[str] = Field(default=None, description="Backend of the action")
+    runs: int = Field(description="Number of successful runs")
+    failures: int = Field(description="Number of failed runs")
+    p50: float = Field(description="Median duration of the successful runs in seconds")
+    p95: float = Field(description="95th percentile duration of the successful runs in seconds")
+    last: float = Field(description="Duration of the last successful run in seconds")
+
+
+class DurationRegression(BaseModel):
+    pipeline: str = Field(description="Name of the pipeline")
+    action: Optional[str] = Field(default=None, description="Identifier of the action, none for the whole pipeline")
+    backend: Optional[str] = Field(default=None, description="Backend of the action")
+    base_sha: str = Field(description="Commit the durations are compared against")
+    head_sha: str = Field(description="Commit the durations regressed on")
+    base_p50: float = Field(description="Median duration on the base commit in seconds")
+    head_p50: float = Field(description="Median duration on the head commit in seconds")
+
+    @property
+    def ratio(self) -> float:
+        """
+        How many times slower the head commit is
+        :return:
+        """
+        return self.head_p50 / self.base_p50 if self.base_p50 > 0 else math.inf
+
+
+class WorkspaceHistory:
+    """
+    History of the pipeline and action runs of the workspace, kept on an sqlite file under the workspace .cache
+    Only successful runs count for the durations, failed runs end early and would skew them
+    """
+    def __init__(self, context: WorkspaceContext):
+        self.__path = os.path.join(context.working_dir, ".cache", HISTORY_DB_FILE_NAME)
+        self.__host = socket.gethostname()
+        self.__initialized = False
+
+    @property
+    def path(self) -> str:
+        """
+        Getter for the path of the history file
+        :return:
+        """
+        return self.__path
+
+    def __connect(self) -> sqlite3.Connection:
+        # A connection per call, so the history can be recorded from any thread
+        if not self.__initialized:
+            os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        connection = sqlite3.connect(self.__path, timeout=HISTORY_DB_TIMEOUT)
+        if not self.__initialized:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(HISTORY_SCHEMA)
+            self.__initialized = True
+        return connection
+
+    @staticmethod
+    def __percentile(values: List[float], percentile: float) -> float:
+        """
+        Nearest rank percentile of sorted values
+        :param values:
+        :param percentile:
+        :return:
+        """
+        return values[max(0, min(len(values) - 1, math.ceil(percentile / 100 * len(values)) - 1))]
+
+    def record_run(self, pipeline: str,
+                   sha: Optional[str],
+                   branch: Optional[str],
+                   start_time: datetime,
+                   duration: float,
+                   result: ActionResultCode,
+                   actions_stats: List[PipelineActionStats]) -> None:
+        """
+        Records a pipeline run along with the runs of its actions
+        :param pipeline:
+        :param sha:
+        :param branch:
+        :param start_time:
+        :param duration:
+        :param result:
+        :param actions_stats:
+        :return:
+        """
+        with closing(self.__connect()) as connection, connection:
+            run_id = connection.execute(
+                "INSERT INTO pipeline_runs (pipeline, sha, branch, host, start_time, duration, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (pipeline, sha or None, branch or None, self.__host, start_time.timestamp(), duration,
+                 int(result))).lastrowid
+            connection.executemany(
+                "INSERT INTO action_runs (run_id, pipeline, action, backend, sha, host, start_time, duration, "
+                "cpu_time, peak_rss, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, pipeline, stats.action_id, stats.backend, sha or None, self.__host,
+                  stats.start_time.timestamp(), stats.wall_time, stats.cpu_time, stats.peak_rss,
+                  int(stats.result_code)) for stats in actions_stats])
+
+    def __runs(self, actions: bool,
+               pipeline: Optional[str]) -> Dict[Tuple[str, Optional[str], Optional[str]],
+                                                List[Tuple[Optional[str], float, int]]]:
+        """
+        Runs grouped by pipeline, or by pipeline action and backend, oldest first
+        :param actions:
+        :param pipeline:
+        :return:
+        """
+        columns = "pipeline, action, backend" if actions else "pipeline, NULL, NULL"
+        query = f"SELECT {columns}, sha, duration, result FROM {'action_runs' if actions else 'pipeline_runs'}"
+        parameters: Tuple[str, ...] = ()
+        if pipeline:
+            query += " WHERE pipeline = ?"
+            parameters = (pipeline,)
+        runs: Dict[Tuple[str, Optional[str], Optional[str]], List[Tuple[Optional[str], float, int]]] = {}
+        with closing(self.__connect()) as connection:
+            for name, action, backend, sha, duration, result in \
+                    connection.execute(query + " ORDER BY start_time, id", parameters):
+                runs.setdefault((name, action, backend), []).append((sha, duration, result))
+        return runs
+
+    def durations(self, actions: bool = False,
+                  pipeline: Optional[str] = None,
+                  last: Optional[int] = None) -> List[DurationStats]:
+        """
+        Duration percentiles per pipeline, or per action, slowest first
+        :param actions:
+        :param pipeline:
+        :param last: Only use the given number of last runs
+        :return:
+        """
+        durations: List[DurationStats] = []
+        for (name, action, backend), runs in self.__runs(actions, pipeline).items():
+            runs = runs[-last:] if last else runs
+            succeeded = [duration for _, duration, result in runs if result in SUCCEEDED_RESULTS]
+            if not succeeded:
+                continue
+            ordered = sorted(succeeded)
+            durations.append(DurationStats(pipeline=name, action=action, backend=backend,
+                                           runs=len(succeeded), failures=len(runs) - len(succeeded),
+                                           p50=WorkspaceHistory.__percentile(ordered, 50),
+                                           p95=WorkspaceHistory.__percentile(ordered, 95),
+                                           last=succeeded[-1]))
+        return sorted(durations, key=lambda stats: stats.p50, reverse=True)
+
+    def regressions(self, actions: bool = False,
+                    pipeline: Optional[str] = None,
+                    base_sha: Optional[str] = None,
+                    head_sha: Optional[str] = None,
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[DurationRegression]:
+        """
+        Pipelines or actions whose median duration grew by at least the threshold between two commits
+        The commits match by prefix, by default the last commit each ran on is compared with the one before it
+        :param actions:
+        :param pipeline:
+        :param base_sha:
+        :param head_sha:
+        :param threshold:
+        :return:
+        """
+        regressions: List[DurationRegression] = []
+        for (name, action, backend), runs in self.__runs(actions, pipeline).items():
+            by_sha: Dict[str, List[float]] = {}
+            for sha, duration, result in runs:
+                if sha and result in SUCCEEDED_RESULTS:
+                    # Keeps the commits in the order they first ran on
+                    by_sha.setdefault(sha, []).append(duration)
+            shas = list(by_sha)
+            head = next((sha for sha in reversed(shas) if sha.startswith(head_sha)), None) if head_sha \
+                else (shas[-1] if shas else None)
+            if not head:
+                continue
+            if base_sha:
+                base = next((sha for sha in reversed(shas) if sha.startswith(base_sha)), None)
+            else:
+                base = shas[shas.index(head) - 1] if shas.index(head) > 0 else None
+            if not base or base == head:
+                continue
+            regression = DurationRegression(pipeline=name, action=action, backend=backend,
+                                            base_sha=base, head_sha=head,
+                                            base_p50=WorkspaceHistory.__percentile(sorted(by_sha[base]), 50),
+                                            head_p50=WorkspaceHistory.__percentile(sorted(by_sha[head]), 50))
+            if regression.ratio >= threshold:
+                regressions.append(regression)
+        return sorted(regressions, key=lambda regression: regression.ratio, reverse=True)
+
+    def estimated_durations(self, last: Optional[int] = None) -> Dict[str, float]:
+        """
+        Median duration of the successful runs per pipeline
+        :param last:
+        :return:
+        """
+        if not os.path.exists(self.__path):
+            return {}
+        return {stats.pipeline: stats.p50 for stats in self.durations(last=last)}
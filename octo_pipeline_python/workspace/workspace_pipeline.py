@@ -1,7 +1,9 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from octo_pipeline_python.utils.git import GitCloneStrategy
+
 
 class WorkspacePipeline(BaseModel):
     name: str = Field(description="Name of the pipeline")
@@ -10,4 +12,6 @@ class WorkspacePipeline(BaseModel):
     path: str = Field(description="Path of the workspace pipeline")
     executable: bool = Field(description="Executable pipeline")
     external: bool = Field(description="External to pipeline")
+    weight: Optional[int] = Field(default=None, description="Tokens the pipeline takes from the workspace budget")
+    clone: Optional[GitCloneStrategy] = Field(default=None, description="How to clone the pipeline repo")
     model_config = ConfigDict(frozen=True)
@@ -0,0 +1,118 @@
+import multiprocessing
+import time
+from threading import RLock
+from typing import Final, Optional
+
+LOADAVG_PATH: Final[str] = "/proc/loadavg"
+MEMINFO_PATH: Final[str] = "/proc/meminfo"
+DEFAULT_MEMORY_PER_TOKEN: Final[int] = 512 * 1024 * 1024
+DEFAULT_SAMPLE_INTERVAL: Final[float] = 1.0
+# Syncing and resolving are bound on git and the network rather than on the CPU
+IO_PARALLEL_JOBS: Final[int] = max(4, min(multiprocessing.cpu_count() * 4, 32))
+
+
+class WorkspaceResources:
+    """
+    Token budget the workspace admits pipelines against, every pipeline takes its resource weight in tokens
+    When adaptive, the budget shrinks while the system load is above the CPU count or the available memory is low,
+    and grows back as they recover
+    A pipeline is always admitted when nothing else is running, so heavy pipelines can never starve
+    """
+    def __init__(self, budget: int,
+                 adaptive: bool = True,
+                 memory_per_token: int = DEFAULT_MEMORY_PER_TOKEN,
+                 sample_interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.__budget = max(1, budget)
+        self.__adaptive = adaptive
+        self.__memory_per_token = memory_per_token
+        self.__sample_interval = sample_interval
+        self.__cpus = multiprocessing.cpu_count()
+        self.__lock = RLock()
+        self.__in_use = 0
+        self.__capacity = self.__budget
+        self.__sampled_at: Optional[float] = None
+
+    @property
+    def budget(self) -> int:
+        """
+        Getter for the configured token budget
+        :return:
+        """
+        return self.__budget
+
+    @property
+    def in_use(self) -> int:
+        """
+        Getter for the tokens taken by the running pipelines
+        :return:
+        """
+        return self.__in_use
+
+    @staticmethod
+    def load_average() -> Optional[float]:
+        """
+        One minute load average of the system, if available
+        :return:
+        """
+        try:
+            with open(LOADAVG_PATH, "r") as f:
+                return float(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    @staticmethod
+    def available_memory() -> Optional[int]:
+        """
+        Memory available for new work in bytes, if available
+        :return:
+        """
+        try:
+            with open(MEMINFO_PATH, "r") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return None
+
+    def capacity(self) -> int:
+        """
+        Tokens that may currently be in use, sampled at most once per interval
+        :return:
+        """
+        if not self.__adaptive:
+            return self.__budget
+        now = time.monotonic()
+        if self.__sampled_at is not None and now - self.__sampled_at < self.__sample_interval:
+            return self.__capacity
+        self.__sampled_at = now
+        load, memory = WorkspaceResources.load_average(), WorkspaceResources.available_memory()
+        capacity = self.__budget
+        if load is not None and load > self.__cpus:
+            capacity = min(capacity, int(self.__budget * self.__cpus / load))
+        if memory is not None:
+            # Memory taken by the running pipelines is already missing from the available memory
+            capacity = min(capacity, self.__in_use + memory // self.__memory_per_token)
+        self.__capacity = max(1, capacity)
+        return self.__capacity
+
+    def try_acquire(self, weight: int) -> bool:
+        """
+        Takes the tokens of a pipeline if the budget allows it
+        :param weight:
+        :return:
+        """
+        with self.__lock:
+            if self.__in_use > 0 and self.__in_use + weight > self.capacity():
+                return False
+            self.__in_use += weight
+            return True
+
+    def release(self, weight: int) -> None:
+        """
+        Returns the tokens of a pipeline that finished
+        :param weight:
+        :return:
+        """
+        with self.__lock:
+            self.__in_use = max(0, self.__in_use - weight)
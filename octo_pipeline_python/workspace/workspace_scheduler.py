@@ -0,0 +1,99 @@
+from enum import Enum
+from typing import Dict, Final, Optional, Tuple
+
+import networkx
+
+from octo_pipeline_python.pipeline.pipeline import Pipeline
+
+DEFAULT_PIPELINE_DURATION: Final[float] = 60.0
+
+
+class SchedulePolicy(str, Enum):
+    CriticalPath = "critical-path"
+    Fifo = "fifo"
+
+
+class WorkspaceScheduler:
+    """
+    Orders the ready pipelines of the workspace
+    The critical path policy prefers the pipelines with the longest remaining downstream path,
+    based on the durations of their previous runs, or the estimates given for them
+    """
+    def __init__(self, graph: networkx.DiGraph,
+                 pipelines: Dict[str, Pipeline],
+                 policy: SchedulePolicy = SchedulePolicy.CriticalPath,
+                 estimates: Optional[Dict[str, float]] = None):
+        self.__policy = policy
+        self.__order: Dict[str, int] = {}
+        self.__ranks: Dict[str, float] = {}
+        if policy == SchedulePolicy.CriticalPath:
+            self.__ranks = WorkspaceScheduler.critical_path_ranks(graph,
+                                                                  WorkspaceScheduler.durations(pipelines, estimates))
+
+    @property
+    def policy(self) -> SchedulePolicy:
+        """
+        Getter for the scheduling policy
+        :return:
+        """
+        return self.__policy
+
+    @staticmethod
+    def pipeline_duration(pipeline: Pipeline) -> Optional[float]:
+        """
+        Duration of the last run of the pipeline, if it completed one
+        :param pipeline:
+        :return:
+        """
+        stats = pipeline.context.stats
+        if stats and stats.start_time and stats.end_time and stats.end_time >= stats.start_time:
+            return (stats.end_time - stats.start_time).total_seconds()
+        return None
+
+    @staticmethod
+    def durations(pipelines: Dict[str, Pipeline], estimates: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """
+        Estimated duration per pipeline, the given estimates take precedence over the last run
+        Pipelines that never ran get the average of the ones that did
+        :param pipelines:
+        :param estimates:
+        :return:
+        """
+        estimates = estimates or {}
+        known = {name: duration for name, pipeline in pipelines.items()
+                 if (duration := estimates.get(name, WorkspaceScheduler.pipeline_duration(pipeline))) is not None}
+        default = sum(known.values()) / len(known) if known else DEFAULT_PIPELINE_DURATION
+        return {name: known.get(name, default) for name in pipelines}
+
+    @staticmethod
+    def critical_path_ranks(graph: networkx.DiGraph, durations: Dict[str, float]) -> Dict[str, float]:
+        """
+        Length of the longest path from each pipeline to the end of the graph, including itself
+        :param graph:
+        :param durations:
+        :return:
+        """
+        ranks: Dict[str, float] = {}
+        for node in reversed(list(networkx.topological_sort(graph))):
+            ranks[node] = durations.get(node, 0.0) + max((ranks[s] for s in graph.successors(node)), default=0.0)
+        return ranks
+
+    def rank(self, name: str) -> float:
+        """
+        Getter for the rank of a pipeline, higher runs first
+        :param name:
+        :return:
+        """
+        return self.__ranks.get(name, 0.0)
+
+    def priority(self, name: str) -> Tuple[float, int]:
+        """
+        Sort key of a ready pipeline by the policy, lower runs first
+        Pipelines of the same rank are kept in the order they became ready
+        :param name:
+        :return:
+        """
+        sequence = self.__order.setdefault(name, len(self.__order))
+        if self.__policy == SchedulePolicy.CriticalPath:
+            return -self.__ranks.get(name, 0.0), sequence
+        return 0.0, sequence
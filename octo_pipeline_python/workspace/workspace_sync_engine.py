@@ -0,0 +1,159 @@
+import asyncio
+import os
+from enum import Enum
+from random import uniform
+from typing import Dict, Final, List, Optional, Tuple
+
+from octo_pipeline_python.pipeline.pipeline import Pipeline
+from octo_pipeline_python.utils.git import GitUtils
+from octo_pipeline_python.utils.logger import logger
+from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
+from octo_pipeline_python.workspace.workspace_pipeline import WorkspacePipeline
+
+DEFAULT_ASYNC_SYNC_JOBS: Final[int] = 64
+DEFAULT_MAX_RETRY_SLEEP: Final[float] = 60
+
+
+class WorkspaceSyncEngineType(str, Enum):
+    Thread = "thread"
+    Asyncio = "asyncio"
+
+
+class WorkspaceSyncEngine:
+    """
+    Syncs the workspace repos by driving git subprocesses from a single event loop
+    Only the running git processes take a slot, pipelines waiting for a retry do not hold one
+    """
+    def __init__(self, context: WorkspaceContext,
+                 parallel_jobs: Optional[int] = None,
+                 sync_retry: int = 3,
+                 backoff_factor: float = 1.3,
+                 max_retry_sleep: float = DEFAULT_MAX_RETRY_SLEEP,
+                 git_cache_dir: Optional[str] = None):
+        self.__context = context
+        self.__parallel_jobs = parallel_jobs or DEFAULT_ASYNC_SYNC_JOBS
+        self.__sync_retry = sync_retry
+        self.__backoff_factor = backoff_factor
+        self.__max_retry_sleep = max_retry_sleep
+        self.__git_cache_dir = git_cache_dir
+        # Replaced on every sync, as each sync runs on its own event loop
+        self.__slots = asyncio.Semaphore(self.__parallel_jobs)
+        self.__total = 0
+        self.__done = 0
+        self.__failed: List[str] = []
+
+    async def __git(self, cwd: Optional[str], *args: str) -> Tuple[int, str]:
+        env = os.environ.copy()
+        # Never block on credentials prompts
+        env["GIT_TERMINAL_PROMPT"] = "0"
+        async with self.__slots:
+            process = await asyncio.create_subprocess_exec("git", *args, cwd=cwd, env=env,
+                                                           stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.STDOUT)
+            output, _ = await process.communicate()
+        # Set once communicate returns, as the process exited
+        returncode = process.returncode if process.returncode is not None else -1
+        return returncode, output.decode(errors="replace").strip()
+
+    async def __checkout(self, path: str, branch: str) -> bool:
+        code, current = await self.__git(path, "rev-parse", "--abbrev-ref", "HEAD")
+        if code != 0:
+            return False
+        if current == branch:
+            return True
+        code, _ = await self.__git(path, "checkout", branch)
+        return code == 0
+
+    async def __pull(self, path: str) -> bool:
+        code, branch = await self.__git(path, "rev-parse", "--abbrev-ref", "HEAD")
+        if code != 0:
+            return False
+        code, _ = await self.__git(path, "pull", "origin", branch)
+        return code == 0
+
+    async def __clone(self, workspace_pipeline: WorkspacePipeline, pipeline_path: str) -> Optional[str]:
+        for org in self.__context.organizations:
+            scm = GitUtils.create_ssh_scm_for(self.__context.scm, org, workspace_pipeline.name)
+            logger.info(f"Trying to checkout [{workspace_pipeline.name}] from org [{org}] ")
+            strategy = await asyncio.get_running_loop().run_in_executor(
+                None, GitUtils.cached_clone_strategy, scm, workspace_pipeline.clone, self.__git_cache_dir)
+            code, _ = await self.__git(None, "clone", *strategy.clone_args(workspace_pipeline.head),
+                                       scm, pipeline_path)
+            if code == 0:
+                if strategy.narrow or await self.__checkout(pipeline_path, workspace_pipeline.head):
+                    return scm
+                return None
+        return None
+
+    def __finished(self, workspace_pipeline: WorkspacePipeline, success: bool, action: str) -> None:
+        self.__done += 1
+        if success:
+            logger.info(f"[{workspace_pipeline.name}] {action} [{self.__done}/{self.__total}]")
+        else:
+            logger.warning(f"[{workspace_pipeline.name}] Failed to sync [{self.__done}/{self.__total}]")
+            self.__failed.append(workspace_pipeline.name)
+
+    async def __sync_unresolved(self, path: str, workspace_pipeline: WorkspacePipeline) -> None:
+        pipeline_path = os.path.join(path, workspace_pipeline.name)
+        os.makedirs(pipeline_path, exist_ok=True)
+        if len(os.listdir(pipeline_path)) == 0 and not await self.__clone(workspace_pipeline, pipeline_path):
+            self.__finished(workspace_pipeline, False, "Cloned")
+            return
+        if workspace_pipeline.external:
+            self.__finished(workspace_pipeline, True, "Cloned")
+            return
+        # The repo is already cloned, this only checks out and validates the pipeline files
+        pipeline: Optional[Pipeline] = await asyncio.get_running_loop().run_in_executor(
+            None, Pipeline.init_pipeline_to, self.__context.organizations, workspace_pipeline.name,
+            self.__context.scm, pipeline_path, workspace_pipeline.head, True, False)
+        if not pipeline:
+            logger.warning(f"Failed to resolve pipeline {workspace_pipeline.name} [Pipeline files were not found]")
+        self.__finished(workspace_pipeline, pipeline is not None, "Cloned")
+
+    async def __sync_unsynced(self, path: str, workspace_pipeline: WorkspacePipeline, no_code_sync: bool) -> None:
+        pipeline_path = os.path.join(path, workspace_pipeline.name)
+        if not await self.__checkout(pipeline_path, workspace_pipeline.head):
+            logger.warning(f"Failed to sync pipeline {workspace_pipeline.name} branch")
+            self.__finished(workspace_pipeline, False, "Synced")
+            return
+        if no_code_sync:
+            self.__finished(workspace_pipeline, True, "Synced")
+            return
+        success = await self.__pull(pipeline_path)
+        backoff_factor = self.__backoff_factor
+        for _ in range(self.__sync_retry if not success else 0):
+            retry_sleep = min(round(uniform(1 * backoff_factor, 5 * backoff_factor), 3), self.__max_retry_sleep)
+            backoff_factor *= backoff_factor
+            logger.info(f"Retrying pipeline {workspace_pipeline.name} pull code in [{retry_sleep}] seconds")
+            await asyncio.sleep(retry_sleep)
+            success = await self.__pull(pipeline_path)
+            if success:
+                break
+        self.__finished(workspace_pipeline, success, "Synced")
+
+    async def __sync(self, unresolved_pipelines: Dict[str, List[WorkspacePipeline]],
+                     unsynced_pipelines: Dict[str, List[WorkspacePipeline]],
+                     no_code_sync: bool) -> List[str]:
+        self.__slots = asyncio.Semaphore(self.__parallel_jobs)
+        self.__done = 0
+        self.__failed = []
+        tasks = [self.__sync_unresolved(path, pipeline)
+                 for path, pipelines in unresolved_pipelines.items() for pipeline in pipelines]
+        tasks.extend(self.__sync_unsynced(path, pipeline, no_code_sync)
+                     for path, pipelines in unsynced_pipelines.items() for pipeline in pipelines)
+        self.__total = len(tasks)
+        logger.info(f"Syncing [{self.__total}] pipelines with [{self.__parallel_jobs}] concurrent git processes")
+        await asyncio.gather(*tasks)
+        return self.__failed
+
+    def sync(self, unresolved_pipelines: Dict[str, List[WorkspacePipeline]],
+             unsynced_pipelines: Dict[str, List[WorkspacePipeline]],
+             no_code_sync: bool = False) -> List[str]:
+        """
+        Clones the unresolved pipelines and checks out and pulls the unsynced ones
+        :param unresolved_pipelines:
+        :param unsynced_pipelines:
+        :param no_code_sync:
+        :return: List of pipelines that failed to sync
+        """
+        return asyncio.run(self.__sync(unresolved_pipelines, unsynced_pipelines, no_code_sync))
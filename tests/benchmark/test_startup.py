@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import yaml
+
+PIPELINES_COUNT = 200
+GROUP_SIZE = 20
+STARTUP_RUNS = int(os.environ.get("OCTO_STARTUP_RUNS", 5))
+# Relative slowdown over the recorded baseline that fails the benchmark
+STARTUP_TOLERANCE = float(os.environ.get("OCTO_STARTUP_TOLERANCE", 0.5))
+# Records the measured median as the new baseline instead of comparing against it
+STARTUP_RECORD = os.environ.get("OCTO_STARTUP_RECORD", "").lower() in ("1", "true", "yes", "on")
+STARTUP_BASELINE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "startup_baseline.json")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+
+def create_workspace(path: str) -> None:
+    workspace = {
+        "name": "benchmark",
+        "scm": "git@github.com",
+        "organizations": ["benchmark"],
+        "workspace": [
+            {f"group-{group}": [f"pipeline-{group}-{idx}" for idx in range(GROUP_SIZE)]}
+            for group in range(PIPELINES_COUNT // GROUP_SIZE)
+        ]
+    }
+    with open(os.path.join(path, "workspace.yml"), "w") as f:
+        yaml.dump(workspace, f)
+
+
+def run_octo(cwd: str, *args: str) -> float:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([REPO_ROOT, os.environ.get("PYTHONPATH", "")])}
+    env.pop("OCTO_DAEMON", None)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "octo_pipeline_python.octo", *args],
+                   cwd=cwd, env=env, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def startup_budget() -> float:
+    with open(STARTUP_BASELINE_PATH) as f:
+        baseline = json.load(f)
+    return baseline["median"] * (1 + STARTUP_TOLERANCE)
+
+
+def test_cold_startup(tmp_path):
+    create_workspace(str(tmp_path))
+    durations = sorted(run_octo(str(tmp_path), "workspace", "describe") for _ in range(STARTUP_RUNS))
+    median = durations[len(durations) // 2]
+    if STARTUP_RECORD:
+        with open(STARTUP_BASELINE_PATH, "w") as f:
+            json.dump({"median": round(median, 3), "runs": STARTUP_RUNS, "pipelines": PIPELINES_COUNT}, f, indent=4)
+            f.write("\n")
+    budget = startup_budget()
+    assert median < budget, (f"cold startup of a {PIPELINES_COUNT} pipelines workspace took a median of "
+                             f"{median:.3f}s over the {budget:.3f}s budget, runs {durations}")
+
+
+def test_startup_profile(tmp_path):
+    create_workspace(str(tmp_path))
+    report_path = os.path.join(str(tmp_path), "startup.json")
+    run_octo(str(tmp_path), f"--profile-startup={report_path}", "workspace", "describe")
+    with open(report_path) as f:
+        report = json.load(f)
+    phases = {phase["phase"] for phase in report["phases"]}
+    assert {"imports", "WorkspaceBuilder.create", "parse_known_args"} <= phases
+    assert report["imports"]
+    assert report["total"] < startup_budget(), f"profiled startup took {report['total']:.3f}s"
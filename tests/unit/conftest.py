@@ -0,0 +1,148 @@
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import pytest
+import yaml
+from pydantic import BaseModel
+
+from octo_pipeline_python.actions.action import Action
+from octo_pipeline_python.actions.action_result import (ActionResult,
+                                                        ActionResultCode)
+from octo_pipeline_python.actions.action_type import ActionType
+from octo_pipeline_python.backends.backend import Backend
+from octo_pipeline_python.backends.backend_auth_details import \
+    BackendAuthDetails
+from octo_pipeline_python.backends.backend_description import \
+    BackendDescription
+from octo_pipeline_python.backends.backends_context import BackendsContext
+from octo_pipeline_python.pipeline.pipeline_context import PipelineContext
+from octo_pipeline_python.workspace.workspace_context import WorkspaceContext
+
+RECORDING_BACKEND_NAME = "unit-recording"
+
+
+class RecordingModel(BaseModel):
+    pass
+
+
+class RecordingAction(Action):
+    """
+    Records the actions it runs, failing the ones asked to and running the hooks given for them
+    """
+    def __init__(self, action_type: ActionType):
+        self.__action_type = action_type
+
+    def prepare(self, backend: Backend,
+                backends_context: BackendsContext,
+                pipeline_context: PipelineContext,
+                workspace_context: WorkspaceContext,
+                action_name: Optional[str]) -> bool:
+        return True
+
+    def execute(self, backend: Backend,
+                backends_context: BackendsContext,
+                pipeline_context: PipelineContext,
+                workspace_context: WorkspaceContext,
+                action_name: Optional[str]) -> ActionResult:
+        action_id = f"{pipeline_context.name}/{action_name or self.__action_type.value}"
+        with RecordingBackend.lock:
+            RecordingBackend.runs.append(action_id)
+        if action_id in RecordingBackend.hooks:
+            RecordingBackend.hooks[action_id](backends_context, pipeline_context)
+        result_code = ActionResultCode.FAILURE if action_id in RecordingBackend.failing else ActionResultCode.SUCCESS
+        return ActionResult(action_type=self.__action_type, result=[], result_code=result_code)
+
+    def cleanup(self, backend: Backend,
+                backends_context: BackendsContext,
+                pipeline_context: PipelineContext,
+                workspace_context: WorkspaceContext,
+                action_name: Optional[str]) -> None:
+        pass
+
+    @property
+    def action_type(self) -> ActionType:
+        return self.__action_type
+
+
+class RecordingBackend(Backend):
+    lock = threading.Lock()
+    runs: List[str] = []
+    failing: Set[str] = set()
+    hooks: Dict[str, Callable[[BackendsContext, PipelineContext], None]] = {}
+
+    def initialize_backend(self, backends_context: BackendsContext, workspace_context: WorkspaceContext) -> bool:
+        return True
+
+    def cleanup_backend(self, backends_context: BackendsContext, workspace_context: WorkspaceContext) -> None:
+        pass
+
+    def authenticate_backend(self, auth_details: BackendAuthDetails,
+                             backends_context: BackendsContext,
+                             workspace_context: WorkspaceContext,
+                             pipeline_context: Optional[PipelineContext]) -> ActionResultCode:
+        return ActionResultCode.SUCCESS
+
+    def describe_backend(self, backends_context: BackendsContext,
+                         workspace_context: WorkspaceContext) -> BackendDescription:
+        return BackendDescription(name=RECORDING_BACKEND_NAME,
+                                  working_dir=os.path.join(workspace_context.working_dir, RECORDING_BACKEND_NAME),
+                                  actions={action_type: RecordingAction(action_type) for action_type in ActionType},
+                                  backend_model=RecordingModel)
+
+    @staticmethod
+    def backend_name() -> str:
+        return RECORDING_BACKEND_NAME
+
+
+@pytest.fixture
+def recording_backend() -> Any:
+    RecordingBackend.runs = []
+    RecordingBackend.failing = set()
+    RecordingBackend.hooks = {}
+    yield RecordingBackend
+    RecordingBackend.runs = []
+    RecordingBackend.failing = set()
+    RecordingBackend.hooks = {}
+
+
+def write_pipeline_file(path: str, name: str, actions: List[Dict[str, Dict[str, Any]]]) -> None:
+    """
+    Writes a pipeline file of actions on the recording backend
+    :param path:
+    :param name:
+    :param actions:
+    :return:
+    """
+    os.makedirs(path, exist_ok=True)
+    pipeline = [{action_type: {"backend": RECORDING_BACKEND_NAME, "surroundings": ["local"], **action}}
+                for action_group in actions for action_type, action in action_group.items()]
+    with open(os.path.join(path, "pipeline.yml"), "w") as f:
+        yaml.dump({"name": name, "version": "1.0.0", "scm": "git@github.com", "pipeline": pipeline}, f)
+
+
+@pytest.fixture
+def write_pipeline() -> Callable[[str, str, List[Dict[str, Dict[str, Any]]]], None]:
+    return write_pipeline_file
+
+
+def write_workspace_file(path: str, pipelines: Dict[str, List[str]]) -> str:
+    """
+    Writes a workspace of single action pipelines on the recording backend, by their needs
+    :param path:
+    :param pipelines:
+    :return: The path of the workspace file
+    """
+    for name in pipelines:
+        write_pipeline_file(os.path.join(path, "group", name), name, [{"build": {}}])
+    workspace = [{name: {"needs": needs}} for name, needs in pipelines.items()]
+    workspace_file = os.path.join(path, "workspace.yml")
+    with open(workspace_file, "w") as f:
+        yaml.dump({"name": "workspace", "scm": "git@github.com", "organizations": ["unit"],
+                   "workspace": [{"group": workspace}]}, f)
+    return workspace_file
+
+
+@pytest.fixture
+def write_workspace() -> Callable[[str, Dict[str, List[str]]], str]:
+    return write_workspace_file
@@ -0,0 +1,93 @@
+import os
+
+import yaml
+
+from octo_pipeline_python.actions.action_result import ActionResultCode
+from octo_pipeline_python.backends.backends_context import BackendsContext
+from octo_pipeline_python.pipeline.pipeline_context import PipelineContext
+from octo_pipeline_python.workspace.workspace_builder import WorkspaceBuilder
+
+
+def write_cache_settings(path: str, backend: str, cache):
+    with open(os.path.join(path, "settings.yml"), "w") as f:
+        yaml.dump({backend: {"cache": cache}}, f)
+
+
+def write_source(path: str, name: str, content: str):
+    os.makedirs(os.path.join(path, "src"), exist_ok=True)
+    with open(os.path.join(path, "src", name), "w") as f:
+        f.write(content)
+
+
+def execute_pipeline(path: str, persist_attributes: bool = True):
+    workspace = WorkspaceBuilder.create_singular_workspace(source_dir=path)
+    backends_context = BackendsContext(workspace.context, persist_attributes=persist_attributes)
+    result = workspace.singular_pipeline.execute_pipeline(backends_context, workspace.context, clear_database=True)
+    return result, backends_context, workspace.singular_pipeline.context
+
+
+def build_artifact(backends_context: BackendsContext, pipeline_context: PipelineContext):
+    artifact = os.path.join(pipeline_context.working_dir, "out", "artifact.txt")
+    os.makedirs(os.path.dirname(artifact), exist_ok=True)
+    with open(artifact, "w") as f:
+        f.write("built")
+    backends_context.add_attribute("unit-recording", "artifact", artifact, tag=pipeline_context.name)
+
+
+def test_unchanged_inputs_hit_and_restore(tmp_path, recording_backend, write_pipeline):
+    write_pipeline(str(tmp_path), "cached", [{"build": {}}])
+    write_cache_settings(str(tmp_path), recording_backend.backend_name(),
+                         {"build": {"inputs": ["src/*.c"], "outputs": ["$working_dir/out/**"]}})
+    write_source(str(tmp_path), "main.c", "int main() {}")
+    recording_backend.hooks = {"cached/build": build_artifact}
+
+    result, _, pipeline_context = execute_pipeline(str(tmp_path))
+    assert result == ActionResultCode.SUCCESS
+    assert recording_backend.runs == ["cached/build"]
+    artifact = os.path.join(pipeline_context.working_dir, "out", "artifact.txt")
+    os.remove(artifact)
+
+    # Fresh attributes, so the ones set by the action can only come back from the cache
+    recording_backend.runs = []
+    result, backends_context, _ = execute_pipeline(str(tmp_path), persist_attributes=False)
+    assert result == ActionResultCode.SUCCESS
+    assert recording_backend.runs == []
+    with open(artifact) as f:
+        assert f.read() == "built"
+    assert backends_context.attribute(recording_backend.backend_name(), "artifact", tag="cached") == artifact
+
+
+def test_changed_inputs_miss(tmp_path, recording_backend, write_pipeline):
+    write_pipeline(str(tmp_path), "cached", [{"build": {}}])
+    write_cache_settings(str(tmp_path), recording_backend.backend_name(), {"build": {"inputs": ["src/*.c"]}})
+    write_source(str(tmp_path), "main.c", "int main() {}")
+    assert execute_pipeline(str(tmp_path))[0] == ActionResultCode.SUCCESS
+
+    write_source(str(tmp_path), "main.c", "int main() { return 1; }")
+    recording_backend.runs = []
+    assert execute_pipeline(str(tmp_path))[0] == ActionResultCode.SUCCESS
+    assert recording_backend.runs == ["cached/build"]
+
+
+def test_rebuilt_needs_miss_dependents(tmp_path, recording_backend, write_pipeline):
+    write_pipeline(str(tmp_path), "graph", [
+        {"build": {"needs": []}},
+        {"unittests": {"needs": ["build"]}},
+    ])
+    write_cache_settings(str(tmp_path), recording_backend.backend_name(),
+                         {"build": {"inputs": ["src/*.c"], "outputs": ["$working_dir/out/**"]},
+                          "unittests": {"inputs": ["$working_dir/out/*.txt"]}})
+    write_source(str(tmp_path), "main.c", "int main() {}")
+    recording_backend.hooks = {"graph/build": build_artifact}
+    assert execute_pipeline(str(tmp_path))[0] == ActionResultCode.SUCCESS
+    assert recording_backend.runs == ["graph/build", "graph/unittests"]
+
+    recording_backend.runs = []
+    assert execute_pipeline(str(tmp_path))[0] == ActionResultCode.SUCCESS
+    assert recording_backend.runs == []
+
+    # The tests inputs stay the same, yet the build they need ran on other sources
+    write_source(str(tmp_path), "main.c", "int main() { return 1; }")
+    recording_backend.runs = []
+    assert execute_pipeline(str(tmp_path))[0] == ActionResultCode.SUCCESS
+    assert recording_backend.runs == ["graph/build", "graph/unittests"]
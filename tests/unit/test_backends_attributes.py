@@ -0,0 +1,50 @@
+from octo_pipeline_python.backends.backends_attributes import (
+    ATTRIBUTES_DB_KEY, BackendsAttributesShard)
+from octo_pipeline_python.backends.backends_context import BackendsContext
+from octo_pipeline_python.backends.backends_database import BackendsDatabase
+from octo_pipeline_python.common.surrounding import Surrounding
+from octo_pipeline_python.workspace.workspace_context import (WorkspaceContext,
+                                                              WorkspaceStats)
+
+
+def create_context(path: str) -> WorkspaceContext:
+    return WorkspaceContext(name="legacy", scm="", source_dir=path, working_dir=path,
+                            surrounding=Surrounding.Local, organizations=[], stats=WorkspaceStats())
+
+
+def test_legacy_backend_names_are_the_registered_names():
+    backends = BackendsAttributesShard.legacy_backend_names()
+    assert {"conan", "cfn-nag", "git"} <= backends
+    # Packages of the backends tree that are not backends
+    assert "cfn_nag" not in backends
+    assert "__pycache__" not in backends
+
+
+def test_legacy_keys_split_on_known_backends():
+    backends = {"conan", "cfn-nag"}
+    assert BackendsAttributesShard.split_legacy_key("app.conan.profile.host", backends) == \
+        ("app", ("conan", "profile.host"))
+    assert BackendsAttributesShard.split_legacy_key("cfn-nag.report", backends) == (None, ("cfn-nag", "report"))
+    assert BackendsAttributesShard.split_legacy_key("conan.remote.url", backends) == (None, ("conan", "remote.url"))
+
+
+def test_legacy_db_is_migrated_to_tagged_shards(tmp_path):
+    context = create_context(str(tmp_path))
+    BackendsDatabase(context).commit(ATTRIBUTES_DB_KEY, {
+        "app.conan.profile": "release",
+        "app.cfn-nag.report": "report.json",
+        "git.token.scope": "repo",
+        ("git", "user"): "octo",
+    }, flush=True)
+
+    backends_context = BackendsContext(context)
+    assert backends_context.attribute("conan", "profile", "app") == "release"
+    assert backends_context.attribute("cfn-nag", "report", "app") == "report.json"
+    assert backends_context.attribute("git", "token.scope") == "repo"
+    assert backends_context.attribute("git", "user") == "octo"
+
+    # The migration is persisted, the untagged shard keeps only the new keys
+    assert BackendsDatabase(context).get(ATTRIBUTES_DB_KEY) == {("git", "token.scope"): "repo", ("git", "user"): "octo"}
+    assert BackendsDatabase(context, "app").get(ATTRIBUTES_DB_KEY) == \
+        {("conan", "profile"): "release", ("cfn-nag", "report"): "report.json"}
+    assert BackendsContext(context).attribute("conan", "profile", "app") == "release"
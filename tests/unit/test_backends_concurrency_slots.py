@@ -0,0 +1,42 @@
+import multiprocessing
+
+from octo_pipeline_python.backends.backends_concurrency_slots import \
+    BackendsConcurrencySlots
+
+
+def hold_slot(working_dir: str, acquired: multiprocessing.Event, done: multiprocessing.Event) -> None:
+    slots = BackendsConcurrencySlots(working_dir, ("conan",), 1)
+    slots.acquire()
+    acquired.set()
+    done.wait(30)
+    slots.release()
+
+
+def test_slots_are_shared_by_the_contexts_of_a_workspace(tmp_path):
+    first = BackendsConcurrencySlots(str(tmp_path), ("conan", "build"), 2)
+    second = BackendsConcurrencySlots(str(tmp_path), ("conan", "build"), 2)
+    assert first.acquire(blocking=False)
+    assert second.acquire(blocking=False)
+    assert not first.acquire(blocking=False)
+    second.release()
+    assert first.acquire(blocking=False)
+    first.release()
+    first.release()
+
+
+def test_slots_are_shared_across_processes(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    acquired, done = context.Event(), context.Event()
+    process = context.Process(target=hold_slot, args=(str(tmp_path), acquired, done))
+    process.start()
+    try:
+        assert acquired.wait(30)
+        slots = BackendsConcurrencySlots(str(tmp_path), ("conan",), 1)
+        assert not slots.acquire(blocking=False)
+        done.set()
+        process.join(30)
+        assert slots.acquire(blocking=False)
+        slots.release()
+    finally:
+        done.set()
+        process.join(30)
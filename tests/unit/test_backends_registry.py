@@ -0,0 +1,20 @@
+import subprocess
+import sys
+
+from octo_pipeline_python.backends.backends_registry import BackendsRegistry
+
+
+def test_has_backend_by_name():
+    assert BackendsRegistry.has_backend("conan")
+    assert not BackendsRegistry.has_backend("no-such-backend")
+
+
+def test_has_backend_imports_nothing():
+    # Runs on a fresh interpreter, as other tests may have imported the backends already
+    script = ("import sys\n"
+              "from octo_pipeline_python.backends.backends_registry import BackendsRegistry\n"
+              "assert all(BackendsRegistry.has_backend(name) for name in ('conan', 'git', 'clang', 'cppcheck'))\n"
+              "BackendsRegistry.names()\n"
+              "print(sorted(name for name in sys.modules if name.startswith('octo_pipeline_python.backends.')))\n")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "['octo_pipeline_python.backends.backends_registry']", result.stderr
@@ -0,0 +1,91 @@
+import os
+import pickle
+
+from octo_pipeline_python.common.database_engine import (JOURNAL_RECORD_HEADER,
+                                                         JournalDatabaseEngine,
+                                                         PickleDatabaseEngine)
+
+
+def test_changes_replay_in_order(tmp_path):
+    engine = JournalDatabaseEngine(str(tmp_path), "db")
+    engine.write({"a": 1}, {"a": 1})
+    engine.write({"b": 2}, {"a": 1, "b": 2})
+    engine.write({"a": 3}, {"a": 3, "b": 2})
+    assert JournalDatabaseEngine(str(tmp_path), "db").load() == {"a": 3, "b": 2}
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    engine = JournalDatabaseEngine(str(tmp_path), "db")
+    engine.write({"a": 1}, {"a": 1})
+    engine.write({"b": 2}, {"a": 1, "b": 2})
+    valid_size = os.path.getsize(engine.journal_file)
+    engine.write({"c": 3}, {"a": 1, "b": 2, "c": 3})
+    # Cut the last record in the middle of its payload, as a crash during the append would
+    with open(engine.journal_file, "r+b") as f:
+        f.truncate(os.path.getsize(engine.journal_file) - 2)
+
+    assert JournalDatabaseEngine(str(tmp_path), "db").load() == {"a": 1, "b": 2}
+    assert os.path.getsize(engine.journal_file) == valid_size
+    # Appends after the recovery land after the last valid record
+    recovered = JournalDatabaseEngine(str(tmp_path), "db")
+    recovered.load()
+    recovered.write({"d": 4}, {"a": 1, "b": 2, "d": 4})
+    assert JournalDatabaseEngine(str(tmp_path), "db").load() == {"a": 1, "b": 2, "d": 4}
+
+
+def test_corrupted_record_drops_the_rest(tmp_path):
+    engine = JournalDatabaseEngine(str(tmp_path), "db")
+    engine.write({"a": 1}, {"a": 1})
+    first_size = os.path.getsize(engine.journal_file)
+    engine.write({"b": 2}, {"a": 1, "b": 2})
+    engine.write({"c": 3}, {"a": 1, "b": 2, "c": 3})
+    with open(engine.journal_file, "r+b") as f:
+        f.seek(first_size + JOURNAL_RECORD_HEADER.size)
+        f.write(b"\xff")
+
+    assert JournalDatabaseEngine(str(tmp_path), "db").load() == {"a": 1}
+    assert os.path.getsize(engine.journal_file) == first_size
+
+
+def test_journal_is_compacted(tmp_path):
+    engine = JournalDatabaseEngine(str(tmp_path), "db", compaction_records=3)
+    database = {}
+    for idx in range(7):
+        database[f"key-{idx}"] = idx
+        engine.write({f"key-{idx}": idx}, dict(database))
+        assert record_count(engine.journal_file) < 3
+
+    assert JournalDatabaseEngine(str(tmp_path), "db").load() == database
+
+
+def test_pickle_database_is_migrated(tmp_path):
+    PickleDatabaseEngine(str(tmp_path), "db").write({}, {"a": 1})
+    engine = JournalDatabaseEngine(str(tmp_path), "db")
+    assert engine.load() == {"a": 1}
+    assert os.path.exists(engine.journal_file)
+    assert PickleDatabaseEngine(str(tmp_path), "db").load() is None
+
+
+def test_only_compaction_is_synced(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+    PickleDatabaseEngine(str(tmp_path), "pickle").write({"a": 1}, {"a": 1})
+    assert synced == []
+    engine = JournalDatabaseEngine(str(tmp_path), "db")
+    engine.write({"a": 1}, {"a": 1})
+    assert len(synced) == 1
+    engine.write({"b": 2}, {"a": 1, "b": 2})
+    assert len(synced) == 1
+
+
+def record_count(journal_file: str) -> int:
+    with open(journal_file, "rb") as f:
+        data = f.read()
+    records = 0
+    offset = 0
+    while offset < len(data):
+        length, _ = JOURNAL_RECORD_HEADER.unpack_from(data, offset)
+        pickle.loads(data[offset + JOURNAL_RECORD_HEADER.size:offset + JOURNAL_RECORD_HEADER.size + length])
+        offset += JOURNAL_RECORD_HEADER.size + length
+        records += 1
+    return records
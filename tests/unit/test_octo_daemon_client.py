@@ -0,0 +1,46 @@
+import os
+import socket
+
+from octo_pipeline_python.daemon.octo_daemon_client import (DAEMON_FORWARD_ENV,
+                                                            OctoDaemonClient)
+
+
+def test_socket_dir_must_be_private(tmp_path):
+    socket_dir = tmp_path / "octo-daemon"
+    socket_dir.mkdir(mode=0o700)
+    os.chmod(socket_dir, 0o700)
+    path = str(socket_dir / "daemon.sock")
+    assert OctoDaemonClient.secure_socket_dir(path) is None
+    os.chmod(socket_dir, 0o755)
+    assert "accessible to other users" in OctoDaemonClient.secure_socket_dir(path)
+    assert OctoDaemonClient.secure_socket_dir(str(tmp_path / "missing" / "daemon.sock"))
+
+
+def test_socket_dir_cannot_be_a_symlink(tmp_path):
+    target = tmp_path / "target"
+    target.mkdir(mode=0o700)
+    os.symlink(target, tmp_path / "octo-daemon")
+    assert "not a directory" in OctoDaemonClient.secure_socket_dir(str(tmp_path / "octo-daemon" / "daemon.sock"))
+
+
+def test_peer_of_the_same_user_is_trusted():
+    left, right = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    with left, right:
+        assert OctoDaemonClient.trusted_peer(left)
+
+
+def test_only_the_needed_variables_are_forwarded(monkeypatch):
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    monkeypatch.setenv("CONAN_PASSWORD", "secret")
+    monkeypatch.setenv("OCTO_DB_ENGINE", "journal")
+    monkeypatch.setenv("MYPIPELINE_VERSION", "1.2.3")
+    monkeypatch.setenv("BRANCH_NAME", "main")
+    monkeypatch.setenv("MY_BUILD_FLAG", "1")
+    monkeypatch.setenv(DAEMON_FORWARD_ENV, "MY_BUILD_FLAG")
+    env = OctoDaemonClient.forwarded_env()
+    assert "AWS_SECRET_ACCESS_KEY" not in env
+    assert "CONAN_PASSWORD" not in env
+    assert env["OCTO_DB_ENGINE"] == "journal"
+    assert env["MYPIPELINE_VERSION"] == "1.2.3"
+    assert env["BRANCH_NAME"] == "main"
+    assert env["MY_BUILD_FLAG"] == "1"
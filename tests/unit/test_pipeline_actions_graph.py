@@ -0,0 +1,67 @@
+from octo_pipeline_python.actions.action_result import ActionResultCode
+from octo_pipeline_python.backends.backends_context import BackendsContext
+from octo_pipeline_python.pipeline.pipeline_builder import PipelineBuilder
+from octo_pipeline_python.workspace.workspace_builder import WorkspaceBuilder
+
+
+def execute_pipeline(path: str) -> ActionResultCode:
+    workspace = WorkspaceBuilder.create_singular_workspace(source_dir=path)
+    pipeline = workspace.singular_pipeline
+    assert pipeline.is_graph
+    return pipeline.execute_pipeline(BackendsContext(workspace.context), workspace.context, parallel_jobs=2)
+
+
+def test_actions_run_after_their_needs(tmp_path, recording_backend, write_pipeline):
+    write_pipeline(str(tmp_path), "graph", [
+        {"build": {"needs": ["source"]}},
+        {"unittests": {"needs": "build", "after": ["lint-checks"]}},
+        {"source": {}},
+        {"lint-checks": {"needs": ["source"]}},
+    ])
+    assert execute_pipeline(str(tmp_path)) == ActionResultCode.SUCCESS
+    runs = recording_backend.runs
+    assert sorted(runs) == ["graph/build", "graph/lint-checks", "graph/source", "graph/unittests"]
+    assert runs[0] == "graph/source"
+    assert runs[-1] == "graph/unittests"
+
+
+def test_after_ignores_missing_actions(tmp_path, recording_backend, write_pipeline):
+    write_pipeline(str(tmp_path), "graph", [
+        {"source": {}},
+        {"build": {"after": ["lint-checks", "source"]}},
+    ])
+    assert execute_pipeline(str(tmp_path)) == ActionResultCode.SUCCESS
+    assert recording_backend.runs == ["graph/source", "graph/build"]
+
+
+def test_failed_need_stops_dependents_and_resumes(tmp_path, recording_backend, write_pipeline):
+    write_pipeline(str(tmp_path), "graph", [
+        {"source": {}},
+        {"build": {"needs": ["source"]}},
+        {"unittests": {"needs": ["build"]}},
+    ])
+    recording_backend.failing = {"graph/build"}
+    assert execute_pipeline(str(tmp_path)) == ActionResultCode.FAILURE
+    assert recording_backend.runs == ["graph/source", "graph/build"]
+
+    # Executing again resumes from the failed action
+    recording_backend.failing = set()
+    recording_backend.runs = []
+    assert execute_pipeline(str(tmp_path)) == ActionResultCode.SUCCESS
+    assert recording_backend.runs == ["graph/build", "graph/unittests"]
+
+
+def test_cycle_is_rejected(tmp_path, recording_backend, write_pipeline):
+    write_pipeline(str(tmp_path), "cycle", [
+        {"source": {"after": ["unittests"]}},
+        {"build": {"needs": ["source"]}},
+        {"unittests": {"needs": ["build"]}},
+    ])
+    assert PipelineBuilder.create(source_dir=str(tmp_path), ignore_workspace=True) is None
+
+
+def test_unknown_need_is_rejected(tmp_path, recording_backend, write_pipeline):
+    write_pipeline(str(tmp_path), "unknown", [
+        {"build": {"needs": ["source"]}},
+    ])
+    assert PipelineBuilder.create(source_dir=str(tmp_path), ignore_workspace=True) is None
@@ -0,0 +1,42 @@
+from octo_pipeline_python.utils.resource_usage import (ResourceUsage,
+                                                       ResourceUsageMeter)
+
+
+def usage(peak_rss: int) -> ResourceUsage:
+    return ResourceUsage(wall_time=1.0, cpu_time=1.0, peak_rss=peak_rss, read_bytes=512, written_bytes=1024)
+
+
+def test_peak_rss_is_kept_only_when_it_grew():
+    assert usage(200).since(usage(100)).peak_rss == 200
+    assert usage(100).since(usage(100)).peak_rss is None
+
+
+def test_counters_are_subtracted():
+    grown = ResourceUsage(wall_time=3.0, cpu_time=2.5, peak_rss=100, read_bytes=1024, written_bytes=4096)
+    spent = grown.since(usage(100))
+    assert (spent.wall_time, spent.cpu_time, spent.read_bytes, spent.written_bytes) == (2.0, 1.5, 512, 3072)
+
+
+def test_meter_records_a_lone_block():
+    with ResourceUsageMeter() as meter:
+        pass
+    assert not meter.overlapped
+    assert meter.usage.wall_time >= 0
+
+
+def test_meter_marks_nested_blocks_as_overlapped():
+    with ResourceUsageMeter() as outer:
+        with ResourceUsageMeter() as inner:
+            pass
+    assert outer.overlapped and inner.overlapped
+
+
+def test_meter_marks_blocks_started_alongside_as_overlapped():
+    first = ResourceUsageMeter().__enter__()
+    second = ResourceUsageMeter().__enter__()
+    first.__exit__(None, None, None)
+    second.__exit__(None, None, None)
+    with ResourceUsageMeter() as after:
+        pass
+    assert first.overlapped and second.overlapped
+    assert not after.overlapped
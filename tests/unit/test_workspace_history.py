@@ -0,0 +1,90 @@
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from octo_pipeline_python.actions.action_result import ActionResultCode
+from octo_pipeline_python.common.surrounding import Surrounding
+from octo_pipeline_python.pipeline.pipeline_context import PipelineActionStats
+from octo_pipeline_python.workspace.workspace_context import (WorkspaceContext,
+                                                              WorkspaceStats)
+from octo_pipeline_python.workspace.workspace_history import (
+    HISTORY_DB_FILE_NAME, WorkspaceHistory)
+
+START_TIME = datetime(2024, 1, 1)
+
+
+def create_history(path: str) -> WorkspaceHistory:
+    return WorkspaceHistory(WorkspaceContext(name="history", scm="", source_dir=path, working_dir=path,
+                                             surrounding=Surrounding.Local, organizations=[],
+                                             stats=WorkspaceStats()))
+
+
+def record_runs(history: WorkspaceHistory, pipeline: str, sha: Optional[str], durations: List[float],
+                result: ActionResultCode = ActionResultCode.SUCCESS, offset: int = 0) -> None:
+    for idx, duration in enumerate(durations):
+        start_time = START_TIME + timedelta(minutes=offset + idx)
+        action_stats = PipelineActionStats(action_id="build", backend="recording", start_time=start_time,
+                                           wall_time=duration / 2, result_code=result)
+        history.record_run(pipeline, sha, "main", start_time, duration, result, [action_stats])
+
+
+def test_history_is_kept_under_the_cache(tmp_path):
+    history = create_history(str(tmp_path))
+    record_runs(history, "app", "aaaa1111", [1.0])
+    assert history.path == os.path.join(str(tmp_path), ".cache", HISTORY_DB_FILE_NAME)
+    assert os.path.exists(history.path)
+
+
+def test_durations_use_nearest_rank_percentiles(tmp_path):
+    history = create_history(str(tmp_path))
+    record_runs(history, "app", "aaaa1111", [10.0, 1.0, 9.0, 2.0, 8.0, 3.0, 7.0, 4.0, 6.0, 5.0])
+    record_runs(history, "app", "aaaa1111", [100.0], result=ActionResultCode.FAILURE, offset=10)
+    record_runs(history, "lib", "aaaa1111", [20.0, 30.0], offset=20)
+
+    durations = history.durations()
+    assert [stats.pipeline for stats in durations] == ["lib", "app"]
+    app = durations[1]
+    assert (app.runs, app.failures, app.p50, app.p95, app.last) == (10, 1, 5.0, 10.0, 5.0)
+    # An even count takes the lower of the middle values rather than their mean
+    assert (durations[0].p50, durations[0].p95) == (20.0, 30.0)
+
+    actions = history.durations(actions=True, pipeline="app")
+    assert [(stats.action, stats.backend, stats.p50) for stats in actions] == [("build", "recording", 2.5)]
+    assert history.durations(pipeline="app", last=3)[0].runs == 2
+
+
+def test_regressions_compare_the_last_two_commits(tmp_path):
+    history = create_history(str(tmp_path))
+    record_runs(history, "app", "aaaa1111", [10.0, 10.0])
+    record_runs(history, "app", "bbbb2222", [12.0, 12.0], offset=10)
+    record_runs(history, "app", "cccc3333", [15.0, 15.0], offset=20)
+
+    regressions = history.regressions()
+    assert [(regression.base_sha, regression.head_sha) for regression in regressions] == \
+        [("bbbb2222", "cccc3333")]
+    assert regressions[0].ratio == 1.25
+    assert history.regressions(actions=True)[0].action == "build"
+
+
+def test_regressions_match_commits_by_prefix(tmp_path):
+    history = create_history(str(tmp_path))
+    record_runs(history, "app", "aaaa1111", [10.0])
+    record_runs(history, "app", "bbbb2222", [11.0], offset=10)
+    record_runs(history, "app", "cccc3333", [30.0], offset=20)
+
+    regression = history.regressions(base_sha="aaaa", head_sha="bbbb", threshold=1.05)
+    assert [(r.base_sha, r.head_sha, r.head_p50) for r in regression] == [("aaaa1111", "bbbb2222", 11.0)]
+    assert history.regressions(base_sha="dddd") == []
+    assert history.regressions(head_sha="dddd") == []
+
+
+def test_regressions_below_the_threshold_are_dropped(tmp_path):
+    history = create_history(str(tmp_path))
+    record_runs(history, "app", "aaaa1111", [10.0])
+    record_runs(history, "app", "bbbb2222", [11.0], offset=10)
+    # Failed runs do not count for the commit durations
+    record_runs(history, "app", "bbbb2222", [100.0], result=ActionResultCode.FAILURE, offset=20)
+
+    assert history.regressions() == []
+    assert history.regressions(threshold=1.1)[0].head_p50 == 11.0
+    assert history.regressions(threshold=1.11) == []
@@ -0,0 +1,26 @@
+from octo_pipeline_python.actions.action_result import ActionResultCode
+from octo_pipeline_python.backends.backends_context import BackendsContext
+from octo_pipeline_python.workspace.workspace_builder import WorkspaceBuilder
+
+PIPELINES = {"failing": [], "dependent": ["failing"], "independent": []}
+
+
+def execute_workspace(path: str, keep_going: bool) -> ActionResultCode:
+    workspace = WorkspaceBuilder.create(workspace_file_path=path)
+    return workspace.execute_pipelines(BackendsContext(workspace.context), parallel_jobs=1,
+                                       retries=1, keep_going=keep_going)
+
+
+def test_keep_going_skips_only_the_descendants(tmp_path, recording_backend, write_workspace):
+    workspace_file = write_workspace(str(tmp_path), PIPELINES)
+    recording_backend.failing = {"failing/build"}
+    assert execute_workspace(workspace_file, keep_going=True) == ActionResultCode.FAILURE
+    assert sorted(recording_backend.runs) == ["failing/build", "independent/build"]
+
+
+def test_failure_stops_the_workspace(tmp_path, recording_backend, write_workspace):
+    workspace_file = write_workspace(str(tmp_path), PIPELINES)
+    recording_backend.failing = {"failing/build"}
+    assert execute_workspace(workspace_file, keep_going=False) == ActionResultCode.FAILURE
+    # Failing leads the longer path, so it runs first and nothing runs after it
+    assert recording_backend.runs == ["failing/build"]
@@ -0,0 +1,101 @@
+import heapq
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import networkx
+import pytest
+
+from octo_pipeline_python.actions.action_result import ActionResultCode
+from octo_pipeline_python.backends.backends_context import BackendsContext
+from octo_pipeline_python.workspace.workspace_builder import WorkspaceBuilder
+from octo_pipeline_python.workspace.workspace_scheduler import (
+    DEFAULT_PIPELINE_DURATION, SchedulePolicy, WorkspaceScheduler)
+
+
+def pipeline_ran_for(seconds: Optional[float]) -> SimpleNamespace:
+    stats = None
+    if seconds is not None:
+        start_time = datetime(2024, 1, 1)
+        stats = SimpleNamespace(start_time=start_time, end_time=start_time + timedelta(seconds=seconds))
+    return SimpleNamespace(context=SimpleNamespace(stats=stats))
+
+
+def diamond_graph() -> networkx.DiGraph:
+    # source -> (short, long) -> sink, and an unrelated pipeline
+    graph = networkx.DiGraph()
+    graph.add_edges_from([("source", "short"), ("source", "long"), ("short", "sink"), ("long", "sink")])
+    graph.add_node("unrelated")
+    return graph
+
+
+def test_critical_path_ranks_take_the_longest_downstream_path():
+    ranks = WorkspaceScheduler.critical_path_ranks(diamond_graph(), {
+        "source": 1.0, "short": 2.0, "long": 10.0, "sink": 3.0, "unrelated": 5.0
+    })
+    assert ranks == {"sink": 3.0, "short": 5.0, "long": 13.0, "source": 14.0, "unrelated": 5.0}
+
+
+def test_critical_path_ranks_of_unknown_durations():
+    ranks = WorkspaceScheduler.critical_path_ranks(diamond_graph(), {"long": 10.0})
+    assert ranks["source"] == pytest.approx(10.0)
+    assert ranks["short"] == pytest.approx(0.0)
+
+
+def test_durations_prefer_estimates_over_last_runs():
+    durations = WorkspaceScheduler.durations({"a": pipeline_ran_for(30.0),
+                                              "b": pipeline_ran_for(10.0),
+                                              "c": pipeline_ran_for(None)},
+                                             {"a": 90.0})
+    # Pipelines that never ran get the average of the known ones
+    assert durations == {"a": 90.0, "b": 10.0, "c": 50.0}
+
+
+def test_durations_without_any_run():
+    durations = WorkspaceScheduler.durations({"a": pipeline_ran_for(None), "b": pipeline_ran_for(None)})
+    assert durations == {"a": DEFAULT_PIPELINE_DURATION, "b": DEFAULT_PIPELINE_DURATION}
+
+
+def test_pipeline_duration_ignores_incomplete_runs():
+    assert WorkspaceScheduler.pipeline_duration(pipeline_ran_for(12.5)) == pytest.approx(12.5)
+    assert WorkspaceScheduler.pipeline_duration(pipeline_ran_for(-1.0)) is None
+    assert WorkspaceScheduler.pipeline_duration(pipeline_ran_for(None)) is None
+
+
+def scheduler_of(policy: SchedulePolicy, estimates: Dict[str, float]) -> WorkspaceScheduler:
+    graph = diamond_graph()
+    return WorkspaceScheduler(graph, {name: pipeline_ran_for(None) for name in graph.nodes}, policy, estimates)
+
+
+def pop_all(scheduler: WorkspaceScheduler, names: List[str]) -> List[str]:
+    ready: List[Tuple[float, int, str]] = []
+    for name in names:
+        heapq.heappush(ready, scheduler.priority(name) + (name,))
+    return [heapq.heappop(ready)[-1] for _ in names]
+
+
+def test_ready_pipelines_pop_by_critical_path():
+    scheduler = scheduler_of(SchedulePolicy.CriticalPath,
+                             {"source": 1.0, "short": 2.0, "long": 10.0, "sink": 3.0, "unrelated": 5.0})
+    assert pop_all(scheduler, ["unrelated", "sink", "short", "long"]) == ["long", "unrelated", "short", "sink"]
+
+
+def test_ready_pipelines_of_the_same_rank_pop_in_ready_order():
+    scheduler = scheduler_of(SchedulePolicy.CriticalPath, {"short": 5.0, "sink": 3.0, "unrelated": 8.0})
+    assert pop_all(scheduler, ["unrelated", "short"]) == ["unrelated", "short"]
+    # The sequence is kept per pipeline, pushing again does not move it back
+    assert pop_all(scheduler, ["short", "unrelated"]) == ["unrelated", "short"]
+
+
+def test_ready_pipelines_pop_in_ready_order_by_fifo():
+    scheduler = scheduler_of(SchedulePolicy.Fifo, {"long": 10.0})
+    assert pop_all(scheduler, ["sink", "short", "long"]) == ["sink", "short", "long"]
+
+
+def test_workspace_runs_the_critical_path_first(tmp_path, recording_backend, write_workspace):
+    workspace_file = write_workspace(str(tmp_path), {"unrelated": [], "first": [], "second": ["first"]})
+    workspace = WorkspaceBuilder.create(workspace_file_path=workspace_file)
+    assert workspace.execute_pipelines(BackendsContext(workspace.context), parallel_jobs=1,
+                                       retries=1, schedule=SchedulePolicy.CriticalPath) == ActionResultCode.SUCCESS
+    # First leads the longer path, second only became ready after unrelated did
+    assert recording_backend.runs == ["first/build", "unrelated/build", "second/build"]